@@ -3,20 +3,30 @@ import time
 from datetime import datetime
 from multiprocessing import Process
 from threading import Thread
-from typing import Any, NoReturn
+from typing import Any, Callable, NoReturn
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.routing import Match
 
 from _preexec import keywords_handler
-from api.routers import (basics, fileio, helper, investment, offline,
-                         speech_synthesis, stock_monitor, surveillance)
+from api.routers import (basics, fileio, helper, investment, metrics, offline,
+                         speech_synthesis, stock_monitor, surveillance,
+                         telegram)
 from api.squire import stockmonitor_squire
 from api.squire.logger import logger
 from api.triggers.stock_report import Investment
+from modules.metrics import sink
+from modules.metrics.registry import registry
 from modules.models import models
 from version import version_info
 
+REQUESTS = registry.counter(name="http_requests_total", documentation="Requests received by the API.",
+                            labels=("method", "route", "status"))
+LATENCY = registry.histogram(name="http_request_duration_seconds",
+                             documentation="Time taken by the API to respond to a request.",
+                             labels=("method", "route"))
+
 # Initiate API
 app = FastAPI(
     title="Jarvis API",
@@ -30,10 +40,56 @@ app.include_router(router=basics.router)
 app.include_router(router=fileio.router)
 app.include_router(router=helper.router)
 app.include_router(router=investment.router)
+app.include_router(router=metrics.router)
 app.include_router(router=offline.router)
 app.include_router(router=speech_synthesis.router)
 app.include_router(router=stock_monitor.router)
 app.include_router(router=surveillance.router)
+app.include_router(router=telegram.router)
+
+
+def route_path(request: Request) -> str:
+    """Gets the path template of the route that handles a request, to keep the number of series bounded.
+
+    Args:
+        request: Takes the Request class as an argument.
+
+    Returns:
+        str:
+        Path of the matching route, ``unmatched`` if there isn't one.
+    """
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+@app.middleware(middleware_type="http")
+async def track_requests(request: Request, call_next: Callable) -> Response:
+    """Counts the requests and observes the latency per route.
+
+    Args:
+        request: Takes the Request class as an argument.
+        call_next: Takes the next handler in the chain as an argument.
+
+    Returns:
+        Response:
+        Response from the route.
+
+    See Also:
+        - Latency of streaming responses is measured up to when the response starts.
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = route_path(request=request)
+        REQUESTS.inc(method=request.method, route=route, status=status)
+        LATENCY.observe(time.perf_counter() - start, method=request.method, route=route)
 
 
 def update_keywords() -> NoReturn:
@@ -78,6 +134,7 @@ def run_robinhood() -> NoReturn:
 async def start_robinhood() -> Any:
     """Initiates robinhood gatherer in a process and adds a cron schedule if not present already."""
     await enable_cors()
+    sink.start_flusher(source=metrics.SOURCE)
     stockmonitor_squire.nasdaq()
     logger.info(f'Hosting at http://{models.env.offline_host}:{models.env.offline_port}')
     if all([models.env.robinhood_user, models.env.robinhood_pass, models.env.robinhood_pass]):
@@ -1,10 +1,22 @@
+from enum import Enum
 from typing import Any, Optional, Union
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, PositiveFloat, PositiveInt
 
 from modules.models import models
 
 
+class StreamFormat(str, Enum):
+    """Formats in which the responses for multi-clause commands can be streamed.
+
+    >>> StreamFormat
+
+    """
+
+    ndjson = 'ndjson'
+    sse = 'sse'
+
+
 class OfflineCommunicatorModal(BaseModel):
     """BaseModel that handles input data for the API which is treated as members for the class ``OfflineCommunicatorModal``.
 
@@ -15,6 +27,8 @@ class OfflineCommunicatorModal(BaseModel):
     command: str
     native_audio: Optional[bool] = False
     speech_timeout: Optional[Union[int, float]] = 0
+    stream: Optional[StreamFormat] = None
+    clause_timeout: Union[PositiveInt, PositiveFloat] = models.env.clause_timeout
 
 
 class StockMonitorModal(BaseModel):
@@ -1,53 +1,58 @@
-from multiprocessing import Process, Queue
+from multiprocessing import Queue
 from typing import Dict, Hashable, List, NoReturn, Optional, Tuple
 
 from fastapi import WebSocket
-from pydantic import BaseConfig, BaseModel, EmailStr, HttpUrl
+from pydantic import BaseModel, EmailStr, HttpUrl
 
+from api.squire.session import SharedAttribute, SharedDict
+from api.squire.tickers import TickerIndex
 
-class Robinhood(BaseModel):
+
+class Robinhood:
     """Initiates ``Robinhood`` object to handle members across modules.
 
     >>> Robinhood
 
     """
 
-    token: Hashable = None
+    token: Hashable = SharedAttribute(ttl=300)
 
 
 robinhood = Robinhood()
 
 
-class StockMonitorHelper(BaseModel):
+class StockMonitorHelper:
     """Initiates ``StockMonitorHelper`` object to handle members across modules.
 
     >>> StockMonitorHelper
 
     """
 
-    otp_sent: Dict[EmailStr, Hashable] = {}
-    otp_recd: Dict[EmailStr, Optional[Hashable]] = {}
+    otp_sent: Dict[EmailStr, Hashable] = SharedDict(namespace="stock_monitor.otp_sent", ttl=60)
+    otp_recd: Dict[EmailStr, Optional[Hashable]] = SharedDict(namespace="stock_monitor.otp_recd")
 
 
 stock_monitor_helper = StockMonitorHelper()
 
 
-class Surveillance(BaseConfig):
+class Surveillance:
     """Initiates ``Surveillance`` object to handle members across modules.
 
     >>> Surveillance
 
+    See Also:
+        - Queues are held by the worker that started the camera process, everything else is shared across workers.
     """
 
-    token: Hashable = None
+    token: Hashable = SharedAttribute(ttl=300)
     public_url: HttpUrl = None
-    camera_index: str = None
-    client_id: int = None
-    available_cameras: List[str] = []
-    processes: Dict[int, Process] = {}
+    camera_index: str = SharedAttribute()
+    client_id: int = SharedAttribute()
+    available_cameras: List[str] = SharedAttribute()
+    processes: Dict[int, int] = SharedDict(namespace="surveillance.processes")
     queue_manager: Dict[int, Queue] = {}
-    session_manager: Dict[int, float] = {}
-    frame: Tuple[int, int, int] = ()
+    session_manager: Dict[int, float] = SharedDict(namespace="surveillance.session_manager")
+    frame: Tuple[int, int, int] = SharedAttribute()
 
 
 surveillance = Surveillance()
@@ -62,7 +67,12 @@ class StockMonitor(BaseModel):
 
     user_info: Tuple[str, str, str, str, str] = ("ticker", "email", "max", "min", "correction")
     values: str = '(' + ','.join('?' for _ in user_info) + ')'
-    stock_list: List[str] = []
+    stock_list: TickerIndex = TickerIndex()
+
+    class Config:
+        """Config to allow the ticker index as a member."""
+
+        arbitrary_types_allowed = True
 
 
 stock_monitor = StockMonitor()
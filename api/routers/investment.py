@@ -2,7 +2,6 @@ import mimetypes
 import os
 from datetime import datetime
 from http import HTTPStatus
-from threading import Thread
 from typing import NoReturn
 
 import jinja2
@@ -12,7 +11,6 @@ from gmailconnector.send_email import SendEmail
 
 from api.modals.authenticator import ROBINHOOD_PROTECTOR
 from api.modals.settings import robinhood
-from api.squire import timeout_otp
 from api.squire.logger import logger
 from modules.exceptions import APIResponse
 from modules.models import models
@@ -54,7 +52,6 @@ if not os.getcwd().endswith("Jarvis") or all([models.env.robinhood_user, models.
                                         subject=f"Robinhood Token - {datetime.now().strftime('%c')}",
                                         html_body=rendered)
         if mail_stat.ok:
-            Thread(target=timeout_otp.reset_robinhood, args=(300,)).start()
             raise APIResponse(status_code=HTTPStatus.OK.real,
                               detail="Authentication success. Please enter the OTP sent via email:")
         else:
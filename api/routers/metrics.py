@@ -0,0 +1,32 @@
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from api.modals.authenticator import OFFLINE_PROTECTOR
+from modules.metrics import exposition, process, sink
+
+router = APIRouter()
+
+# Each worker publishes its snapshot under its own name, so the workers are summed instead of replacing each other
+SOURCE = f"fast_api:{os.getpid()}"
+
+
+@router.get(path="/metrics", response_class=PlainTextResponse, dependencies=OFFLINE_PROTECTOR)
+def metrics() -> PlainTextResponse:
+    """Metrics of all the processes in the Prometheus text exposition format.
+
+    Returns:
+
+        PlainTextResponse:
+        Counters, histograms and gauges aggregated across the API workers and the background processes.
+
+    See Also:
+
+        - Requests and latency per route, intent dispatch and handler latency, cache lookups, singleflight ratio,
+          scheduler lag, resource usage per process and child process restarts.
+        - The current worker flushes its own snapshot before rendering, others are as fresh as their last flush.
+    """
+    process.collect()
+    sink.flush(source=SOURCE)
+    return PlainTextResponse(content=exposition.render(rows=sink.load()), media_type=exposition.CONTENT_TYPE)
@@ -1,31 +1,90 @@
+import asyncio
 import imghdr
+import json
 import os
 import string
+import time
 import traceback
+from concurrent.futures import Future
+from contextvars import copy_context
 from http import HTTPStatus
-from multiprocessing.pool import ThreadPool
 from threading import Thread
-from typing import NoReturn, Union
+from typing import AsyncIterable, List, NoReturn, Union
 
 from fastapi import APIRouter, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from api.modals.authenticator import OFFLINE_PROTECTOR
-from api.modals.models import OfflineCommunicatorModal, SpeechSynthesisModal
+from api.modals.models import (OfflineCommunicatorModal, SpeechSynthesisModal,
+                               StreamFormat)
 from api.routers import speech_synthesis
 from api.squire.logger import logger
 from executors.commander import timed_delay
 from executors.offline import offline_communicator
 from executors.word_match import word_match
 from modules.audio import tts_stt
-from modules.conditions import keywords
 from modules.exceptions import APIResponse
 from modules.models import models
-from modules.offline import compatibles
+from modules.offline import compatibles, context, planner
 from modules.utils import support, util
 
 router = APIRouter()
 
+MEDIA_TYPES = {StreamFormat.ndjson: "application/x-ndjson", StreamFormat.sse: "text/event-stream"}
+
+
+async def await_clause(clause: planner.Clause, future: Union[Future, None],
+                       timeout: Union[int, float]) -> planner.Result:
+    """Waits for the result of a clause that was dispatched by the planner, within the given deadline.
+
+    Args:
+        clause: Clause that was dispatched.
+        future: Future that resolves to the result of the clause, None if the clause is not offline compatible.
+        timeout: Seconds to wait for the clause to finish.
+
+    Returns:
+        planner.Result:
+        Result of the clause.
+    """
+    if not future:
+        logger.warning(f"{clause.text!r} is not a part of offline compatible request.")
+        return planner.Result(clause=clause, status="incompatible",
+                              response=f'{clause.text!r} is not a part of off-line communicator compatible request.')
+    start = time.time()
+    try:
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"{clause.text!r} exceeded the deadline of {timeout}s")
+        return planner.Result(clause=clause, status="timeout", elapsed=time.time() - start,
+                              response=f"{clause.text!r} did not finish within {timeout} seconds.")
+
+
+async def stream_clauses(clauses: List[planner.Clause], timeout: Union[int, float],
+                         stream_format: StreamFormat) -> AsyncIterable[str]:
+    """Runs all the clauses through the planner and yields each result as soon as it is available.
+
+    Args:
+        clauses: Clauses of a multi-clause command.
+        timeout: Seconds to wait for each clause.
+        stream_format: Format in which each result has to be yielded.
+
+    Yields:
+        str:
+        Result of a clause as a line of JSON, or as a server-sent event.
+    """
+    futures = planner.submit(clauses=[clause for clause in clauses if clause.compatible], runner=offline_communicator)
+    tasks = [await_clause(clause=clause, future=futures.get(clause.index), timeout=timeout) for clause in clauses]
+    for task in asyncio.as_completed(tasks):
+        result = (await task).to_dict()
+        logger.info(f"Response [{result['index']}]: {result['response']}")
+        if stream_format == StreamFormat.sse:
+            yield f"event: clause\ndata: {json.dumps(result)}\n\n"
+        else:
+            yield json.dumps(result) + "\n"
+    if stream_format == StreamFormat.sse:
+        yield "event: end\ndata: {}\n\n"
+
 
 @router.post(path="/offline-communicator", dependencies=OFFLINE_PROTECTOR)
 async def offline_communicator_api(request: Request, input_data: OfflineCommunicatorModal) -> \
@@ -40,6 +99,8 @@ async def offline_communicator_api(request: Request, input_data: OfflineCommunic
             - command: The task which Jarvis has to do.
             - native_audio: Whether the response should be as an audio file with the server's built-in voice.
             - speech_timeout: Timeout to process speech-synthesis.
+            - stream: Streams the result of each clause in a multi-clause command as ``ndjson`` or ``sse``.
+            - clause_timeout: Seconds to wait for each clause in a multi-clause command.
 
     Raises:
 
@@ -51,6 +112,8 @@ async def offline_communicator_api(request: Request, input_data: OfflineCommunic
     See Also:
 
         - Keeps waiting for the record response in the database table offline
+        - Commands are executed in a thread pool within their own request context, so requests run concurrently.
+        - Clauses of a multi-clause command run concurrently, and are streamed as they complete when ``stream`` is set.
     """
     logger.debug(f"Connection received from {request.client.host} via {request.headers.get('host')} using "
                  f"{request.headers.get('user-agent')}")
@@ -66,27 +129,14 @@ async def offline_communicator_api(request: Request, input_data: OfflineCommunic
         logger.info("Test message received.")
         raise APIResponse(status_code=HTTPStatus.OK.real, detail="Test message received.")
 
-    # Keywords for which the ' and ' split should not happen.
-    multiexec = keywords.keywords.send_notification + keywords.keywords.reminder + keywords.keywords.distance
-
-    if ' and ' in command and not word_match(phrase=command, match_list=keywords.keywords.avoid) and \
-            not word_match(phrase=command, match_list=multiexec):
-        threads = []
-        and_response = ""
-        for each in command.split(' and '):
-            if not word_match(phrase=each, match_list=compatibles.offline_compatible()):
-                logger.warning(f"{each!r} is not a part of offline compatible request.")
-                and_response += f'{each!r} is not a part of off-line communicator compatible request.\n\n' \
-                                'Please try an instruction that does not require an user interaction.'
-            else:
-                threads.append(ThreadPool(processes=1).apply_async(func=offline_communicator, args=(each,)))
-        for thread in threads:
-            try:
-                and_response += thread.get() + "\n"
-            except Exception as error:
-                logger.error(error)
-                logger.error(traceback.format_exc())
-                and_response += error.__str__()
+    if len(clauses := planner.plan(phrase=command)) > 1:
+        if input_data.stream:
+            return StreamingResponse(content=stream_clauses(clauses=clauses, timeout=input_data.clause_timeout,
+                                                            stream_format=input_data.stream),
+                                     media_type=MEDIA_TYPES[input_data.stream], status_code=HTTPStatus.OK.real)
+        results = await run_in_threadpool(planner.execute, clauses=clauses, runner=offline_communicator,
+                                          timeout=input_data.clause_timeout)
+        and_response = "\n".join(str(result.response) for result in results)
         logger.info(f"Response: {and_response.strip()}")
         raise APIResponse(status_code=HTTPStatus.OK.real, detail=and_response.strip())
 
@@ -101,34 +151,37 @@ async def offline_communicator_api(request: Request, input_data: OfflineCommunic
             raise APIResponse(status_code=HTTPStatus.OK.real,
                               detail=f'I will execute it after {util.time_converter(second=delay_info[1])} '
                                      f'{models.env.title}!')
-    try:
-        response = offline_communicator(command=command)
-    except Exception as error:
-        logger.error(error)
-        logger.error(traceback.format_exc())
-        response = error.__str__()
-    logger.info(f"Response: {response}")
-    if os.path.isfile(response) and response.endswith('.jpg'):
-        logger.info("Response received as a file.")
-        Thread(target=support.remove_file, kwargs={'delay': 2, 'filepath': response}, daemon=True).start()
-        return FileResponse(path=response, media_type=f'image/{imghdr.what(file=response)}',
-                            filename=os.path.basename(response), status_code=HTTPStatus.OK.real)
-    if input_data.speech_timeout:
-        logger.info(f"Storing response as {models.fileio.speech_synthesis_wav}")
-        if binary := await speech_synthesis.speech_synthesis(input_data=SpeechSynthesisModal(
-                text=response, timeout=input_data.speech_timeout, quality="low"  # low quality to speed up response
-        ), raise_for_status=False):
-            return binary
-    elif input_data.native_audio:
-        if native_audio_wav := tts_stt.text_to_audio(text=response):
-            logger.info(f"Storing response as {native_audio_wav} in native audio.")
-            Thread(target=support.remove_file, kwargs={'delay': 2, 'filepath': native_audio_wav}, daemon=True).start()
-            return FileResponse(path=native_audio_wav, media_type='application/octet-stream',
-                                filename="synthesized.wav", status_code=HTTPStatus.OK.real)
+    with context.offline_request():  # Collects the caller to name the audio response
+        try:
+            response = await run_in_threadpool(copy_context().run, offline_communicator, command)
+        except Exception as error:
+            logger.error(error)
+            logger.error(traceback.format_exc())
+            response = error.__str__()
+        logger.info(f"Response: {response}")
+        if os.path.isfile(response) and response.endswith('.jpg'):
+            logger.info("Response received as a file.")
+            Thread(target=support.remove_file, kwargs={'delay': 2, 'filepath': response}, daemon=True).start()
+            return FileResponse(path=response, media_type=f'image/{imghdr.what(file=response)}',
+                                filename=os.path.basename(response), status_code=HTTPStatus.OK.real)
+        if input_data.speech_timeout:
+            logger.info(f"Storing response as {models.fileio.speech_synthesis_wav}")
+            # low quality to speed up response
+            if binary := await speech_synthesis.speech_synthesis(input_data=SpeechSynthesisModal(
+                    text=response, timeout=input_data.speech_timeout, quality="low"
+            ), raise_for_status=False):
+                return binary
+        elif input_data.native_audio:
+            if native_audio_wav := tts_stt.text_to_audio(text=response):
+                logger.info(f"Storing response as {native_audio_wav} in native audio.")
+                Thread(target=support.remove_file, kwargs={'delay': 2, 'filepath': native_audio_wav},
+                       daemon=True).start()
+                return FileResponse(path=native_audio_wav, media_type='application/octet-stream',
+                                    filename="synthesized.wav", status_code=HTTPStatus.OK.real)
+            else:
+                raise APIResponse(status_code=HTTPStatus.INTERNAL_SERVER_ERROR.real,
+                                  detail="Failed to generate audio file in native voice. This feature can be "
+                                         "flaky at times as it relies on native wav to kernel specific wav "
+                                         "conversion. Please use `speech_timeout` instead to get an audio response.")
         else:
-            raise APIResponse(status_code=HTTPStatus.INTERNAL_SERVER_ERROR.real,
-                              detail="Failed to generate audio file in native voice. "
-                                     "This feature can be flaky at times as it relies on native wav to kernel specific "
-                                     "wav conversion. Please use `speech_timeout` instead to get an audio response.")
-    else:
-        raise APIResponse(status_code=HTTPStatus.OK.real, detail=response)
+            raise APIResponse(status_code=HTTPStatus.OK.real, detail=response)
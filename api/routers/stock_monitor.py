@@ -1,6 +1,5 @@
 from datetime import datetime
 from http import HTTPStatus
-from threading import Thread
 from typing import NoReturn, Optional
 
 import jinja2
@@ -10,11 +9,10 @@ from fastapi import APIRouter, Header, Request
 from gmailconnector.send_email import SendEmail
 from gmailconnector.validator import validate_email
 from pydantic import EmailStr
-from webull import webull
 
 from api.modals.models import StockMonitorModal
 from api.modals.settings import stock_monitor, stock_monitor_helper
-from api.squire import stockmonitor_squire, timeout_otp
+from api.squire import quotes, stockmonitor_squire, tickers
 from api.squire.logger import logger
 from modules.exceptions import APIResponse
 from modules.models import models
@@ -39,7 +37,7 @@ async def send_otp_stock_monitor(email_address: EmailStr, reset_timeout: int = 6
     """
     mail_obj = SendEmail(gmail_user=models.env.open_gmail_user, gmail_pass=models.env.open_gmail_pass)
     logger.info("Setting stock monitor token")
-    stock_monitor_helper.otp_sent[email_address] = util.keygen_uuid(length=16)
+    stock_monitor_helper.otp_sent.set(key=email_address, value=util.keygen_uuid(length=16), ttl=reset_timeout)
     rendered = jinja2.Template(templates.email.stock_monitor_otp).render(
         TIMEOUT=util.pluralize(count=support.format_nos(input_=reset_timeout / 60), word="minute"),
         TOKEN=stock_monitor_helper.otp_sent[email_address], EMAIL=email_address
@@ -52,7 +50,6 @@ async def send_otp_stock_monitor(email_address: EmailStr, reset_timeout: int = 6
         if models.env.debug:  # Why do all the conversions if it's not going to be logged anyway
             logger.debug(f"Token will be reset in "
                          f"{util.pluralize(count=support.format_nos(input_=reset_timeout / 60), word='minute')}.")
-        Thread(target=timeout_otp.reset_stock_monitor, args=(email_address, reset_timeout)).start()
         raise APIResponse(status_code=HTTPStatus.OK.real,
                           detail="Please enter the OTP sent via email to verify email address:")
     else:
@@ -60,6 +57,28 @@ async def send_otp_stock_monitor(email_address: EmailStr, reset_timeout: int = 6
         raise APIResponse(status_code=HTTPStatus.SERVICE_UNAVAILABLE.real, detail=mail_stat.body)
 
 
+@router.get(path="/tickers")
+async def ticker_autocomplete(prefix: str = "", limit: int = tickers.LIMIT) -> NoReturn:
+    """Autocompletes the stock tickers in NASDAQ, that are supported by the stock monitor.
+
+    Args:
+
+        - prefix: Beginning of the ticker, case-insensitive.
+        - limit: Maximum number of tickers to return, up to 100.
+
+    Raises:
+
+        APIResponse:
+        - 200: With the list of tickers that start with the prefix, in alphabetical order.
+        - 422: If the limit is not within 1 and 100.
+    """
+    if not 1 <= limit <= 100:
+        raise APIResponse(status_code=HTTPStatus.UNPROCESSABLE_ENTITY.real,
+                          detail="Limit should be within 1 and 100.")
+    raise APIResponse(status_code=HTTPStatus.OK.real,
+                      detail=stock_monitor.stock_list.search(prefix=prefix, limit=limit))
+
+
 @router.post(path="/stock-monitor")
 async def stock_monitor_api(request: Request, input_data: StockMonitorModal,
                             email_otp: Optional[str] = Header(None)) -> NoReturn:
@@ -112,7 +131,7 @@ async def stock_monitor_api(request: Request, input_data: StockMonitorModal,
     email_otp = email_otp or request.headers.get('email_otp')
     if email_otp:
         recd_dict[input_data.email] = email_otp
-    if recd_dict.get(input_data.email) and recd_dict[input_data.email] == sent_dict[input_data.email]:
+    if recd_dict.get(input_data.email) and recd_dict[input_data.email] == sent_dict.get(input_data.email):
         logger.debug(f"{input_data.email} has been verified.")
     else:
         result = validate_email(email_address=input_data.email, smtp_check=False)
@@ -195,17 +214,11 @@ async def stock_monitor_api(request: Request, input_data: StockMonitorModal,
         raise APIResponse(status_code=HTTPStatus.CONFLICT.real, detail="Duplicate request!\nEntry exists in database.")
 
     logger.info(f"{input_data.email!r} requested to add {new_entry!r}")
-    try:
-        price_check = webull().get_quote(decoded['Ticker'])
-        current_price = price_check.get('close') or price_check.get('open')
-        if current_price:
-            current_price = float(current_price)
-        else:
-            raise ValueError(price_check)
-    except ValueError as error:
-        logger.error(error)
+    if quote := quotes.get_quote(ticker=decoded['Ticker']):
+        current_price = quote['price']
+    else:
         raise APIResponse(status_code=HTTPStatus.BAD_GATEWAY.real,
-                          detail=f"Failed to perform a price check on {decoded['Ticker']}\n\n{error}")
+                          detail=f"Failed to perform a price check on {decoded['Ticker']}")
     if decoded['Max'] and current_price >= decoded['Max']:  # Ignore 0 which doesn't trigger a notification
         raise APIResponse(status_code=HTTPStatus.CONFLICT.real,
                           detail=f"Current price of {decoded['Ticker']} is {current_price}.\n"
@@ -16,7 +16,7 @@ from gmailconnector.send_email import SendEmail
 from api.modals.authenticator import SURVEILLANCE_PROTECTOR
 from api.modals.models import CameraIndexModal
 from api.modals.settings import ConnectionManager, stock_monitor, surveillance
-from api.squire import surveillance_squire, timeout_otp
+from api.squire import surveillance_squire
 from api.squire.logger import logger
 from modules.database import database
 from modules.exceptions import APIResponse, CameraError
@@ -77,7 +77,6 @@ if not os.getcwd().endswith("Jarvis") or models.env.surveillance_endpoint_auth:
                                         html_body=rendered)
         if mail_stat.ok:
             logger.debug(mail_stat.body)
-            Thread(target=timeout_otp.reset_surveillance, args=(300,)).start()
             raise APIResponse(status_code=HTTPStatus.OK.real,
                               detail="Authentication success. Please enter the OTP sent via email:")
         else:
@@ -173,7 +172,7 @@ if not os.getcwd().endswith("Jarvis") or models.env.surveillance_endpoint_auth:
             cursor = db.connection.cursor()
             cursor.execute("INSERT INTO children (surveillance) VALUES (?);", (process.pid,))
             db.connection.commit()
-        surveillance.processes[surveillance.client_id] = process
+        surveillance.processes[surveillance.client_id] = process.pid
         return StreamingResponse(content=surveillance_squire.streamer(),
                                  media_type='multipart/x-mixed-replace; boundary=frame',
                                  status_code=HTTPStatus.PARTIAL_CONTENT.real)
@@ -236,9 +235,9 @@ if not os.getcwd().endswith("Jarvis") or models.env.surveillance_endpoint_auth:
             ws_manager.disconnect(websocket)
             logger.info(f'Client [{client_id}] disconnected.')
             if ws_manager.active_connections:
-                if process := surveillance.processes.get(int(client_id)):
-                    support.stop_process(pid=process.pid)
+                if pid := surveillance.processes.get(int(client_id)):
+                    support.stop_process(pid=pid)
             else:
                 logger.info("No active connections found.")
-                for client_id, process in surveillance.processes.items():
-                    support.stop_process(pid=process.pid)
+                for client_id, pid in surveillance.processes.items():
+                    support.stop_process(pid=pid)
@@ -0,0 +1,54 @@
+import secrets
+from http import HTTPStatus
+from typing import Dict, NoReturn, Optional
+
+from fastapi import APIRouter, Header, Request
+from fastapi.concurrency import run_in_threadpool
+
+from api.squire.logger import logger
+from modules.exceptions import APIResponse
+from modules.models import models
+from modules.telegram.bot import TelegramBot
+
+router = APIRouter()
+
+# Bot is created on the first update, so workers don't start a dispatcher unless the webhook is in use
+BOT: Dict[str, TelegramBot] = {}
+
+
+@router.post(path="/telegram-webhook", include_in_schema=False)
+async def telegram_webhook(request: Request,
+                           x_telegram_bot_api_secret_token: Optional[str] = Header(None)) -> NoReturn:
+    """Receives the updates pushed by telegram, when ``BOT_WEBHOOK`` is set.
+
+    Args:
+
+        - request: Takes the Request class as an argument.
+        - x_telegram_bot_api_secret_token: Secret token sent by telegram in the headers of every update.
+
+    Raises:
+
+        APIResponse:
+        - 200: When the update is queued in the dispatcher, or ignored as it has neither text nor voice.
+        - 401: If the secret token doesn't match.
+        - 404: If the webhook is not enabled.
+
+    See Also:
+
+        - Updates are handled by the same dispatcher as polling, so the response is sent once it is queued.
+        - Webhook is set to a single connection, so updates arrive in order. API runs a single worker when the
+          webhook is set, so the order within a chat is preserved by its dispatcher.
+    """
+    if not models.env.bot_token or not models.env.bot_webhook:
+        raise APIResponse(status_code=HTTPStatus.NOT_FOUND.real, detail=HTTPStatus.NOT_FOUND.phrase)
+    if not secrets.compare_digest(x_telegram_bot_api_secret_token or '', models.env.bot_secret):
+        logger.warning(f"Telegram webhook was called without a valid secret token from {request.client.host}")
+        raise APIResponse(status_code=HTTPStatus.UNAUTHORIZED.real, detail=HTTPStatus.UNAUTHORIZED.phrase)
+    update = await request.json()
+    message = update.get('message', {})
+    if message.get('text') or message.get('voice'):
+        if not BOT:
+            BOT['bot'] = TelegramBot()
+        # Submit blocks when the dispatcher is full, which holds the update with telegram instead of dropping it
+        await run_in_threadpool(BOT['bot'].dispatcher.submit, update)
+    raise APIResponse(status_code=HTTPStatus.OK.real, detail=HTTPStatus.OK.phrase)
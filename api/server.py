@@ -3,11 +3,14 @@ import logging
 
 import requests
 import uvicorn
+from uvicorn.supervisors import Multiprocess
 
+from api.squire import session
 from executors.port_handler import is_port_in_use, kill_port_pid
 from modules.exceptions import EgressErrors
 from modules.logger import config
 from modules.logger.custom_logger import logger
+from modules.metrics import sink
 from modules.models import models
 
 
@@ -39,6 +42,8 @@ def fast_api() -> None:
     See Also:
         - Checks if the port is being used. If so, makes a ``GET`` request to the endpoint.
         - Attempts to kill the process listening to the port, if the endpoint doesn't respond.
+        - Runs without auto-reload and with multiple workers when ``API_PRODUCTION`` is set.
+        - Runs a single worker when ``BOT_WEBHOOK`` is set, so every update is handled by the same dispatcher.
     """
     api_config = config.APIConfig()
     config.multiprocessing_logger(filename=api_config.DEFAULT_LOG_FILENAME,
@@ -61,18 +66,37 @@ def fast_api() -> None:
         if not kill_port_pid(port=models.env.offline_port):  # This might terminate Jarvis
             logger.critical('Failed to kill existing PID. Attempting to re-create session.')
 
+    workers = models.env.workers if models.env.api_production else 1
+    if workers > 1 and models.env.bot_webhook:
+        # Each worker would run its own dispatcher, losing the order of the updates within a chat
+        logger.warning(f"Ignoring {workers} workers, as the telegram webhook requires a single worker")
+        workers = 1
     argument_dict = {
         "app": "api.fast:app",
         "host": models.env.offline_host,
         "port": models.env.offline_port,
         "ws_ping_interval": 20.0,
         "ws_ping_timeout": 20.0,
-        "workers": models.env.workers,
-        "reload": True
+        "workers": workers,
+        "reload": not models.env.api_production
     }
 
     logger.debug(argument_dict)
-    logger.info(f"Starting FastAPI on Uvicorn server with {models.env.workers} workers.")
+    logger.info(f"Starting FastAPI on Uvicorn server with {argument_dict['workers']} workers.")
+
+    # Sessions don't outlive the server, and a single reaper expires them for all the workers
+    session.store.clear()
+    session.start_reaper()
+    # Stock price alerts are checked by a single resident job for all the workers
+    # Imported here, so the process that starts the API doesn't load it
+    from api.triggers import stock_monitor
+    stock_monitor.start_monitor()
+    # Snapshots of the workers from a previous run would otherwise be summed with the ones of the current workers
+    sink.clear(prefix=fast_api.__name__)
 
     server_conf = uvicorn.Config(**argument_dict)
-    APIServer(config=server_conf).run_in_parallel()
+    server = APIServer(config=server_conf)
+    if server_conf.workers > 1:
+        Multiprocess(config=server_conf, target=server.run, sockets=[server_conf.bind_socket()]).run()
+    else:
+        server.run_in_parallel()
@@ -0,0 +1,82 @@
+# noinspection PyUnresolvedReferences
+"""Metadata of the robinhood instruments, persisted as it almost never changes.
+
+>>> Instruments
+
+See Also:
+    - Symbol and name of each instrument are stored in SQLite by its URL, and refreshed once the ``TTL`` expires.
+    - Instruments that are not stored are fetched concurrently through ``quotes.gather``, so a portfolio report
+      requests only the instruments it hasn't seen within the ``TTL``.
+"""
+
+import time
+from typing import Dict, Iterable, List
+
+import requests
+
+from api.squire import quotes
+from modules.database import database
+from modules.models import models
+
+TTL = 604_800  # Seconds for which the metadata of an instrument is served from the store
+
+COLUMNS = ("url PRIMARY KEY", "symbol", "name", "expiry")
+
+Instrument = Dict[str, str]
+
+instrument_db = database.Database(database=models.fileio.cache_db)
+instrument_db.create_table(table_name="instruments", columns=COLUMNS)
+
+
+def fetch(url: str) -> Instrument:
+    """Fetches the metadata of an instrument.
+
+    Args:
+        url: URL of the instrument.
+
+    Raises:
+        requests.HTTPError:
+        If the instrument is not available.
+
+    Returns:
+        Instrument:
+        Dictionary of the symbol, name and URL of the instrument.
+    """
+    response = requests.get(url=url, timeout=(5, 30))
+    response.raise_for_status()
+    details = response.json()
+    return {'symbol': details['symbol'], 'name': details.get('simple_name') or details['name'], 'url': url}
+
+
+def get_instruments(urls: Iterable[str], ttl: int = TTL) -> Dict[str, Instrument]:
+    """Gets the metadata of each instrument, from the store when available.
+
+    Args:
+        urls: URLs of the instruments.
+        ttl: Seconds for which the fetched metadata is stored.
+
+    Returns:
+        Dict[str, Instrument]:
+        Dictionary of the URLs and the metadata of their instruments, instruments that failed are left out.
+    """
+    urls: List[str] = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    now = time.time()
+    with instrument_db.connection:
+        cursor = instrument_db.connection.cursor()
+        rows = cursor.execute(f"SELECT url, symbol, name FROM instruments WHERE expiry>(?) AND "
+                              f"url IN ({','.join('?' for _ in urls)})", (now, *urls)).fetchall()
+    instruments = {url: {'symbol': symbol, 'name': name, 'url': url} for url, symbol, name in rows}
+    if not (missing := [url for url in urls if url not in instruments]):
+        return instruments
+    fetched = quotes.gather(keys=missing, fetcher=fetch)
+    with instrument_db.connection:
+        cursor = instrument_db.connection.cursor()
+        cursor.execute("DELETE FROM instruments WHERE expiry<=(?)", (now,))
+        cursor.executemany("INSERT OR REPLACE INTO instruments (url, symbol, name, expiry) VALUES (?,?,?,?);",
+                           [(url, instrument['symbol'], instrument['name'], now + ttl)
+                            for url, instrument in fetched.items()])
+        instrument_db.connection.commit()
+    instruments.update(fetched)
+    return instruments
@@ -0,0 +1,165 @@
+# noinspection PyUnresolvedReferences
+"""Quote service shared by the stock monitor's cron scan, its API and the investment report.
+
+>>> Quotes
+
+See Also:
+    - Quotes are fetched through a single ``webull`` client per process, concurrently with bounded parallelism and
+      paced by a token bucket, so a scan over many tickers neither runs serially nor floods the provider.
+    - Prices are cached per ticker for a short time in SQLite, so the cron scan and the API workers share them.
+"""
+
+import contextlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Union
+
+from webull import webull
+
+from api.squire.logger import logger
+from modules.database import database
+from modules.metrics.registry import registry
+from modules.models import models
+from modules.utils.ratelimit import TokenBucket
+
+TTL = 60  # Seconds for which a price is served from the cache
+WORKERS = 8  # Quotes fetched at the same time
+RATE = 10  # Quotes fetched per second
+
+COLUMNS = ("ticker PRIMARY KEY", "price", "exchange_code", "expiry")
+
+Quote = Dict[str, Union[float, str, None]]
+
+QUOTES = registry.counter(name="stock_quote_requests_total",
+                          documentation="Stock quotes requested from the quote service.",
+                          labels=("result",))
+
+quote_db = database.Database(database=models.fileio.cache_db)
+quote_db.create_table(table_name="quotes", columns=COLUMNS)
+
+bucket = TokenBucket(rate=RATE, capacity=RATE)
+
+_lock = threading.Lock()
+_clients: Dict[int, webull] = {}
+
+
+def client() -> webull:
+    """Gets the webull client of the current process, creating it on first use.
+
+    Returns:
+        webull:
+        Webull client that belongs to the current process.
+    """
+    pid = os.getpid()
+    with _lock:
+        if not (current := _clients.get(pid)):
+            current = _clients[pid] = webull()
+            with contextlib.suppress(FileNotFoundError):  # Created by webull module, and removed by any process
+                os.remove('did.bin')
+    return current
+
+
+def gather(keys: Iterable[Hashable], fetcher: Callable[[Hashable], Any]) -> Dict[Hashable, Any]:
+    """Calls the fetcher for each key concurrently, paced by the token bucket.
+
+    Args:
+        keys: Keys to be fetched.
+        fetcher: Function that takes a key and returns its value, or raises an exception.
+
+    Returns:
+        Dict[Hashable, Any]:
+        Dictionary of the keys and their values, keys that failed are logged and left out.
+    """
+
+    def paced(key: Hashable) -> Any:
+        """Waits for a token before calling the fetcher."""
+        while wait := bucket.take():
+            time.sleep(wait)
+        return fetcher(key)
+
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(WORKERS, len(keys)), thread_name_prefix="quotes") as executor:
+        futures = {key: executor.submit(paced, key) for key in keys}
+    for key, future in futures.items():
+        if error := future.exception():
+            if str(error).strip():
+                logger.error(f"Failed to fetch {key!r}: {error}")
+            continue
+        results[key] = future.result()
+    return results
+
+
+def fetch(ticker: str) -> Quote:
+    """Fetches the current price of a ticker and its exchange code.
+
+    Args:
+        ticker: Stock ticker.
+
+    Raises:
+        ValueError:
+        If the quote doesn't have a price.
+
+    Returns:
+        Quote:
+        Dictionary of the price and the exchange code.
+    """
+    price_check = client().get_quote(ticker)
+    if not (current_price := price_check.get('close') or price_check.get('open')):
+        raise ValueError(price_check)
+    return {'price': round(float(current_price), 2), 'exchange_code': price_check.get('disExchangeCode')}
+
+
+def get_quotes(tickers: Iterable[str], ttl: Union[int, float] = TTL) -> Dict[str, Quote]:
+    """Gets the current price of each ticker, from the cache when available.
+
+    Args:
+        tickers: Stock tickers.
+        ttl: Seconds for which the fetched prices are cached.
+
+    Returns:
+        Dict[str, Quote]:
+        Dictionary of the tickers and their quotes, tickers that failed are left out.
+    """
+    tickers: List[str] = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    now = time.time()
+    with quote_db.connection:
+        cursor = quote_db.connection.cursor()
+        rows = cursor.execute(f"SELECT ticker, price, exchange_code FROM quotes WHERE expiry>(?) AND "
+                              f"ticker IN ({','.join('?' for _ in tickers)})", (now, *tickers)).fetchall()
+    quotes = {ticker: {'price': price, 'exchange_code': exchange_code} for ticker, price, exchange_code in rows}
+    missing = [ticker for ticker in tickers if ticker not in quotes]
+    QUOTES.inc(len(quotes), result="hit")
+    if not missing:
+        return quotes
+    fetched = gather(keys=missing, fetcher=fetch)
+    QUOTES.inc(len(fetched), result="miss")
+    QUOTES.inc(len(missing) - len(fetched), result="error")
+    with quote_db.connection:
+        cursor = quote_db.connection.cursor()
+        cursor.execute("DELETE FROM quotes WHERE expiry<=(?)", (now,))
+        cursor.executemany("INSERT OR REPLACE INTO quotes (ticker, price, exchange_code, expiry) VALUES (?,?,?,?);",
+                           [(ticker, quote['price'], quote['exchange_code'], now + ttl)
+                            for ticker, quote in fetched.items()])
+        quote_db.connection.commit()
+    quotes.update(fetched)
+    return quotes
+
+
+def get_quote(ticker: str) -> Union[Quote, None]:
+    """Gets the current price of a ticker, from the cache when available.
+
+    Args:
+        ticker: Stock ticker.
+
+    Returns:
+        Quote:
+        Dictionary of the price and the exchange code, None if the price check failed.
+    """
+    return get_quotes(tickers=[ticker]).get(ticker)
@@ -1,5 +1,6 @@
 import os
 import shutil
+from datetime import datetime
 
 from modules.utils import util
 
@@ -54,17 +55,20 @@ def rh_cron_schedule(extended: bool = False) -> str:
     return f"*/30 {start}-{end} * * 1-5 {command}"
 
 
-def sm_cron_schedule(include_weekends: bool = True) -> str:
-    """Creates a cron expression for ``stock_monitor.py``.
+def market_hours(extended: bool = True) -> bool:
+    """Checks if the market is open on the current weekday and hour, based on the current timezone.
 
     Args:
-        include_weekends: Takes a boolean flag to run cron schedule over the weekends.
+        extended: Uses extended hours.
 
     Returns:
-        str:
-        A crontab expression running every 15 minutes.
+        bool:
+        Boolean flag to indicate whether the current time is within market hours.
     """
-    command = f"cd {os.getcwd()} && {shutil.which(cmd='python')} {os.path.join('api', 'triggers', 'stock_monitor.py')}"
-    if include_weekends:
-        return f"*/15 * * * * {command}"
-    return f"*/15 * * * 1-5 {command}"
+    tz = util.get_timezone()
+    if tz not in MarketHours.hours['REGULAR'] or tz not in MarketHours.hours['EXTENDED']:
+        tz = 'OTHER'
+    hours = MarketHours.hours['EXTENDED'][tz] if extended else MarketHours.hours['REGULAR'][tz]
+    now = datetime.now()
+    # Hours are inclusive like the range of a crontab expression
+    return now.weekday() < 5 and hours['OPEN'] <= now.hour <= hours['CLOSE']
@@ -0,0 +1,232 @@
+# noinspection PyUnresolvedReferences
+"""TTL store for API session state, shared by all the uvicorn workers through SQLite.
+
+>>> Session
+
+See Also:
+    - Tokens, OTPs and surveillance sessions are stored here instead of per-process objects, so any worker can
+      verify what another worker issued.
+    - Expired entries are never returned, a single reaper thread removes them from the database periodically.
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, ItemsView, NoReturn, Union
+
+from modules.database import database
+from modules.logger.custom_logger import logger
+from modules.models import models
+
+
+class SessionStore:
+    """Initiates ``SessionStore`` object to get and set values that expire after a given time.
+
+    >>> SessionStore
+
+    """
+
+    def __init__(self, database_file: str = models.fileio.session_db):
+        """Creates the sessions table if it doesn't exist already.
+
+        Args:
+            database_file: Database file to store the sessions.
+        """
+        self.db = database.Database(database=database_file)
+        self.db.create_table(table_name="sessions", columns=("key PRIMARY KEY", "value", "expiry"))
+
+    def set(self, key: str, value: Any, ttl: Union[int, float] = None) -> NoReturn:
+        """Stores a value that expires after the given time.
+
+        Args:
+            key: Key for the value.
+            value: Value that can be serialized as JSON.
+            ttl: Seconds after which the value expires, stored until deleted when not set.
+        """
+        with self.db.connection:
+            cursor = self.db.connection.cursor()
+            cursor.execute("INSERT OR REPLACE INTO sessions (key, value, expiry) VALUES (?,?,?);",
+                           (key, json.dumps(value), time.time() + ttl if ttl else None))
+            self.db.connection.commit()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Gets the value for a key, if it hasn't expired.
+
+        Args:
+            key: Key for the value.
+            default: Value to return if the key doesn't exist or has expired.
+
+        Returns:
+            Any:
+            Stored value.
+        """
+        with self.db.connection:
+            cursor = self.db.connection.cursor()
+            row = cursor.execute("SELECT value FROM sessions WHERE key=(?) AND (expiry IS NULL OR expiry>(?))",
+                                 (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def delete(self, key: str) -> NoReturn:
+        """Deletes the value for a key.
+
+        Args:
+            key: Key for the value.
+        """
+        with self.db.connection:
+            cursor = self.db.connection.cursor()
+            cursor.execute("DELETE FROM sessions WHERE key=(?)", (key,))
+            self.db.connection.commit()
+
+    def items(self, prefix: str) -> Dict[str, Any]:
+        """Gets all the values that haven't expired, for keys that start with the given prefix.
+
+        Args:
+            prefix: Prefix of the keys.
+
+        Returns:
+            Dict[str, Any]:
+            Dictionary of the keys without the prefix and their values.
+        """
+        with self.db.connection:
+            cursor = self.db.connection.cursor()
+            rows = cursor.execute("SELECT key, value FROM sessions WHERE substr(key, 1, ?)=(?) AND "
+                                  "(expiry IS NULL OR expiry>(?))", (len(prefix), prefix, time.time())).fetchall()
+        return {key[len(prefix):]: json.loads(value) for key, value in rows}
+
+    def reap(self) -> int:
+        """Deletes all the expired values.
+
+        Returns:
+            int:
+            Number of values deleted.
+        """
+        with self.db.connection:
+            cursor = self.db.connection.cursor()
+            count = cursor.execute("DELETE FROM sessions WHERE expiry<=(?)", (time.time(),)).rowcount
+            self.db.connection.commit()
+        return count
+
+    def clear(self) -> NoReturn:
+        """Deletes all the values, so sessions don't outlive the API server."""
+        with self.db.connection:
+            cursor = self.db.connection.cursor()
+            cursor.execute("DELETE FROM sessions")
+            self.db.connection.commit()
+
+
+store = SessionStore()
+
+
+class SharedAttribute:
+    """Initiates ``SharedAttribute`` descriptor to store a class member in the session store.
+
+    >>> SharedAttribute
+
+    """
+
+    def __init__(self, ttl: Union[int, float] = None):
+        """Stores the time to live for the value.
+
+        Args:
+            ttl: Seconds after which the value expires.
+        """
+        self.ttl = ttl
+        self.key = None
+
+    def __set_name__(self, owner: type, name: str) -> NoReturn:
+        """Uses the class and the member name as the key."""
+        self.key = f"{owner.__name__.lower()}.{name}"
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        """Gets the value from the session store, if it hasn't expired."""
+        if instance is None:
+            return self
+        return store.get(key=self.key)
+
+    def __set__(self, instance: Any, value: Any) -> NoReturn:
+        """Stores the value in the session store, setting it to None deletes it."""
+        if value is None:
+            store.delete(key=self.key)
+        else:
+            store.set(key=self.key, value=value, ttl=self.ttl)
+
+
+class SharedDict:
+    """Initiates ``SharedDict`` object to use a namespace in the session store like a dictionary.
+
+    >>> SharedDict
+
+    """
+
+    def __init__(self, namespace: str, ttl: Union[int, float] = None):
+        """Stores the namespace and the default time to live for the values.
+
+        Args:
+            namespace: Prefix for the keys in the session store.
+            ttl: Default seconds after which each value expires.
+        """
+        self.prefix = f"{namespace}:"
+        self.ttl = ttl
+
+    def set(self, key: Any, value: Any, ttl: Union[int, float] = None) -> NoReturn:
+        """Stores a value with a custom time to live.
+
+        Args:
+            key: Key for the value.
+            value: Value that can be serialized as JSON.
+            ttl: Seconds after which the value expires, defaults to the one set for the namespace.
+        """
+        store.set(key=f"{self.prefix}{key}", value=value, ttl=ttl or self.ttl)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Gets the value for a key, if it hasn't expired."""
+        return store.get(key=f"{self.prefix}{key}", default=default)
+
+    def items(self) -> ItemsView[str, Any]:
+        """Gets all the keys and values in the namespace, that haven't expired."""
+        return store.items(prefix=self.prefix).items()
+
+    def __getitem__(self, key: Any) -> Any:
+        """Gets the value for a key, raises ``KeyError`` if it doesn't exist or has expired."""
+        if (value := self.get(key=key)) is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> NoReturn:
+        """Stores a value with the default time to live."""
+        self.set(key=key, value=value)
+
+    def __delitem__(self, key: Any) -> NoReturn:
+        """Deletes the value for a key."""
+        store.delete(key=f"{self.prefix}{key}")
+
+    def __contains__(self, key: Any) -> bool:
+        """Checks whether a key exists and hasn't expired."""
+        return self.get(key=key) is not None
+
+
+def reaper(interval: Union[int, float] = 30) -> NoReturn:
+    """Removes expired values from the session store, every interval.
+
+    Args:
+        interval: Seconds to wait between each sweep.
+    """
+    while True:
+        time.sleep(interval)
+        try:
+            if count := store.reap():
+                logger.debug(f"Reaped {count} expired session(s)")
+        except Exception as error:  # Reaper should never stop
+            logger.error(error)
+
+
+def start_reaper() -> threading.Thread:
+    """Starts the reaper in a daemon thread.
+
+    Returns:
+        threading.Thread:
+        Thread running the reaper.
+    """
+    thread = threading.Thread(target=reaper, daemon=True)
+    thread.start()
+    return thread
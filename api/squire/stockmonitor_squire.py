@@ -1,17 +1,19 @@
+import contextlib
 import os
 import string
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Callable, Iterable, List, NoReturn, Optional, Tuple, Union
+from typing import (Any, Callable, Dict, Iterable, List, NoReturn, Optional,
+                    Tuple, Union)
 
 import requests
-import yaml
 from bs4 import BeautifulSoup
 from pydantic import EmailStr
 from webull import webull
 
 from api.modals.settings import stock_monitor
+from api.squire import tickers
 from api.squire.logger import logger
 from modules.database import database
 from modules.models import models
@@ -19,30 +21,35 @@ from modules.models import models
 stock_db = database.Database(database=models.fileio.stock_db)
 
 
-def ticker_gatherer(character: str) -> NoReturn:
+def ticker_gatherer(character: str) -> List[str]:
     """Gathers the stock ticker in NASDAQ. Runs on ``multi-threading`` which drops run time by ~7 times.
 
     Args:
         character: ASCII character (alphabet) with which the stock ticker name starts.
+
+    Returns:
+        List[str]:
+        List of the stock tickers that start with the character.
     """
     url = f'https://www.eoddata.com/stocklist/NASDAQ/{character}.htm'
     response = requests.get(url=url)
     scrapped = BeautifulSoup(response.text, "html.parser")
     d1 = scrapped.find_all('tr', {'class': 'ro'})
     d2 = scrapped.find_all('tr', {'class': 're'})
-    for link in d1:
-        stock_monitor.stock_list.append(f"{(link.get('onclick').split('/')[-1]).split('.')[0]}")
-    for link in d2:
-        stock_monitor.stock_list.append(f"{(link.get('onclick').split('/')[-1]).split('.')[0]}")
+    return [f"{(link.get('onclick').split('/')[-1]).split('.')[0]}" for link in d1 + d2]
 
 
-def thread_worker(function_to_call: Callable, iterable: Union[List, Iterable], workers: int = None) -> NoReturn:
+def thread_worker(function_to_call: Callable, iterable: Union[List, Iterable], workers: int = None) -> Dict[Any, Any]:
     """Initiates ``ThreadPoolExecutor`` with in a dedicated thread.
 
     Args:
         function_to_call: Takes the function/method that has to be called as an argument.
         iterable: List or iterable to be used as args.
         workers: Maximum number of workers to be spun up.
+
+    Returns:
+        Dict[Any, Any]:
+        Dictionary of each arg and the result of its call, args that raised an exception are logged and left out.
     """
     if not workers:
         workers = len(iterable)
@@ -54,14 +61,29 @@ def thread_worker(function_to_call: Callable, iterable: Union[List, Iterable], w
             future = executor.submit(function_to_call, iterator)
             futures[future] = iterator
 
-    thread_except = 0
+    # Results are merged by the caller's thread once the pool is done, so the threads never share a list
+    results = {}
     for future in as_completed(futures):
         if future.exception():
-            thread_except += 1
-            logger.error(f'Thread processing for {iterator} received an exception: {future.exception()}')
-    if thread_except > (len(iterable) * 10 / 100):  # Use backup file if more than 10% of the requests fail
-        with open(models.fileio.stock_list_backup) as file:
-            stock_monitor.stock_list = yaml.load(stream=file, Loader=yaml.FullLoader)
+            logger.error(f'Thread processing for {futures[future]} received an exception: {future.exception()}')
+        else:
+            results[futures[future]] = future.result()
+    return results
+
+
+def load_stock_list() -> bool:
+    """Loads the stock list from the backup file.
+
+    Returns:
+        bool:
+        Boolean flag to indicate whether the backup file was loaded.
+    """
+    try:
+        stock_monitor.stock_list = tickers.TickerIndex.load(filename=models.fileio.stock_list_backup)
+    except (OSError, ValueError) as error:
+        logger.error(error)
+        return False
+    return True
 
 
 def nasdaq() -> NoReturn:
@@ -69,29 +91,32 @@ def nasdaq() -> NoReturn:
     if os.path.isfile(models.fileio.stock_list_backup):
         modified = int(os.stat(models.fileio.stock_list_backup).st_mtime)
         if int(time.time()) - modified < 86_400:  # Gathers new stock list only if the file is older than a day
-            try:
-                with open(models.fileio.stock_list_backup) as file:
-                    stock_monitor.stock_list = yaml.load(stream=file, Loader=yaml.FullLoader)
-            except yaml.YAMLError as error:
-                logger.error(error)
-            if len(stock_monitor.stock_list) > 5_000:
+            if load_stock_list() and len(stock_monitor.stock_list) > 5_000:
                 logger.info(f"{models.fileio.stock_list_backup} generated on "
                             f"{datetime.fromtimestamp(modified).strftime('%c')} looks re-usable.")
                 return
     logger.info("Gathering stock list from webull.")
+    symbols = []
     try:
-        stock_monitor.stock_list = [ticker.get('symbol') for ticker in webull().get_all_tickers()]
+        symbols = [ticker.get('symbol') for ticker in webull().get_all_tickers()]
     except Exception as error:
         logger.error(error)
-    if stock_monitor.stock_list:
-        os.remove('did.bin') if os.path.isfile('did.bin') else None  # Created by webull module
+    if symbols:
+        with contextlib.suppress(FileNotFoundError):  # Created by webull module, and removed by any process
+            os.remove('did.bin')
     else:
         logger.info("Gathering stock list from eoddata.")
-        thread_worker(function_to_call=ticker_gatherer, iterable=string.ascii_uppercase)
+        gathered = thread_worker(function_to_call=ticker_gatherer, iterable=string.ascii_uppercase)
+        # Use backup file if more than 10% of the requests fail
+        if len(string.ascii_uppercase) - len(gathered) > (len(string.ascii_uppercase) * 10 / 100) and \
+                os.path.isfile(models.fileio.stock_list_backup) and load_stock_list():
+            return
+        symbols = [symbol for gathered_list in gathered.values() for symbol in gathered_list]
+    stock_monitor.stock_list = tickers.TickerIndex.from_symbols(symbols=symbols)
     logger.info(f"Total tickers gathered: {len(stock_monitor.stock_list)}")
-    # Writes to a backup file
-    with open(models.fileio.stock_list_backup, 'w') as file:
-        yaml.dump(stream=file, data=stock_monitor.stock_list)
+    if stock_monitor.stock_list:
+        # Writes to a backup file
+        stock_monitor.stock_list.save(filename=models.fileio.stock_list_backup)
 
 
 def cleanup_stock_userdata() -> NoReturn:
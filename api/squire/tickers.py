@@ -0,0 +1,126 @@
+# noinspection PyUnresolvedReferences
+"""Compact index of the stock tickers, for membership checks and autocomplete.
+
+>>> Tickers
+
+See Also:
+    - Tickers are held in a sorted array for prefix search with a binary search, along with a hash set for the
+      membership checks of the stock monitor.
+    - Index is persisted as a ``.npy`` file without pickles, which loads as a single read into a fixed-width array.
+"""
+
+import os
+import tempfile
+from typing import Iterable, List, NoReturn
+
+import numpy
+
+LIMIT = 10  # Tickers returned by the autocomplete, unless requested otherwise
+
+
+class TickerIndex:
+    """Initiates ``TickerIndex`` object to hold the tickers in a sorted array and a hash set.
+
+    >>> TickerIndex
+
+    """
+
+    def __init__(self, symbols: numpy.ndarray = None):
+        """Holds an array of tickers that is already sorted and unique.
+
+        Args:
+            symbols: Sorted array of unique tickers, use ``from_symbols`` for anything else.
+        """
+        self.symbols = numpy.array([], dtype=str) if symbols is None else symbols
+        self.members = frozenset(self.symbols.tolist())
+
+    @classmethod
+    def from_symbols(cls, symbols: Iterable[str]) -> 'TickerIndex':
+        """Creates an index from the tickers in any order, ignoring the duplicates and the empty ones.
+
+        Args:
+            symbols: Stock tickers.
+
+        Returns:
+            TickerIndex:
+            Index of the tickers in upper case.
+        """
+        unique = sorted({symbol.strip().upper() for symbol in symbols if symbol and symbol.strip()})
+        return cls(symbols=numpy.array(unique, dtype=str))
+
+    @classmethod
+    def load(cls, filename: str) -> 'TickerIndex':
+        """Loads an index that was saved with ``save``.
+
+        Args:
+            filename: Name of the file.
+
+        Raises:
+            OSError:
+            If the file cannot be read.
+            ValueError:
+            If the file is not an array of tickers.
+
+        Returns:
+            TickerIndex:
+            Index of the tickers in the file.
+        """
+        symbols = numpy.load(filename, allow_pickle=False)
+        if symbols.ndim != 1 or symbols.dtype.kind != 'U':
+            raise ValueError(f"{filename!r} is not an array of tickers")
+        return cls(symbols=symbols)
+
+    def save(self, filename: str) -> NoReturn:
+        """Saves the index through a temporary file, so the workers never load a partial index.
+
+        Args:
+            filename: Name of the file.
+        """
+        # Temporary file is unique to the writer, so concurrent saves don't write to the same file
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(filename) or os.curdir, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                numpy.save(file, self.symbols, allow_pickle=False)
+            os.replace(temporary, filename)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def search(self, prefix: str, limit: int = LIMIT) -> List[str]:
+        """Gets the tickers that start with a prefix.
+
+        Args:
+            prefix: Beginning of the ticker, case-insensitive.
+            limit: Maximum number of tickers to return.
+
+        Returns:
+            List[str]:
+            List of the tickers in alphabetical order.
+        """
+        if not (prefix := prefix.strip().upper()):
+            return self.symbols[:limit].tolist()
+        start = int(self.symbols.searchsorted(prefix, side='left'))
+        # Every ticker with the prefix sorts before the prefix with its last character incremented
+        end = int(self.symbols.searchsorted(prefix[:-1] + chr(ord(prefix[-1]) + 1), side='left'))
+        return self.symbols[start:min(end, start + limit)].tolist()
+
+    def __contains__(self, ticker: str) -> bool:
+        """Checks if a ticker is in the index.
+
+        Args:
+            ticker: Stock ticker.
+
+        Returns:
+            bool:
+            Boolean flag to indicate whether the ticker is in the index.
+        """
+        return ticker in self.members
+
+    def __len__(self) -> int:
+        """Gets the number of tickers in the index.
+
+        Returns:
+            int:
+            Number of tickers.
+        """
+        return len(self.symbols)
@@ -0,0 +1,219 @@
+# noinspection PyUnresolvedReferences
+"""Local time-series store for the historical bars of each ticker, refreshed incrementally.
+
+>>> Timeseries
+
+See Also:
+    - Bars are stored in SQLite by source, ticker and interval, with the timestamp (epoch seconds) as the key.
+    - A refresh fetches only the bars since the last one stored, along with the last one as it may have been partial,
+      so charts and watchlists transfer a few bars per refresh instead of the whole history.
+    - Bars fetched within the ``TTL`` are served from the store without a request.
+    - Only the number of bars that is read is kept for each ticker, the older ones are deleted on every refresh.
+    - Each process opens its own connection, as the charts are rendered in a pool of processes.
+    - Threads of a process take turns on its connection, while the bars are fetched in parallel.
+"""
+
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NoReturn, Tuple, Union
+
+import pandas
+from dateutil import tz
+from pyrh import Robinhood
+
+from api.squire import quotes
+from modules.database import database
+from modules.models import models
+
+TTL = 60  # Seconds for which the stored bars are served without a refresh
+MARKET_TZ = tz.gettz("America/New_York")  # Timezone in which a trading day of robinhood begins and ends
+
+# Seconds in each interval, as named by the source
+INTERVALS = {
+    "m1": 60, "m5": 300, "m15": 900, "m30": 1_800, "m60": 3_600, "m120": 7_200, "m240": 14_400,
+    "d1": 86_400, "w1": 604_800, "5minute": 300, "10minute": 600, "hour": 3_600, "day": 86_400,
+}
+
+BAR_COLUMNS = ("source", "ticker", "interval", "timestamp", "open", "close",
+               "PRIMARY KEY (source, ticker, interval, timestamp)")
+FETCH_COLUMNS = ("source", "ticker", "interval", "fetched", "PRIMARY KEY (source, ticker, interval)")
+
+Bar = Tuple[int, float, float]
+
+_lock = threading.Lock()
+_access = threading.Lock()
+_databases: Dict[int, database.Database] = {}
+
+
+def connection() -> database.Database:
+    """Gets the database of the current process, creating the tables on first use.
+
+    Returns:
+        database.Database:
+        Database that belongs to the current process.
+    """
+    pid = os.getpid()
+    with _lock:
+        if not (current := _databases.get(pid)):
+            current = _databases[pid] = database.Database(database=models.fileio.bars_db)
+            current.create_table(table_name="bars", columns=BAR_COLUMNS)
+            current.create_table(table_name="fetched", columns=FETCH_COLUMNS)
+    return current
+
+
+def last_fetch(source: str, ticker: str, interval: str) -> Tuple[Union[int, None], Union[float, None]]:
+    """Gets the timestamp of the last bar stored, and the time it was fetched.
+
+    Args:
+        source: Source of the bars.
+        ticker: Stock ticker.
+        interval: Interval of the bars.
+
+    Returns:
+        Tuple[Union[int, None], Union[float, None]]:
+        Tuple of the timestamp of the last bar and the epoch time of the last fetch, None when nothing is stored.
+    """
+    db = connection()
+    with _access, db.connection:
+        cursor = db.connection.cursor()
+        last = cursor.execute("SELECT MAX(timestamp) FROM bars WHERE source=(?) AND ticker=(?) AND interval=(?)",
+                              (source, ticker, interval)).fetchone()[0]
+        fetched = cursor.execute("SELECT fetched FROM fetched WHERE source=(?) AND ticker=(?) AND interval=(?)",
+                                 (source, ticker, interval)).fetchone()
+    return last, fetched[0] if fetched else None
+
+
+def store(source: str, ticker: str, interval: str, bars: Iterable[Bar], count: int) -> NoReturn:
+    """Stores the bars, replacing the ones with the same timestamp, and records the time of the fetch.
+
+    Args:
+        source: Source of the bars.
+        ticker: Stock ticker.
+        interval: Interval of the bars.
+        bars: Bars as tuples of timestamp, open and close.
+        count: Number of the latest bars to keep, the older ones are deleted.
+    """
+    db = connection()
+    with _access, db.connection:
+        cursor = db.connection.cursor()
+        cursor.executemany("INSERT OR REPLACE INTO bars (source, ticker, interval, timestamp, open, close) "
+                           "VALUES (?,?,?,?,?,?);", [(source, ticker, interval, *bar) for bar in bars])
+        # Bars beyond the window that is read are never used again, so the store doesn't grow with every refresh
+        cursor.execute("DELETE FROM bars WHERE source=(?) AND ticker=(?) AND interval=(?) AND timestamp<("
+                       "SELECT timestamp FROM bars WHERE source=(?) AND ticker=(?) AND interval=(?) "
+                       "ORDER BY timestamp DESC LIMIT 1 OFFSET (?))",
+                       (source, ticker, interval, source, ticker, interval, count - 1))
+        cursor.execute("INSERT OR REPLACE INTO fetched (source, ticker, interval, fetched) VALUES (?,?,?,?);",
+                       (source, ticker, interval, time.time()))
+        db.connection.commit()
+
+
+def read(source: str, ticker: str, interval: str, count: int) -> List[Bar]:
+    """Reads the latest bars in the order of time.
+
+    Args:
+        source: Source of the bars.
+        ticker: Stock ticker.
+        interval: Interval of the bars.
+        count: Number of bars to read.
+
+    Returns:
+        List[Bar]:
+        List of bars as tuples of timestamp, open and close.
+    """
+    db = connection()
+    with _access, db.connection:
+        cursor = db.connection.cursor()
+        rows = cursor.execute("SELECT timestamp, open, close FROM bars WHERE source=(?) AND ticker=(?) AND "
+                              "interval=(?) ORDER BY timestamp DESC LIMIT (?)",
+                              (source, ticker, interval, count)).fetchall()
+    return rows[::-1]
+
+
+def history(source: str, ticker: str, interval: str, count: int,
+            fetcher: Callable[[int], Iterable[Bar]], ttl: Union[int, float] = TTL) -> List[Bar]:
+    """Gets the latest bars, fetching only the ones that are newer than the last bar stored.
+
+    Args:
+        source: Source of the bars.
+        ticker: Stock ticker.
+        interval: Interval of the bars.
+        count: Number of bars to get.
+        fetcher: Function that fetches the given number of bars, as tuples of timestamp, open and close.
+        ttl: Seconds since the last fetch, within which the stored bars are returned without a refresh.
+
+    Returns:
+        List[Bar]:
+        List of bars as tuples of timestamp, open and close.
+    """
+    now = time.time()
+    last, fetched = last_fetch(source=source, ticker=ticker, interval=interval)
+    if last is None:
+        store(source=source, ticker=ticker, interval=interval, bars=fetcher(count), count=count)
+    elif now - fetched >= ttl:
+        missing = max(min(count, math.ceil((now - last) / INTERVALS[interval]) + 1), 1)
+        store(source=source, ticker=ticker, interval=interval, bars=fetcher(missing), count=count)
+    return read(source=source, ticker=ticker, interval=interval, count=count)
+
+
+def webull_bars(ticker: str, interval: str = 'm60', count: int = 300) -> pandas.DataFrame:
+    """Gets the latest bars of a ticker from webull, through the store.
+
+    Args:
+        ticker: Stock ticker.
+        interval: Interval of the bars.
+        count: Number of bars to get.
+
+    Returns:
+        pandas.DataFrame:
+        DataFrame of the ``open`` and ``close`` prices, indexed by the local time of each bar like ``get_bars``.
+    """
+
+    def fetcher(missing: int) -> List[Bar]:
+        """Fetches the bars from webull, and converts them to tuples of timestamp, open and close."""
+        dataframe = quotes.client().get_bars(stock=ticker, interval=interval, count=missing, extendTrading=1)
+        index = dataframe.index if dataframe.index.tz else dataframe.index.tz_localize(tz.tzlocal())
+        return list(zip((index.asi8 // 10 ** 9).tolist(), dataframe['open'].tolist(), dataframe['close'].tolist()))
+
+    bars = history(source="webull", ticker=ticker, interval=interval, count=count, fetcher=fetcher)
+    timestamps, opens, closes = zip(*bars) if bars else ((), (), ())
+    index = pandas.to_datetime(list(timestamps), unit='s', utc=True).tz_convert(tz.tzlocal()).tz_localize(None)
+    return pandas.DataFrame(data={'open': opens, 'close': closes}, index=index)
+
+
+def robinhood_closes(rh: Robinhood, ticker: str, interval: str = 'hour') -> List[float]:
+    """Gets the closing prices of a ticker from robinhood for the latest trading day, through the store.
+
+    Args:
+        rh: Authenticated robinhood client.
+        ticker: Stock ticker.
+        interval: Interval of the bars, ``hour`` or ``10minute``.
+
+    Returns:
+        List[float]:
+        List of closing prices rounded to two decimals, in the order of time.
+
+    See Also:
+        - Robinhood returns the bars of a whole day for every request, so the store saves the requests within the TTL
+          rather than the transfer.
+        - Only the bars of the session of the latest bar are returned, so the stored bars of the previous sessions
+          don't leak into the day's prices.
+    """
+
+    def fetcher(_: int) -> List[Bar]:
+        """Fetches a day of bars from robinhood, and converts them to tuples of timestamp, open and close."""
+        historic_data = rh.get_historical_quotes(ticker, interval, 'day')
+        return [(int(datetime.fromisoformat(bar['begins_at'].replace('Z', '+00:00')).timestamp()),
+                 float(bar['open_price']), float(bar['close_price']))
+                for each_item in historic_data['results'] for bar in each_item['historicals']]
+
+    bars = history(source="robinhood", ticker=ticker, interval=interval,
+                   count=math.ceil(86_400 / INTERVALS[interval]), fetcher=fetcher)
+    if not bars:
+        return []
+    session = datetime.fromtimestamp(bars[-1][0], tz=MARKET_TZ).date()
+    return [round(close, 2) for timestamp, _, close in bars
+            if datetime.fromtimestamp(timestamp, tz=MARKET_TZ).date() == session]
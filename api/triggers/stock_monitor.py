@@ -1,52 +1,70 @@
-"""Runs on a cron schedule every 15 minutes during weekdays."""
+"""Runs as a resident job in the API, or on a cron schedule when run as a script."""
 
 import logging
-import math
+import multiprocessing
 import os
 import sys
-from collections import defaultdict
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Dict, NoReturn, Union
+from typing import Dict, Iterable, List, NoReturn, Tuple, Union
 
 import jinja2
 import matplotlib.dates
-import matplotlib.pyplot as plt
+import numpy
+import pandas
 from gmailconnector.send_email import SendEmail
-from webull import webull
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 sys.path.insert(0, os.getcwd())
 
-from api.squire import stockmonitor_squire  # noqa
+from api.modals.settings import stock_monitor  # noqa
+from api.squire import (quotes, scheduler, stockmonitor_squire,  # noqa
+                        timeseries)
+from api.squire.logger import logger as api_logger  # noqa
+from modules.database import database  # noqa
 from modules.models import models  # noqa
 from modules.templates import templates  # noqa
 from modules.utils import support  # noqa
 
 
-def generate_graph(logger: logging.Logger, ticker: str, bars: int = 300) -> Union[str, NoReturn]:
+def generate_graph(ticker: str, bars: int = 300, directory: str = os.curdir) -> Union[str, NoReturn]:
     """Generate historical graph for stock price.
 
     Args:
-        logger: Takes the class ``logging.Logger`` as an argument.
         ticker: Stock ticker.
         bars: Number of bars to be fetched
+        directory: Directory to store the graph.
+
+    Returns:
+        str:
+        Path of the graph, named after the ticker and the number of bars.
+
+    See Also:
+        - Runs in a worker process of ``render_graphs``, so it doesn't log.
 
     References:
         https://stackoverflow.com/a/49729752
     """
-    logger.info(f"Generating price chart for {ticker!r}")
-    dataframe = webull().get_bars(stock=ticker, interval='m60', count=bars, extendTrading=1)  # ~ 1 month
+    dataframe = timeseries.webull_bars(ticker=ticker, interval='m60', count=bars)  # ~ 1 month
     refined = dataframe[['close']]
     if len(refined) == 0:
         refined = dataframe[['open']]
     x = support.matrix_to_flat_list(input_=refined.values.tolist())
     y = [i.to_pydatetime() for i in refined.iloc[:, 0].keys()]
 
-    fig, ax = plt.subplots()
+    fig = Figure()
+    FigureCanvasAgg(figure=fig)  # Renders without a display, and without pyplot's global state
+    ax = fig.subplots()
     ax.plot(y, x)
 
-    plt.title(ticker)
-    plt.xlabel("Timeseries")
-    plt.ylabel("300 bars with 1 hour interval")
+    ax.set_title(ticker)
+    ax.set_xlabel("Timeseries")
+    ax.set_ylabel(f"{bars} bars with 1 hour interval")
 
     if bars > 600:
         ax.xaxis.set_major_locator(matplotlib.dates.YearLocator())
@@ -59,14 +77,153 @@ def generate_graph(logger: logging.Logger, ticker: str, bars: int = 300) -> Unio
         ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter("\n%B"))
         ax.xaxis.set_minor_formatter(matplotlib.dates.DateFormatter("%d"))
 
-    plt.setp(ax.get_xticklabels(), rotation=0, ha="center")
-    plt.grid()
-    graph_file = ticker + ".png"
+    for label in ax.get_xticklabels():
+        label.set(rotation=0, ha="center")
+    ax.grid()
+    graph_file = os.path.join(directory, f"{ticker}_{bars}.png")
     fig.savefig(graph_file, format="png")
     if os.path.isfile(graph_file):
         return graph_file
 
 
+_lock = threading.Lock()
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def graph_pool() -> ProcessPoolExecutor:
+    """Gets the pool that renders the graphs for the current process, creating it on first use.
+
+    Returns:
+        ProcessPoolExecutor:
+        Pool of processes that belongs to the current process.
+
+    See Also:
+        - Workers are spawned, as forking the threads of the API or the monitor can copy a lock that is held.
+        - Pool lives as long as the process, so the workers are started on demand and keep their imports between runs.
+    """
+    pid = os.getpid()
+    with _lock:
+        if not (current := _pools.get(pid)):
+            current = _pools[pid] = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                        mp_context=multiprocessing.get_context("spawn"))
+    return current
+
+
+def discard_pool(executor: ProcessPoolExecutor) -> NoReturn:
+    """Discards a pool that is broken, so that ``graph_pool`` creates a new one.
+
+    Args:
+        executor: Pool to be discarded.
+    """
+    with _lock:
+        if _pools.get(os.getpid()) is executor:
+            del _pools[os.getpid()]
+    executor.shutdown(wait=False)
+
+
+def render_graphs(tickers: Iterable[str], directory: str, logger: logging.Logger,
+                  bars: int = 300) -> Dict[str, str]:
+    """Renders the graph of each distinct ticker once, in the pool of processes.
+
+    Args:
+        tickers: Stock tickers, which can repeat.
+        directory: Directory to store the graphs.
+        logger: Takes the class ``logging.Logger`` as an argument.
+        bars: Number of bars to be fetched for each graph.
+
+    Returns:
+        Dict[str, str]:
+        Dictionary of each ticker and the path of its graph, tickers that failed are left out.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    logger.info(f"Generating price chart for {', '.join(map(repr, tickers))}")
+    graphs = {}
+    executor = graph_pool()
+    try:
+        futures = {ticker: executor.submit(generate_graph, ticker, bars, directory) for ticker in tickers}
+    except BrokenProcessPool as error:
+        logger.error(f"Failed to generate price charts: {error}")
+        discard_pool(executor=executor)
+        return graphs
+    for ticker, future in futures.items():
+        if error := future.exception():
+            logger.error(f"Failed to generate price chart for {ticker!r}: {error}")
+            # A worker that died breaks the pool, so the next run starts with a new one
+            discard_pool(executor=executor) if isinstance(error, BrokenProcessPool) else None
+        elif graph := future.result():
+            graphs[ticker] = graph
+    return graphs
+
+
+# Conditions in the order they are checked, a row is reported for the first one it meets
+CONDITIONS = ("above_maximum", "near_maximum", "below_minimum", "near_minimum")
+
+
+def evaluate(data: List[Tuple[str, str, Union[int, float], Union[int, float], int]],
+             prices: Dict[str, Dict[str, Union[float, str]]]) -> pandas.DataFrame:
+    """Evaluates every alert against the current price of its ticker, as vector operations across all the alerts.
+
+    Args:
+        data: Alerts stored in the database, as tuples of ticker, email, maximum, minimum and correction.
+        prices: Dictionary of each ticker and its price and exchange code, tickers without a price are skipped.
+
+    Returns:
+        pandas.DataFrame:
+        Alerts that were triggered, along with the price, exchange code and the condition that was met.
+    """
+    alerts = numpy.array(data, dtype=object).reshape(-1, len(stock_monitor.user_info))
+    # Price of each alert is looked up once per ticker, and spread to the alerts through the ticker's code
+    codes, tickers = pandas.factorize(alerts[:, 0])
+    price = numpy.array([(prices.get(ticker) or {}).get('price', numpy.nan) for ticker in tickers], dtype=float)[codes]
+    maximum, minimum, correction = (alerts[:, index].astype(float) for index in (2, 3, 4))
+    # Comparisons against a missing price are always false, so those alerts are skipped along with the invalid ones
+    has_max, has_min = maximum != 0, minimum != 0
+    condition = numpy.select(condlist=[
+        has_max & (price >= maximum),
+        has_max & StockMonitor.closest_maximum(price, maximum, correction),
+        has_min & (price <= minimum),
+        has_min & StockMonitor.closest_minimum(price, minimum, correction),
+    ], choicelist=CONDITIONS, default="")
+    rows = numpy.flatnonzero(condition != "")
+    # Columns of the alerts are kept as objects, so the values can be used to delete the entries from the database
+    triggered = pandas.DataFrame(data=alerts[rows], columns=stock_monitor.user_info)
+    triggered['price'] = price[rows]
+    triggered['exchange_code'] = [prices[ticker]['exchange_code'] for ticker in triggered['ticker']]
+    triggered['condition'] = condition[rows]
+    return triggered
+
+
+def describe(alert: pandas.Series) -> str:
+    """Describes a triggered alert as a line of the email.
+
+    Args:
+        alert: Row of a triggered alert.
+
+    Returns:
+        str:
+        HTML text for the alert.
+    """
+    ticker = alert['ticker']
+    ticker_hyperlinked = '<a href="https://www.webull.com/quote/' \
+                         f'{alert["exchange_code"].lower()}-{ticker.lower()}">{ticker}</a>'
+    maximum = support.format_nos(float(alert['max']))
+    minimum = support.format_nos(float(alert['min']))
+    correction = alert['correction']
+    if alert['condition'] == "above_maximum":
+        email_text = f"{ticker_hyperlinked} has increased more than the set value: ${maximum:,}"
+    elif alert['condition'] == "near_maximum":
+        email_text = f"{ticker_hyperlinked} is close (within {correction}% range) to the set " \
+                     f"maximum value: ${maximum:,}"
+    elif alert['condition'] == "below_minimum":
+        email_text = f"{ticker_hyperlinked} has decreased less than the set value: ${minimum:,}"
+    else:
+        email_text = f"{ticker_hyperlinked} is close (within {correction}% range) to the set " \
+                     f"minimum value: ${minimum:,}"
+    return email_text + f"<br>Current price of {ticker_hyperlinked} is ${alert['price']:,}"
+
+
 class StockMonitor:
     """Initiates ``StockMonitor`` to check user entries in database and trigger notification if condition matches.
 
@@ -74,33 +231,16 @@ class StockMonitor:
 
     """
 
-    def __init__(self, logger: logging.Logger):
-        """Gathers user data in stock database, and groups user data by ``ticker`` and ``email``.
+    def __init__(self, logger: logging.Logger,
+                 data: List[Tuple[str, str, Union[int, float], Union[int, float], int]] = None):
+        """Gathers user data in stock database.
 
         Args:
             logger: Takes the class ``logging.Logger`` as an argument.
+            data: Alerts that are already loaded, gathered from the database when not given.
         """
-        self.data = stockmonitor_squire.get_stock_userdata()
-        self.webull = webull()
+        self.data = stockmonitor_squire.get_stock_userdata() if data is None else data
         self.logger = logger
-        self.ticker_grouped = defaultdict(list)
-        self.email_grouped = defaultdict(list)
-
-    def __del__(self):
-        """Removes bin file created by webull client."""
-        os.remove('did.bin') if os.path.isfile('did.bin') else None
-
-    def group_data(self) -> NoReturn:
-        """Groups columns in the database by ticker to check the current prices and by email to send a notification.
-
-        See Also:
-            - For ticker grouping, first value in the list is the ticker, so key will be ticker and the rest are values.
-            - For email grouping, first value among the rest is the email, so key is email and the rest are values.
-        """
-        self.logger.info("Grouping data extracted from database.")
-        for k, *v in self.data:
-            self.ticker_grouped[k].append(tuple(v))
-            self.email_grouped[v[0]].append((k,) + tuple(v[1:]))
 
     def get_prices(self) -> Dict:
         """Get the price of each stock ticker along with the exchange code.
@@ -108,27 +248,21 @@ class StockMonitor:
         Returns:
             dict:
             Returns a dictionary of prices for each ticker and their exchange code and key-value pairs.
+
+        See Also:
+            - Prices are fetched concurrently by the quote service, and shared with the API through its cache.
         """
-        prices = {}
-        for ticker in self.ticker_grouped.keys():
-            prices[ticker] = {}
-            try:
-                price_check = self.webull.get_quote(ticker)
-                if current_price := round(float(price_check.get('close') or price_check.get('open')), 2):
-                    prices[ticker]['price'] = float(current_price)
-                else:
-                    raise ValueError(price_check)
-                if category := price_check.get('disExchangeCode'):
-                    prices[ticker]['exchange_code'] = category
-                else:
-                    raise ValueError(price_check)
-            except ValueError as error:
-                self.logger.error(error)
-                continue
+        prices = {ticker: {} for ticker, *_ in self.data}
+        for ticker, quote in quotes.get_quotes(tickers=prices.keys()).items():
+            if quote['exchange_code']:
+                prices[ticker] = quote
+            else:
+                self.logger.error(f"Exchange code is unavailable for {ticker!r}")
         return prices
 
     @staticmethod
-    def closest_maximum(stock_price: Union[int, float], maximum: Union[int, float], correction: int) -> bool:
+    def closest_maximum(stock_price: Union[int, float, numpy.ndarray], maximum: Union[int, float, numpy.ndarray],
+                        correction: Union[int, numpy.ndarray]) -> Union[bool, numpy.ndarray]:
         """Determines if a stock price is close to the maximum value.
 
         Examples:
@@ -147,12 +281,16 @@ class StockMonitor:
         Returns:
             bool:
             Boolean flag to indicate whether the current stock price is less than set maximum by correction percentage.
+
+        See Also:
+            - Takes scalars or arrays of the same length, in which case an array of flags is returned.
         """
-        max_corrected_amt = math.floor(maximum - (stock_price * correction / 100))
+        max_corrected_amt = numpy.floor(maximum - (stock_price * correction / 100))
         return stock_price >= max_corrected_amt
 
     @staticmethod
-    def closest_minimum(stock_price: Union[int, float], minimum: Union[int, float], correction: int) -> bool:
+    def closest_minimum(stock_price: Union[int, float, numpy.ndarray], minimum: Union[int, float, numpy.ndarray],
+                        correction: Union[int, numpy.ndarray]) -> Union[bool, numpy.ndarray]:
         """Determines if a stock price is close to the minimum value.
 
         Examples:
@@ -171,75 +309,110 @@ class StockMonitor:
         Returns:
             bool:
             Boolean flag to indicate whether the current stock price is more than set maximum by correction percentage.
+
+        See Also:
+            - Takes scalars or arrays of the same length, in which case an array of flags is returned.
         """
-        min_corrected_amt = math.ceil(minimum + (stock_price * correction / 100))
+        min_corrected_amt = numpy.ceil(minimum + (stock_price * correction / 100))
         return stock_price <= min_corrected_amt
 
     def send_notification(self) -> NoReturn:
-        """Sends notification to the user when the stock price matches the requested condition."""
-        if self.data:
-            self.group_data()
-        else:
+        """Sends notification to the user when the stock price matches the requested condition.
+
+        See Also:
+            - Alerts are evaluated together by ``evaluate``, only the triggered ones are grouped by recipient.
+            - Graph of each triggered ticker is rendered once and attached to every email that mentions it.
+        """
+        if not self.data:
             self.logger.info("Database is empty!")
             return
+        if invalid := [entry for entry in self.data if not entry[2] and not entry[3]]:
+            self.logger.error(f"Un-processable without both min and max: {invalid!r}")
+        triggered = evaluate(data=self.data, prices=self.get_prices())
+        if triggered.empty:
+            self.logger.info("Nothing to report")
+            return
         subject = f"Stock Price Alert - {datetime.now().strftime('%c')}"
-        prices = self.get_prices()
-        for k, v in self.email_grouped.items():
-            mail_obj = SendEmail(gmail_user=models.env.open_gmail_user, gmail_pass=models.env.open_gmail_pass)
-            datastore = {'text_gathered': [], 'removals': [], 'attachments': []}  # unique datastore for each user
-            for trigger in v:
-                ticker = trigger[0]
-                maximum = trigger[1]
-                minimum = trigger[2]
-                correction = trigger[3]
-                if not prices[ticker]:
-                    continue
-                ticker_hyperlinked = '<a href="https://www.webull.com/quote/' \
-                                     f'{prices[ticker]["exchange_code"].lower()}-{ticker.lower()}">{ticker}</a>'
-                if not maximum and not minimum:
-                    raise ValueError("Un-processable without both min and max")
-                maximum = support.format_nos(maximum)
-                minimum = support.format_nos(minimum)
-                email_text = ""
-                if maximum and prices[ticker]['price'] >= maximum:
-                    email_text += f"{ticker_hyperlinked} has increased more than the set value: ${maximum:,}"
-                elif maximum and self.closest_maximum(prices[ticker]['price'], maximum, correction):
-                    email_text += f"{ticker_hyperlinked} is close (within {correction}% range) to the set " \
-                                  f"maximum value: ${maximum:,}"
-                elif minimum and prices[ticker]['price'] <= minimum:
-                    email_text += f"{ticker_hyperlinked} has decreased less than the set value: ${minimum:,}"
-                elif minimum and self.closest_minimum(prices[ticker]['price'], minimum, correction):
-                    email_text += f"{ticker_hyperlinked} is close (within {correction}% range) to the set " \
-                                  f"minimum value: ${minimum:,}"
-                if email_text:
-                    email_text += f"<br>Current price of {ticker_hyperlinked} is ${prices[ticker]['price']:,}"
-                    datastore['text_gathered'].append(email_text)
-                    datastore['removals'].append((ticker, k, maximum, minimum, correction))
-                    datastore['attachments'].append(generate_graph(ticker=ticker, logger=self.logger))
-            if not datastore['text_gathered']:
-                self.logger.info("Nothing to report")
-                return
-            template = jinja2.Template(templates.email.stock_alert).render(
-                CONVERTED="<br><br>".join(datastore['text_gathered'])
-            )
-            response = mail_obj.send_email(subject=subject, recipient=k, html_body=template, sender="Jarvis",
-                                           attachment=datastore['attachments'])
-            if response.ok:  # Remove entry if notification was successful
-                self.logger.info(f'Email has been sent to {k!r}')
-                for entry in datastore['removals']:
-                    self.logger.info(f"Removing {entry!r} from database.")
-                    stockmonitor_squire.delete_stock_userdata(data=entry)
-            else:
-                self.logger.error(response.json())
-            [os.remove(stock_graph) for stock_graph in datastore['attachments'] if os.path.isfile(stock_graph)]
+        mail_obj = SendEmail(gmail_user=models.env.open_gmail_user, gmail_pass=models.env.open_gmail_pass)
+        with tempfile.TemporaryDirectory() as directory:
+            graphs = render_graphs(tickers=triggered['ticker'], directory=directory, logger=self.logger)
+            for email, alerts in triggered.groupby('email', sort=False):
+                self.notify(email=email, alerts=alerts, subject=subject, mail_obj=mail_obj,
+                            attachments=[graphs[ticker] for ticker in dict.fromkeys(alerts['ticker'])
+                                         if ticker in graphs])
+
+    def notify(self, email: str, alerts: pandas.DataFrame, subject: str, mail_obj: SendEmail,
+               attachments: List[str]) -> NoReturn:
+        """Sends an email with the alerts triggered for a recipient, and removes the alerts once it is sent.
+
+        Args:
+            email: Email address of the recipient.
+            alerts: Alerts triggered for the recipient.
+            subject: Subject of the email.
+            mail_obj: Email client.
+            attachments: Graphs of the tickers in the alerts.
+        """
+        text_gathered = [describe(alert=alert) for _, alert in alerts.iterrows()]
+        template = jinja2.Template(templates.email.stock_alert).render(CONVERTED="<br><br>".join(text_gathered))
+        response = mail_obj.send_email(subject=subject, recipient=email, html_body=template, sender="Jarvis",
+                                       attachment=attachments)
+        if response.ok:  # Remove entry if notification was successful
+            self.logger.info(f'Email has been sent to {email!r}')
+            for entry in alerts[list(stock_monitor.user_info)].itertuples(index=False, name=None):
+                self.logger.info(f"Removing {entry!r} from database.")
+                stockmonitor_squire.delete_stock_userdata(data=entry)
+        else:
+            self.logger.error(response.json())
+
+
+def monitor() -> NoReturn:
+    """Checks the stock price alerts every interval, with a shorter interval during market hours.
+
+    See Also:
+        - Runs for as long as the API does, so the quote client, the imports and the alerts stay loaded between
+          checks, instead of a cold start for every check.
+        - Alerts are reloaded only when the database was modified, as reported by ``PRAGMA data_version`` on a
+          connection that is used for nothing else.
+    """
+    watcher = database.Database(database=models.fileio.stock_db)
+    stock_monitor_job = StockMonitor(logger=api_logger, data=[])
+    version = None
+    while True:
+        start = time.time()
+        try:
+            with watcher.connection:
+                current = watcher.connection.execute("PRAGMA data_version").fetchone()[0]
+            if current != version:
+                stock_monitor_job.data = stockmonitor_squire.get_stock_userdata()
+                version = current
+                api_logger.debug(f"Loaded {len(stock_monitor_job.data)} stock price alert(s)")
+            stock_monitor_job.send_notification()
+        except Exception as error:  # Monitor should never stop
+            api_logger.error(error)
+        if scheduler.market_hours():
+            interval = models.env.stock_monitor_market_interval
+        else:
+            interval = models.env.stock_monitor_interval
+        time.sleep(max(interval - (time.time() - start), 0))
+
+
+def start_monitor() -> threading.Thread:
+    """Starts the stock monitor in a daemon thread.
+
+    Returns:
+        threading.Thread:
+        Thread running the stock monitor.
+    """
+    thread = threading.Thread(target=monitor, daemon=True)
+    thread.start()
+    return thread
 
 
 if __name__ == '__main__':
-    from executors.crontab import LOG_FILE
     from modules.logger import config
     from modules.logger.custom_logger import logger as main_logger
 
-    config.multiprocessing_logger(filename=LOG_FILE)
+    config.multiprocessing_logger(filename=config.CRON_LOG_FILE)
     for log_filter in main_logger.filters:
         main_logger.removeFilter(filter=log_filter)
     StockMonitor(logger=main_logger).send_notification()
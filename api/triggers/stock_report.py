@@ -1,19 +1,18 @@
 """Runs once during API startup and continues to run in a cron scheduler as per market hours."""
 
 import logging
-import math
 import os
 import sys
 from datetime import datetime
 from typing import NoReturn, Tuple
 
 import jinja2
-import requests
+import pandas
 from pyrh import Robinhood
-from pyrh.exceptions import InvalidTickerSymbol
 
 sys.path.insert(0, os.getcwd())
 
+from api.squire import instruments, quotes, timeseries  # noqa
 from modules.exceptions import EgressErrors  # noqa
 from modules.models import models  # noqa
 from modules.templates import templates  # noqa
@@ -50,69 +49,54 @@ class Investment:
         Returns:
             tuple:
             Returns a tuple of portfolio header, profit, loss, and current profit/loss compared from purchased.
+
+        See Also:
+            - Quotes and instruments of all the positions are fetched concurrently, and the totals are computed
+              across all the positions at once.
         """
-        shares_total, loss_dict, profit_dict = [], {}, {}
-        n, n_ = 0, 0
         self.logger.info('Gathering portfolio.')
-        for data in self.result:
-            shares_count = int(data['quantity'].split('.')[0])
-            if not shares_count:
-                continue
-            n += 1
-            n_ += shares_count
-            share_id = str(data['instrument'].split('/')[-2])
-            try:
-                raw_details = self.rh.get_quote(share_id)
-            except InvalidTickerSymbol as error:
-                if str(error).strip():
-                    self.logger.error(error)
-                continue
-            ticker = (raw_details['symbol'])
-            try:
-                stock_name = requests.get(url=raw_details['instrument']).json()['simple_name']
-            except EgressErrors as error:
-                self.logger.error(error)
-                continue
-            buy = round(float(data['average_buy_price']), 2)
-            total = round(shares_count * float(buy), 2)
-            shares_total.append(total)
-            current = round(float(raw_details['last_trade_price']), 2)
-            current_total = round(shares_count * current, 2)
-            difference = round(float(current_total - total), 2)
-            if difference < 0:
-                loss_dict[ticker] = [
-                    -difference,
-                    f'\n{stock_name}:\n{shares_count:,} shares of <a href="https://robinhood.com/stocks/{ticker}" '
-                    f'target="_bottom">{ticker}</a> at ${buy:,} Currently: ${current:,}\n '
-                    f'Total bought: ${total:,} Current Total: ${current_total:,}'
-                    f'\nLOST ${-difference:,}\n'
-                ]
-            else:
-                profit_dict[ticker] = [
-                    difference,
-                    f'\n{stock_name}:\n{shares_count:,} shares of <a href="https://robinhood.com/stocks/{ticker}" '
-                    f'target="_bottom">{ticker}</a> at ${buy:,} Currently: ${current:,}\n'
-                    f'Total bought: ${total:,} Current Total: ${current_total:,}'
-                    f'\nGained ${difference:,}\n'
-                ]
-
-        profit_output, profit_total, loss_output, loss_total = "", [], "", []
-        for key, value in sorted(profit_dict.items(), reverse=True, key=lambda item: item[1]):
-            profit_output += value[1]
-            profit_total.append(value[0])
-        for key, value in sorted(loss_dict.items(), reverse=True, key=lambda item: item[1]):
-            loss_output += value[1]
-            loss_total.append(value[0])
-
-        port_msg = f'\nTotal Profit: ${round(math.fsum(profit_total), 2):,}\n' \
-                   f'Total Loss: ${round(math.fsum(loss_total), 2):,}\n\n' \
+        positions = [(str(data['instrument'].split('/')[-2]), int(data['quantity'].split('.')[0]),
+                      round(float(data['average_buy_price']), 2)) for data in self.result]
+        positions = [position for position in positions if position[1]]
+        n, n_ = len(positions), sum(shares_count for _, shares_count, _ in positions)
+        # Failed quotes and instruments are logged and left out
+        raw_quotes = quotes.gather(keys=[share_id for share_id, *_ in positions], fetcher=self.rh.get_quote)
+        metadata = instruments.get_instruments(urls=[raw_details['instrument'] for raw_details in raw_quotes.values()])
+        rows = [(raw_quotes[share_id]['symbol'], metadata[raw_quotes[share_id]['instrument']]['name'],
+                 shares_count, buy, round(float(raw_quotes[share_id]['last_trade_price']), 2))
+                for share_id, shares_count, buy in positions
+                if share_id in raw_quotes and raw_quotes[share_id]['instrument'] in metadata]
+        portfolio = pandas.DataFrame(data=rows, columns=["ticker", "stock_name", "shares_count", "buy", "current"])
+        portfolio['total'] = (portfolio['shares_count'] * portfolio['buy']).round(2)
+        portfolio['current_total'] = (portfolio['shares_count'] * portfolio['current']).round(2)
+        portfolio['difference'] = (portfolio['current_total'] - portfolio['total']).round(2)
+        profit = portfolio[portfolio['difference'] >= 0].sort_values(by='difference', ascending=False)
+        loss = portfolio[portfolio['difference'] < 0].sort_values(by='difference')
+        profit_total = round(float(profit['difference'].sum()), 2)
+        loss_total = abs(round(float(loss['difference'].sum()), 2))
+        total_buy = round(float(portfolio['total'].sum()), 2)
+
+        profit_output = "".join(
+            f'\n{row.stock_name}:\n{row.shares_count:,} shares of <a href="https://robinhood.com/stocks/{row.ticker}" '
+            f'target="_bottom">{row.ticker}</a> at ${row.buy:,} Currently: ${row.current:,}\n'
+            f'Total bought: ${row.total:,} Current Total: ${row.current_total:,}'
+            f'\nGained ${row.difference:,}\n' for row in profit.itertuples(index=False)
+        )
+        loss_output = "".join(
+            f'\n{row.stock_name}:\n{row.shares_count:,} shares of <a href="https://robinhood.com/stocks/{row.ticker}" '
+            f'target="_bottom">{row.ticker}</a> at ${row.buy:,} Currently: ${row.current:,}\n '
+            f'Total bought: ${row.total:,} Current Total: ${row.current_total:,}'
+            f'\nLOST ${-row.difference:,}\n' for row in loss.itertuples(index=False)
+        )
+
+        port_msg = f'\nTotal Profit: ${profit_total:,}\n' \
+                   f'Total Loss: ${loss_total:,}\n\n' \
                    'The above values might differ from overall profit/loss if multiple shares ' \
                    'of the stock were purchased at different prices.'
         net_worth = round(float(self.rh.equity()), 2)
         output = f'Total number of stocks purchased: {n:,}\n'
         output += f'Total number of shares owned: {n_:,}\n'
         output += f'\nCurrent value of your total investment is: ${net_worth:,}'
-        total_buy = round(math.fsum(shares_total), 2)
         output += f'\nValue of your total investment while purchase is: ${total_buy:,}'
         total_diff = round(float(net_worth - total_buy), 2)
         if total_diff < 0:
@@ -141,34 +125,22 @@ class Investment:
         """
         r1, r2 = '', ''
         self.logger.info('Gathering watchlist.')
-        watchlist = [self.rh.get_url(item['instrument'])
-                     for item in self.rh.get_url(url='https://api.robinhood.com/watchlists/Default').get('results', [])]
-        if not watchlist:
+        urls = [item['instrument']
+                for item in self.rh.get_url(url='https://api.robinhood.com/watchlists/Default').get('results', [])]
+        if not urls:
             return r1, r2
-        instruments = [data['instrument'] for data in self.result] if strict else []
+        instruments_owned = [data['instrument'] for data in self.result] if strict else []
+        metadata = instruments.get_instruments(urls=urls)
+        watchlist = [metadata[url] for url in urls if url in metadata and url not in instruments_owned]
+        stocks = [item['symbol'] for item in watchlist]
+        # Bars are stored locally, so only the ones since the last report are fetched
+        closes = quotes.gather(keys=stocks, fetcher=lambda stock: timeseries.robinhood_closes(
+            rh=self.rh, ticker=stock, interval='hour' if interval == 'hour' else '10minute'
+        ))
+        raw_quotes = quotes.gather(keys=stocks, fetcher=self.rh.get_quote)
         for item in watchlist:
-            if strict and item['url'] in instruments:
-                continue
-            stock = item['symbol']
-            if interval == 'hour':
-                historic_data = self.rh.get_historical_quotes(stock, 'hour', 'day')
-            else:
-                historic_data = self.rh.get_historical_quotes(stock, '10minute', 'day')
-            historic_results = historic_data['results']
-            numbers = [round(float(close_price['close_price']), 2) for each_item in historic_results
-                       for close_price in each_item['historicals']]
-            if not numbers:
-                return r1, r2
-            try:
-                raw_details = self.rh.get_quote(stock)
-            except InvalidTickerSymbol as error:
-                if str(error).strip():
-                    self.logger.error(error)
-                continue
-            try:
-                stock_name = requests.get(raw_details['instrument']).json()['simple_name']
-            except EgressErrors as error:
-                self.logger.error(error)
+            stock, stock_name = item['symbol'], item['name']
+            if not (numbers := closes.get(stock)) or not (raw_details := raw_quotes.get(stock)):
                 continue
             price = round(float(raw_details['last_trade_price']), 2)
             difference = round(float(price - numbers[-1]), 2)
@@ -216,11 +188,10 @@ class Investment:
 
 
 if __name__ == '__main__':
-    from executors.crontab import LOG_FILE
     from modules.logger import config
     from modules.logger.custom_logger import logger as main_logger
 
-    config.multiprocessing_logger(filename=LOG_FILE)
+    config.multiprocessing_logger(filename=config.CRON_LOG_FILE)
     for log_filter in main_logger.filters:
         main_logger.removeFilter(filter=log_filter)
     Investment(logger=main_logger).report_gatherer()
@@ -0,0 +1,271 @@
+"""Load test for the API gateway, with the executors and the external services replaced by local fakes.
+
+>>> APIGateway
+
+See Also:
+    - Drives ``/offline-communicator``, ``/speech-synthesis``, ``/stock-monitor`` and ``/keywords`` of ``api.fast:app``
+      in-process through an ASGI transport, so the numbers reflect the gateway and not the network.
+    - ``conditions``, the larynx container, webull and gmail are replaced by fakes that sleep for a fixed latency,
+      so blocking calls made from within the event loop show up as queueing in the percentiles.
+    - Databases and the speech synthesis file are redirected to a temporary directory, leaving ``fileio`` untouched.
+    - Startup events are not triggered, so the NASDAQ scrape and the robinhood gatherer do not run.
+    - Each endpoint is measured on its own, followed by a mixed run that interleaves all the endpoints.
+
+Usage:
+    python benchmarks/api_gateway.py [--concurrency 16] [--requests 200] [--latency 0.05] [--output report.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import wave
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, NoReturn, Tuple
+from unittest import mock
+
+import httpx
+import jwt
+
+sys.path.insert(0, os.getcwd())
+
+from api import fast  # noqa
+from api.modals.settings import stock_monitor, stock_monitor_helper  # noqa
+from api.routers import stock_monitor as stock_monitor_router  # noqa
+from api.squire import quotes, session, stockmonitor_squire, tickers  # noqa
+from executors import offline  # noqa
+from modules.audio import speaker  # noqa
+from modules.database import database  # noqa
+from modules.metrics import tracing  # noqa
+from modules.models import models  # noqa
+from modules.offline import cache  # noqa
+
+COMMANDS = ["what's the weather", "what is the time", "turn on the lights",
+            "what's the weather and what is the time"]
+TICKER = "JRVS"
+VERIFIED_EMAIL = "benchmark@example.com"
+VERIFIED_OTP = "benchmark-otp"
+
+Request = Tuple[str, str, Dict[str, Any]]
+
+
+def silent_wav(seconds: float = 0.5, rate: int = 16_000) -> bytes:
+    """Generates a silent mono WAV, to be served by the fake larynx container.
+
+    Args:
+        seconds: Duration of the audio.
+        rate: Sample rate of the audio.
+
+    Returns:
+        bytes:
+        Content of the WAV file.
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(rate)
+        file.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def fakes(latency: float, directory: str) -> contextlib.ExitStack:
+    """Replaces the executors, external services and databases with deterministic local fakes.
+
+    Args:
+        latency: Seconds each fake takes to respond.
+        directory: Temporary directory for the databases and the speech synthesis file.
+
+    Returns:
+        contextlib.ExitStack:
+        Stack of patches, which restores the originals when closed.
+    """
+    audio = silent_wav()
+
+    def conditions(phrase: str, should_return: bool = False) -> NoReturn:
+        """Fakes the intent handlers by responding through the speaker, like every handler does."""
+        time.sleep(latency)
+        speaker.speak(text=f"Benchmark response for {phrase}")
+
+    def larynx(**kwargs) -> SimpleNamespace:
+        """Fakes the POST call to the larynx container."""
+        time.sleep(latency)
+        return SimpleNamespace(ok=True, status_code=200, content=audio)
+
+    class Webull:
+        """Fakes the webull client with a fixed price."""
+
+        def get_quote(self, stock: str) -> Dict[str, str]:
+            """Returns the same quote for any ticker."""
+            time.sleep(latency)
+            return {"close": "100.0", "open": "99.0", "symbol": stock}
+
+    class SendEmail:
+        """Fakes the gmail connector."""
+
+        def __init__(self, **kwargs):
+            """Ignores the credentials."""
+
+        def send_email(self, **kwargs) -> SimpleNamespace:
+            """Pretends to send the email."""
+            time.sleep(latency)
+            return SimpleNamespace(ok=True, body="Email sent")
+
+    stock_db = database.Database(database=os.path.join(directory, "stock.db"))
+    stock_db.create_table(table_name="stock", columns=stock_monitor.user_info)
+    cache_db = database.Database(database=os.path.join(directory, "cache.db"))
+    cache_db.create_table(table_name="responses", columns=cache.COLUMNS)
+    quote_db = database.Database(database=os.path.join(directory, "quotes.db"))
+    quote_db.create_table(table_name="quotes", columns=quotes.COLUMNS)
+
+    stack = contextlib.ExitStack()
+    stack.enter_context(mock.patch.object(offline, "conditions", conditions))
+    stack.enter_context(mock.patch.object(speaker, "requests", SimpleNamespace(post=larynx)))
+    stack.enter_context(mock.patch.object(quotes, "client", Webull))
+    stack.enter_context(mock.patch.object(quotes, "quote_db", quote_db))
+    stack.enter_context(mock.patch.object(stock_monitor_router, "SendEmail", SendEmail))
+    stack.enter_context(mock.patch.object(stock_monitor_router, "validate_email",
+                                          lambda **kwargs: SimpleNamespace(ok=True, body="Valid email")))
+    stack.enter_context(mock.patch.object(stockmonitor_squire, "stock_db", stock_db))
+    stack.enter_context(mock.patch.object(cache, "cache_db", cache_db))
+    stack.enter_context(mock.patch.object(session, "store",
+                                          session.SessionStore(database_file=os.path.join(directory, "session.db"))))
+    stack.enter_context(mock.patch.object(models.fileio, "speech_synthesis_wav",
+                                          os.path.join(directory, "speech_synthesis.wav")))
+    stack.enter_context(mock.patch.object(stock_monitor, "stock_list", tickers.TickerIndex.from_symbols([TICKER])))
+    return stack
+
+
+def workloads() -> Dict[str, Callable[[int], Request]]:
+    """Builds the request for each endpoint, from the index of the request.
+
+    Returns:
+        Dict[str, Callable[[int], Request]]:
+        Dictionary of the endpoint and a function that returns the method, path and keyword arguments of a request.
+    """
+    auth = {"Authorization": f"Bearer {models.env.offline_pass}"}
+    stock_monitor_helper.otp_sent.set(key=VERIFIED_EMAIL, value=VERIFIED_OTP, ttl=3_600)
+
+    def stock_request(index: int) -> Request:
+        """Alternates between adding an entry for a verified email and requesting an OTP for a new email."""
+        if index % 2:
+            return "POST", "/stock-monitor", {"json": {"email": f"benchmark{index}@example.com", "request": "GET",
+                                                       "token": None}}
+        token = jwt.encode(payload={"Ticker": TICKER, "Max": str(1_000 + index), "Min": "10", "Correction": "5"},
+                           key="benchmark", algorithm="HS256")
+        return "POST", "/stock-monitor", {"json": {"email": VERIFIED_EMAIL, "request": "PUT", "token": token},
+                                          "headers": {"email-otp": VERIFIED_OTP}}
+
+    return {
+        "offline-communicator": lambda index: ("POST", "/offline-communicator",
+                                               {"json": {"command": COMMANDS[index % len(COMMANDS)]},
+                                                "headers": auth}),
+        "speech-synthesis": lambda index: ("POST", "/speech-synthesis",
+                                           {"json": {"text": f"Benchmark sentence number {index}"}, "headers": auth}),
+        "stock-monitor": stock_request,
+        "keywords": lambda index: ("GET", "/keywords", {"headers": auth}),
+    }
+
+
+async def drive(client: httpx.AsyncClient, name: str, builder: Callable[[int], Request],
+                total: int, concurrency: int) -> Dict[str, Any]:
+    """Sends requests with a fixed number of concurrent workers and summarizes the latencies.
+
+    Args:
+        client: Client bound to the application.
+        name: Name of the run.
+        builder: Function that returns the method, path and keyword arguments of each request.
+        total: Number of requests to be sent.
+        concurrency: Number of requests in flight at any time.
+
+    Returns:
+        Dict[str, Any]:
+        Dictionary of the request count, error rate, throughput, latency percentiles and status codes.
+    """
+    indices = iter(range(total))
+    latencies, statuses = [], Counter()
+
+    async def worker() -> NoReturn:
+        """Sends the next request until there are none left."""
+        for index in indices:
+            method, path, kwargs = builder(index)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method=method, url=path, **kwargs)
+                statuses[response.status_code] += 1
+            except Exception as error:
+                statuses[type(error).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status != 200)
+    return {
+        "endpoint": name,
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0,
+        "p50_ms": round(tracing.percentile(latencies, 50) * 1_000, 2),
+        "p95_ms": round(tracing.percentile(latencies, 95) * 1_000, 2),
+        "p99_ms": round(tracing.percentile(latencies, 99) * 1_000, 2),
+        "status": {str(status): count for status, count in statuses.items()},
+    }
+
+
+async def run(endpoints: List[str], total: int, concurrency: int) -> List[Dict[str, Any]]:
+    """Measures each endpoint on its own, followed by a mixed run of all of them.
+
+    Args:
+        endpoints: Endpoints to be measured.
+        total: Number of requests for each run.
+        concurrency: Number of requests in flight at any time.
+
+    Returns:
+        List[Dict[str, Any]]:
+        Summary of each run.
+    """
+    builders = workloads()
+    selected = [builders[endpoint] for endpoint in endpoints]
+    rotation = itertools.cycle(selected)
+    transport = httpx.ASGITransport(app=fast.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        results = [await drive(client=client, name=endpoint, builder=builders[endpoint],
+                               total=total, concurrency=concurrency) for endpoint in endpoints]
+        if len(selected) > 1:
+            results.append(await drive(client=client, name="mixed", builder=lambda index: next(rotation)(index),
+                                       total=total * len(selected), concurrency=concurrency))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test for the API gateway with local fakes.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at any time.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests sent to each endpoint.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds each fake takes to respond.")
+    parser.add_argument("--endpoints", nargs="+", default=["offline-communicator", "speech-synthesis",
+                                                           "stock-monitor", "keywords"],
+                        choices=["offline-communicator", "speech-synthesis", "stock-monitor", "keywords"])
+    parser.add_argument("--output", help="File to store the report, printed when not set.")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir, fakes(latency=args.latency, directory=tmp_dir):
+        report = {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "fake_latency": args.latency,
+            "results": asyncio.run(run(endpoints=args.endpoints, total=args.requests, concurrency=args.concurrency)),
+        }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,119 @@
+"""Compares the per-minute re-parse of crontab entries with the precompiled batch evaluation.
+
+>>> CronEngine
+
+See Also:
+    - ``reparse``: Creates a ``CronExpression`` for every entry each minute and calls ``check_trigger`` on the
+      context sensitive path, which is how ``background_tasks`` evaluated crontab entries before.
+    - ``batch``: Precompiles all the entries into a ``CronBatch`` once and checks each minute in a single pass.
+    - ``next_fire``: Computes the next fire of every entry from each hour of the simulated day.
+
+Usage:
+    python benchmarks/cron_engine.py [number of expressions] [number of minutes]
+"""
+
+import datetime
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.getcwd())
+
+from modules.crontab.expression import CronBatch, CronExpression  # noqa
+
+
+def synthetic_expressions(count: int, seed: int = 0) -> List[str]:
+    """Generates random, but valid crontab entries.
+
+    Args:
+        count: Number of entries to be generated.
+        seed: Seed for the random generator, to keep runs comparable.
+
+    Returns:
+        list:
+        List of crontab entries.
+    """
+    rand = random.Random(seed)
+
+    def field(low: int, high: int) -> str:
+        """Generates a random value for a field within its range."""
+        choice = rand.random()
+        if choice < 0.3:
+            return "*"
+        if choice < 0.5:
+            return str(rand.randint(low, high))
+        if choice < 0.7:
+            start = rand.randint(low, high)
+            return f"{start}-{rand.randint(start, high)}"
+        if choice < 0.85:
+            return f"*/{rand.randint(1, high)}"
+        return ",".join(sorted({str(rand.randint(low, high)) for _ in range(3)}, key=int))
+
+    return [f"{field(0, 59)} {field(0, 23)} {field(1, 28)} {field(1, 12)} {field(0, 6)} echo {index}"
+            for index in range(count)]
+
+
+def reparse(expressions: List[str], minutes: List[tuple]) -> int:
+    """Re-parses every entry for each minute and checks the trigger without the precompiled bitmasks."""
+    fired = 0
+    for date_tuple in minutes:
+        for line in expressions:
+            job = CronExpression(line=line)
+            job.static = False  # Forces the context sensitive path that was used for all entries before
+            fired += job.check_trigger(date_tuple)
+    return fired
+
+
+def batch(expressions: List[str], minutes: List[tuple]) -> int:
+    """Precompiles every entry once and checks all of them for each minute in a single pass."""
+    cron_batch = CronBatch(expressions=expressions)
+    return sum(bin(cron_batch.check_triggers(date_tuple)).count("1") for date_tuple in minutes)
+
+
+def next_fire(expressions: List[str], minutes: List[tuple]) -> int:
+    """Computes the next fire of every entry at the start of each hour within the given minutes."""
+    jobs = [CronExpression(line=line) for line in expressions]
+    found = 0
+    for year, month, day, hour, mins in minutes:
+        if mins:
+            continue
+        after = datetime.datetime(year, month, day, hour, mins)
+        found += sum(1 for job in jobs if job.next_fire(after=after))
+    return found
+
+
+def measure(function: Callable, expressions: List[str], minutes: List[tuple]) -> Dict[str, float]:
+    """Runs a strategy and returns the elapsed time, along with the count it returned.
+
+    Args:
+        function: Strategy to be measured.
+        expressions: Crontab entries.
+        minutes: Date tuples for each minute to be evaluated.
+
+    Returns:
+        dict:
+        Dictionary of the strategy name, result, elapsed seconds and microseconds per evaluated minute.
+    """
+    start = time.perf_counter()
+    result = function(expressions, minutes)
+    elapsed = time.perf_counter() - start
+    return {"strategy": function.__name__, "result": result, "seconds": round(elapsed, 4),
+            "per_minute_us": round(elapsed / len(minutes) * 1_000_000, 2)}
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    span = int(sys.argv[2]) if len(sys.argv) > 2 else 1_440
+    lines = synthetic_expressions(count=count)
+    begin = datetime.datetime(2023, 1, 2)
+    dates = [(begin + datetime.timedelta(minutes=m)).timetuple()[:5] for m in range(span)]
+    print(f"Expressions: {count}\tMinutes: {span}")
+    results = [measure(strategy, lines, dates) for strategy in (reparse, batch, next_fire)]
+    for each in results:
+        print(f"{each['strategy']:<10} {each['seconds']:>10}s {each['per_minute_us']:>14}us/minute "
+              f"result: {each['result']}")
+    if results[0]["result"] != results[1]["result"]:
+        raise AssertionError("Batch evaluation does not match the re-parse.")
+    print(f"Speedup: {round(results[0]['seconds'] / results[1]['seconds'], 1)}x")
@@ -0,0 +1,249 @@
+"""Micro-benchmark for the intent dispatch in ``conditions``, replayed over real and synthetic phrase corpora.
+
+>>> Dispatch
+
+See Also:
+    - ``synthetic``: Phrases checked in at ``benchmarks/corpus/dispatch.yaml``, labeled with the intent they should
+      be routed to.
+    - ``training_data``: Phrases that were once unrecognized, stored in ``fileio/training_data.yaml`` by
+      ``unrecognized_dumper``. These are unlabeled, so the ones that are routed now are only counted.
+    - ``samples``: Every keyword of every list used in ``conditions``, labeled with the name of its list. A mismatch
+      here means the keyword is shadowed by a branch earlier in the chain, or needs a second condition to route.
+    - Every handler called by ``conditions`` is replaced with a no-op recorder, so the timings are of the dispatch
+      alone, and the intent is the one recorded by ``modules.metrics.dispatch`` for each phrase.
+    - A different router can be compared against the chain with ``--router module:function``, where the function
+      takes a phrase and returns the name of the intent or None.
+
+Usage:
+    python benchmarks/dispatch.py [--repeat 5] [--router module:function] [--output report.json]
+"""
+
+import argparse
+import contextlib
+import importlib
+import inspect
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple, Union
+from unittest import mock
+
+import yaml
+
+sys.path.insert(0, os.getcwd())
+
+from _preexec import keywords_handler  # noqa
+from executors import conditions as conditions_mod  # noqa
+from executors import controls  # noqa
+from executors.word_match import word_match  # noqa
+from modules.conditions import conversation  # noqa
+from modules.conditions import keywords as keywords_mod  # noqa
+from modules.exceptions import StopSignal  # noqa
+from modules.metrics import dispatch  # noqa
+from modules.metrics import tracing  # noqa
+from modules.models import models  # noqa
+
+CORPUS = os.path.join("benchmarks", "corpus", "dispatch.yaml")
+UNRECOGNIZED = "unrecognized"
+
+Phrase = Tuple[str, Union[str, None]]
+
+
+def chain() -> List[Tuple[str, List[str]]]:
+    """Gets the keyword lists checked by ``conditions``, in the order of the branches.
+
+    Returns:
+        List[Tuple[str, List[str]]]:
+        List of the name of each keyword list and its keywords.
+    """
+    source = inspect.getsource(inspect.unwrap(conditions_mod.conditions))
+    lists = {}
+    for module, name in re.findall(r"match_list=(keywords|conversation)\.(\w+)", source):
+        if name in dispatch.IGNORED or name in lists:
+            continue
+        lists[name] = getattr(keywords_mod.keywords if module == "keywords" else conversation, name)
+    return list(lists.items())
+
+
+def corpora() -> Dict[str, List[Phrase]]:
+    """Loads the phrases to be replayed, along with the intent each one is expected to be routed to.
+
+    Returns:
+        Dict[str, List[Phrase]]:
+        Dictionary of each corpus and the list of phrases with their expected intent, None when unlabeled.
+    """
+    with open(CORPUS) as file:
+        synthetic = yaml.load(stream=file, Loader=yaml.FullLoader) or {}
+    training_data = {}
+    if os.path.isfile(models.fileio.training_data):
+        with open(models.fileio.training_data) as file:
+            training_data = yaml.load(stream=file, Loader=yaml.FullLoader) or {}
+    return {
+        "synthetic": [(phrase, intent) for intent, phrases in synthetic.items() for phrase in phrases],
+        "training_data": [(phrase, None) for entries in training_data.values() for phrase in entries.values()
+                          if isinstance(phrase, str)],
+        "samples": [(keyword, name) for name, match_list in chain() for keyword in match_list],
+    }
+
+
+def no_ops(calls: Counter) -> contextlib.ExitStack:
+    """Replaces every handler called by ``conditions`` with a function that only counts the call.
+
+    Args:
+        calls: Counter to store the number of calls made to each handler.
+
+    Returns:
+        contextlib.ExitStack:
+        Stack of patches, which restores the originals when closed.
+    """
+
+    def recorder(name: str) -> Callable:
+        """Creates a no-op handler for the given name."""
+
+        def handler(*args, **kwargs) -> None:
+            """Counts the call and does nothing else."""
+            calls[name] += 1
+
+        return handler
+
+    stack = contextlib.ExitStack()
+    for name, value in vars(conditions_mod).items():
+        if name in ("conditions", "word_match") or not inspect.isfunction(value) or \
+                value.__module__ == conditions_mod.__name__:
+            continue
+        stack.enter_context(mock.patch.object(conditions_mod, name, recorder(name=name)))
+    stack.enter_context(mock.patch.object(conditions_mod, "controls", SimpleNamespace(**{
+        name: recorder(name=f"controls.{name}") for name, value in vars(controls).items()
+        if inspect.isfunction(value) and value.__module__ == controls.__name__
+    })))
+    stack.enter_context(mock.patch.object(conditions_mod, "Thread",
+                                          lambda **kwargs: SimpleNamespace(start=recorder(name="Thread"))))
+    return stack
+
+
+def route(phrase: str) -> Tuple[str, float]:
+    """Dispatches a phrase through ``conditions``.
+
+    Args:
+        phrase: Phrase to be dispatched.
+
+    Returns:
+        Tuple[str, float]:
+        Tuple of the intent the phrase was routed to, and the seconds taken to find it.
+    """
+    with dispatch.observe() as observed:
+        try:
+            conditions_mod.conditions(phrase=phrase, should_return=True)
+        except StopSignal:
+            pass
+    if not observed:  # Phrase was handled before the chain, like the abusive check
+        return UNRECOGNIZED, 0
+    last = observed[-1]
+    if last.intent:
+        return last.intent, last.matched - last.start
+    return UNRECOGNIZED, last.end - last.start
+
+
+def load_router(target: str) -> Callable[[str], Union[str, None]]:
+    """Imports a router to be compared with the chain.
+
+    Args:
+        target: Router in the form of ``module:function``.
+
+    Returns:
+        Callable[[str], Union[str, None]]:
+        Function that takes a phrase and returns the name of the intent or None.
+    """
+    module, _, function = target.partition(":")
+    return getattr(importlib.import_module(module), function)
+
+
+def run(repeat: int, router: Callable[[str], Union[str, None]] = None) -> Dict[str, Any]:
+    """Replays every corpus through ``conditions`` and optionally through a different router.
+
+    Args:
+        repeat: Number of times each phrase is dispatched, the median is used for the per-phrase latency.
+        router: Router to be compared against the chain.
+
+    Returns:
+        Dict[str, Any]:
+        Dictionary of the throughput, per-branch latency, worst-case phrases and routing differences.
+    """
+    lists = chain()
+    phrases = corpora()
+    calls = Counter()
+    routed: Dict[str, Tuple[str, str, Union[str, None]]] = {}
+    per_branch: Dict[str, List[float]] = {}
+    per_phrase: Dict[str, float] = {}
+
+    with no_ops(calls=calls):
+        start = time.perf_counter()
+        for corpus, entries in phrases.items():
+            for phrase, expected in entries:
+                latencies = []
+                for _ in range(repeat):
+                    intent, elapsed = route(phrase=phrase)
+                    latencies.append(elapsed)
+                latencies.sort()
+                per_phrase[phrase] = latencies[len(latencies) // 2]
+                per_branch.setdefault(intent, []).extend(latencies)
+                routed[phrase] = (corpus, intent, expected)
+        elapsed = time.perf_counter() - start
+    dispatched = sum(len(entries) for entries in phrases.values()) * repeat
+
+    every_phrase = [phrase for entries in phrases.values() for phrase, _ in entries]
+    start = time.perf_counter()
+    for phrase in every_phrase:
+        for _, match_list in lists:
+            word_match(phrase=phrase, match_list=match_list)
+    match_elapsed = time.perf_counter() - start
+
+    order = [name for name, _ in lists if name in per_branch] + \
+        sorted(name for name in per_branch if name not in dict(lists))
+    report = {
+        "repeat": repeat,
+        "corpora": {corpus: len(entries) for corpus, entries in phrases.items()},
+        "conditions_per_sec": round(dispatched / elapsed, 2) if elapsed else 0,
+        "word_match_per_sec": round(len(every_phrase) * len(lists) / match_elapsed, 2) if match_elapsed else 0,
+        "branches": {name: {"phrases": len(per_branch[name]) // repeat,
+                            "p50_us": round(tracing.percentile(per_branch[name], 50) * 1e6, 2),
+                            "p95_us": round(tracing.percentile(per_branch[name], 95) * 1e6, 2)} for name in order},
+        "worst_case": [{"phrase": phrase, "intent": routed[phrase][1], "us": round(seconds * 1e6, 2)}
+                       for phrase, seconds in sorted(per_phrase.items(), key=lambda item: -item[1])[:5]],
+        "mismatches": [{"corpus": corpus, "phrase": phrase, "expected": expected, "routed": intent}
+                       for phrase, (corpus, intent, expected) in routed.items()
+                       if expected is not None and intent != expected],
+        "training_data_routed": sum(1 for corpus, intent, _ in routed.values()
+                                    if corpus == "training_data" and intent != UNRECOGNIZED),
+        "handler_calls": dict(calls.most_common()),
+    }
+    if router:
+        start = time.perf_counter()
+        compared = {phrase: router(phrase) or UNRECOGNIZED for phrase in routed}
+        router_elapsed = time.perf_counter() - start
+        report["router"] = {
+            "phrases_per_sec": round(len(compared) / router_elapsed, 2) if router_elapsed else 0,
+            "differences": [{"corpus": corpus, "phrase": phrase, "expected": expected, "chain": intent,
+                             "router": compared[phrase]}
+                            for phrase, (corpus, intent, expected) in routed.items() if compared[phrase] != intent],
+        }
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Micro-benchmark for the intent dispatch in conditions.")
+    parser.add_argument("--repeat", type=int, default=5, help="Times each phrase is dispatched.")
+    parser.add_argument("--router", help="Router to compare against the chain, as module:function.")
+    parser.add_argument("--output", help="File to store the report, printed when not set.")
+    args = parser.parse_args()
+    keywords_handler.rewrite_keywords()
+    result = run(repeat=args.repeat, router=load_router(target=args.router) if args.router else None)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
@@ -0,0 +1,186 @@
+"""Benchmark for the alert evaluation of ``StockMonitor``, over synthetic alerts and prices.
+
+>>> StockAlerts
+
+See Also:
+    - ``legacy``: Walks the alerts grouped by email and checks each one in Python, the way ``send_notification``
+      evaluated them before ``evaluate`` was introduced.
+    - ``vectorized``: Evaluates all the alerts at once with ``evaluate``, which is what ``send_notification`` uses.
+    - Both are checked to trigger the same alerts with the same conditions, the differences are reported.
+    - Neither fetches prices nor sends emails, so the timings are of the evaluation alone.
+
+Usage:
+    python benchmarks/stock_alerts.py [--alerts 100000] [--tickers 500] [--repeat 5] [--output report.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Set, Tuple, Union
+
+sys.path.insert(0, os.getcwd())
+
+from api.triggers.stock_monitor import evaluate  # noqa
+
+Alert = Tuple[str, str, Union[int, float], Union[int, float], int]
+Prices = Dict[str, Dict[str, Union[float, str]]]
+Triggered = Set[Tuple[Alert, str]]
+
+
+def synthetic(alerts: int, tickers: int, seed: int) -> Tuple[List[Alert], Prices]:
+    """Generates alerts around the prices of random tickers.
+
+    Args:
+        alerts: Number of alerts to generate.
+        tickers: Number of distinct tickers.
+        seed: Seed for the random generator, so runs are comparable.
+
+    Returns:
+        Tuple[List[Alert], Prices]:
+        Tuple of the alerts and the price of each ticker.
+
+    See Also:
+        - Maximum and minimum are set within 50% of the price, with either one left as 0 for a fifth of the alerts.
+        - A few tickers are left without a price, like the ones that fail the price check.
+    """
+    generator = random.Random(seed)
+    symbols = [f"T{index:04d}" for index in range(tickers)]
+    prices = {symbol: {'price': round(generator.uniform(1, 1_000), 2), 'exchange_code': "NASDAQ"}
+              for symbol in symbols}
+    for symbol in generator.sample(symbols, k=max(tickers // 100, 1)):
+        prices[symbol] = {}
+    emails = [f"user{index}@example.com" for index in range(max(alerts // 20, 1))]
+    data = []
+    for _ in range(alerts):
+        symbol = generator.choice(symbols)
+        price = prices[symbol].get('price') or generator.uniform(1, 1_000)
+        maximum = round(price * generator.uniform(1.0, 1.5), 2)
+        minimum = round(price * generator.uniform(0.5, 1.0), 2)
+        if (chance := generator.random()) < 0.1:
+            maximum = 0
+        elif chance < 0.2:
+            minimum = 0
+        data.append((symbol, generator.choice(emails), maximum, minimum, generator.randint(0, 10)))
+    return data, prices
+
+
+def legacy(data: List[Alert], prices: Prices) -> Triggered:
+    """Evaluates the alerts one at a time, grouped by email.
+
+    Args:
+        data: Alerts to be evaluated.
+        prices: Price of each ticker.
+
+    Returns:
+        Triggered:
+        Set of the alerts that were triggered along with their condition.
+    """
+    email_grouped = defaultdict(list)
+    for ticker, email, *values in data:
+        email_grouped[email].append((ticker, email, *values))
+    triggered = set()
+    for email, alerts in email_grouped.items():
+        for alert in alerts:
+            ticker, _, maximum, minimum, correction = alert
+            if not prices[ticker] or (not maximum and not minimum):
+                continue
+            price = prices[ticker]['price']
+            if maximum and price >= maximum:
+                triggered.add((alert, "above_maximum"))
+            elif maximum and price >= math.floor(maximum - (price * correction / 100)):
+                triggered.add((alert, "near_maximum"))
+            elif minimum and price <= minimum:
+                triggered.add((alert, "below_minimum"))
+            elif minimum and price <= math.ceil(minimum + (price * correction / 100)):
+                triggered.add((alert, "near_minimum"))
+    return triggered
+
+
+def vectorized(data: List[Alert], prices: Prices) -> Triggered:
+    """Evaluates the alerts with ``evaluate``.
+
+    Args:
+        data: Alerts to be evaluated.
+        prices: Price of each ticker.
+
+    Returns:
+        Triggered:
+        Set of the alerts that were triggered along with their condition.
+    """
+    frame = evaluate(data=data, prices=prices)
+    columns = ["ticker", "email", "max", "min", "correction"]
+    return set(zip(frame[columns].itertuples(index=False, name=None), frame['condition']))
+
+
+def timed(func: Callable[[List[Alert], Prices], Triggered], data: List[Alert], prices: Prices,
+          repeat: int) -> Tuple[Triggered, List[float]]:
+    """Runs an evaluation repeatedly.
+
+    Args:
+        func: Evaluation to be run.
+        data: Alerts to be evaluated.
+        prices: Price of each ticker.
+        repeat: Number of runs.
+
+    Returns:
+        Tuple[Triggered, List[float]]:
+        Tuple of the alerts triggered in the last run, and the sorted seconds taken by each run.
+    """
+    elapsed = []
+    result = set()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data, prices)
+        elapsed.append(time.perf_counter() - start)
+    return result, sorted(elapsed)
+
+
+def run(alerts: int, tickers: int, repeat: int, seed: int) -> Dict[str, Any]:
+    """Compares the legacy and the vectorized evaluation over the same synthetic alerts.
+
+    Args:
+        alerts: Number of alerts to generate.
+        tickers: Number of distinct tickers.
+        repeat: Number of runs of each evaluation, the median is reported.
+        seed: Seed for the random generator.
+
+    Returns:
+        Dict[str, Any]:
+        Dictionary of the timings and the differences between the two.
+    """
+    data, prices = synthetic(alerts=alerts, tickers=tickers, seed=seed)
+    report = {"alerts": alerts, "tickers": tickers, "repeat": repeat}
+    results = {}
+    for name, func in (("legacy", legacy), ("vectorized", vectorized)):
+        results[name], elapsed = timed(func=func, data=data, prices=prices, repeat=repeat)
+        median = elapsed[len(elapsed) // 2]
+        report[name] = {"median_ms": round(median * 1e3, 2), "min_ms": round(elapsed[0] * 1e3, 2),
+                        "alerts_per_sec": round(alerts / median, 2) if median else 0,
+                        "triggered": len(results[name])}
+    if report["vectorized"]["median_ms"]:
+        report["speedup"] = round(report["legacy"]["median_ms"] / report["vectorized"]["median_ms"], 2)
+    report["differences"] = [{"alert": list(alert), "condition": condition, "only_in": name}
+                             for name, other in (("legacy", "vectorized"), ("vectorized", "legacy"))
+                             for alert, condition in sorted(results[name] - results[other])][:20]
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark for the alert evaluation of StockMonitor.")
+    parser.add_argument("--alerts", type=int, default=100_000, help="Number of synthetic alerts.")
+    parser.add_argument("--tickers", type=int, default=500, help="Number of distinct tickers.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each evaluation.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic alerts.")
+    parser.add_argument("--output", help="File to store the report, printed when not set.")
+    args = parser.parse_args()
+    result = run(alerts=args.alerts, tickers=args.tickers, repeat=args.repeat, seed=args.seed)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
@@ -0,0 +1,309 @@
+"""Replays recorded WAV files through the frame path of ``Activator.start``, without a microphone.
+
+>>> WakeWord
+
+See Also:
+    - Each frame goes through ``convert``, ``detect`` and ``housekeeping`` of the ``Activator``, which are timed
+      separately, so the overhead of reloading the keywords and checking for restart and stop requests shows up
+      next to the detector itself. Limited mode skips the housekeeping, so only the first two stages apply there.
+    - CPU time is measured per thread, and the real-time factor is the wall time taken over the duration of audio.
+    - Allocations are measured in a second pass with ``tracemalloc``, as the peak bytes allocated within each stage.
+    - Restart and stop requests are checked against a temporary database, so the replay can neither consume nor act
+      on a request meant for a running instance.
+    - Labels are the timestamps (in seconds) where the wake word ends in each file, a detection within the tolerance
+      of a label is a hit. Files labeled with an empty list are negatives, files that are not labeled are only
+      reported with their detections.
+    - WAV files should be 16-bit mono, recorded at the sample rate of the detector (16 kHz).
+
+Usage:
+    python benchmarks/wake_word.py recordings/ [--labels labels.yaml] [--sensitivity 0.3 0.5 0.7] [--output report.json]
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+from unittest import mock
+
+import yaml
+
+sys.path.insert(0, os.getcwd())
+
+import jarvis  # noqa
+from modules.database import database  # noqa
+from modules.metrics import tracing  # noqa
+from modules.models import models  # noqa
+from modules.utils import support  # noqa
+
+STAGES = ("convert", "detect", "housekeeping")
+
+
+def wav_files(paths: List[str]) -> List[str]:
+    """Gets the WAV files from the given files and directories.
+
+    Args:
+        paths: Files or directories with WAV files.
+
+    Returns:
+        List[str]:
+        Sorted list of WAV files.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "*.wav")))
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def read_frames(filename: str, frame_length: int, sample_rate: int) -> List[bytes]:
+    """Reads a WAV file in frames of the length the detector takes, the partial frame at the end is dropped.
+
+    Args:
+        filename: WAV file to be read.
+        frame_length: Number of samples in each frame.
+        sample_rate: Sample rate that the detector takes.
+
+    Raises:
+        ValueError:
+        If the WAV file is not 16-bit mono audio at the sample rate of the detector.
+
+    Returns:
+        List[bytes]:
+        List of frames.
+    """
+    with wave.open(filename, "rb") as file:
+        if file.getnchannels() != 1 or file.getsampwidth() != 2 or file.getframerate() != sample_rate:
+            raise ValueError(f"{filename!r} should be 16-bit mono audio at {sample_rate} Hz")
+        data = file.readframes(file.getnframes())
+    size = frame_length * 2
+    return [data[index:index + size] for index in range(0, len(data) - size + 1, size)]
+
+
+def scratch_database(directory: str) -> contextlib.AbstractContextManager:
+    """Points the restart and stop checks to a temporary database.
+
+    Args:
+        directory: Temporary directory for the database.
+
+    Returns:
+        contextlib.AbstractContextManager:
+        Patch that restores the original database when exited.
+    """
+    db = database.Database(database=os.path.join(directory, "database.db"))
+    for table in ("restart", "stopper"):
+        db.create_table(table_name=table, columns=["flag", "caller"])
+    return mock.patch.object(support, "db", db)
+
+
+@contextlib.contextmanager
+def detector() -> Iterator[jarvis.Activator]:
+    """Creates an ``Activator`` without a microphone stream, and releases its detector on exit.
+
+    Yields:
+        jarvis.Activator:
+        Activator with a new detector.
+    """
+    activator = jarvis.Activator(microphone=False)
+    try:
+        yield activator
+    finally:
+        activator.detector.delete()
+
+
+def timed(func: Callable, clock: Callable[[], int]) -> Tuple[Any, int]:
+    """Calls a function and measures it with the given clock.
+
+    Args:
+        func: Function to be called.
+        clock: Clock that returns nanoseconds.
+
+    Returns:
+        Tuple[Any, int]:
+        Tuple of the return value and the nanoseconds taken.
+    """
+    start = clock()
+    result = func()
+    return result, clock() - start
+
+
+def allocated(func: Callable) -> Tuple[Any, int]:
+    """Calls a function and measures the peak memory it allocated, while ``tracemalloc`` is tracing.
+
+    Args:
+        func: Function to be called.
+
+    Returns:
+        Tuple[Any, int]:
+        Tuple of the return value and the peak bytes allocated.
+    """
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    return result, tracemalloc.get_traced_memory()[1] - before
+
+
+def replay(activator: jarvis.Activator, frames: List[bytes],
+           measure: Callable[[Callable], Tuple[Any, int]]) -> Tuple[Dict[str, List[int]], List[int]]:
+    """Runs each frame through the same stages as ``Activator.start``, measuring each stage.
+
+    Args:
+        activator: Activator without a microphone stream.
+        frames: Frames of raw audio.
+        measure: Function that calls a stage and returns its result along with the measurement.
+
+    Returns:
+        Tuple[Dict[str, List[int]], List[int]]:
+        Tuple of the measurements of each stage per frame, and the index of frames with a detection.
+    """
+    measurements = {stage: [] for stage in STAGES}
+    detections = []
+    for index, data in enumerate(frames):
+        pcm, value = measure(lambda: activator.convert(data=data))
+        measurements["convert"].append(value)
+        wake_word, value = measure(lambda: activator.detect(pcm=pcm))
+        measurements["detect"].append(value)
+        if wake_word:
+            detections.append(index)
+        _, value = measure(activator.housekeeping)
+        measurements["housekeeping"].append(value)
+    return measurements, detections
+
+
+def score(detected: List[float], labels: List[float], tolerance: float) -> Dict[str, int]:
+    """Matches the detections with the labels, each label can be matched by a single detection.
+
+    Args:
+        detected: Timestamps of the detections in seconds.
+        labels: Timestamps where the wake word ends in seconds.
+        tolerance: Seconds within which a detection matches a label.
+
+    Returns:
+        Dict[str, int]:
+        Dictionary of the hits, misses and false alarms.
+    """
+    remaining = sorted(labels)
+    hits = 0
+    for timestamp in sorted(detected):
+        if (match := next((label for label in remaining if abs(label - timestamp) <= tolerance), None)) is not None:
+            remaining.remove(match)
+            hits += 1
+    return {"hits": hits, "misses": len(remaining), "false_alarms": len(detected) - hits}
+
+
+def run(files: List[str], labels: Dict[str, List[float]], tolerance: float) -> Dict[str, Any]:
+    """Replays the WAV files with the sensitivity currently set in the env vars.
+
+    Args:
+        files: WAV files to be replayed.
+        labels: Dictionary of the WAV file names and the timestamps where the wake word ends.
+        tolerance: Seconds within which a detection matches a label.
+
+    Returns:
+        Dict[str, Any]:
+        Dictionary of the timings, allocations and detections.
+    """
+    with detector() as activator:
+        frame_length, sample_rate = activator.detector.frame_length, activator.detector.sample_rate
+    cpu = {stage: [] for stage in STAGES}
+    memory = {stage: [] for stage in STAGES}
+    results, wall, frame_count = [], 0, 0
+    for filename in files:
+        frames = read_frames(filename=filename, frame_length=frame_length, sample_rate=sample_rate)
+        with detector() as activator:
+            start = time.perf_counter()
+            measurements, detections = replay(activator=activator, frames=frames,
+                                              measure=lambda func: timed(func=func, clock=time.thread_time_ns))
+            wall += time.perf_counter() - start
+        frame_count += len(frames)
+        for stage, values in measurements.items():
+            cpu[stage].extend(values)
+        # A new detector for the allocation pass, so it sees the audio from the same state
+        with detector() as activator:
+            tracemalloc.start()
+            try:
+                measurements, _ = replay(activator=activator, frames=frames, measure=allocated)
+            finally:
+                tracemalloc.stop()
+        for stage, values in measurements.items():
+            memory[stage].extend(values)
+        detected = [round((index + 1) * frame_length / sample_rate, 3) for index in detections]
+        result = {"file": filename, "seconds": round(len(frames) * frame_length / sample_rate, 3),
+                  "detections": detected}
+        if (name := os.path.basename(filename)) in labels:
+            result.update(score(detected=detected, labels=labels[name] or [], tolerance=tolerance))
+        results.append(result)
+    audio_seconds = frame_count * frame_length / sample_rate
+    for stage in STAGES:
+        cpu[stage].sort()
+        memory[stage].sort()
+    total = [sum(values) for values in zip(*(cpu[stage] for stage in STAGES))]
+    return {
+        "sensitivity": models.env.sensitivity,
+        "frames": frame_count,
+        "audio_seconds": round(audio_seconds, 3),
+        "real_time_factor": round(wall / audio_seconds, 5) if audio_seconds else 0,
+        "cpu_us_per_frame": {
+            stage: {"mean": round(sum(values) / len(values) / 1e3, 2) if values else 0,
+                    "p50": round(tracing.percentile(values, 50) / 1e3, 2),
+                    "p95": round(tracing.percentile(values, 95) / 1e3, 2),
+                    "p99": round(tracing.percentile(values, 99) / 1e3, 2)}
+            for stage, values in list(cpu.items()) + [("total", sorted(total))]
+        },
+        "allocated_bytes_per_frame": {
+            stage: {"mean": round(sum(values) / len(values), 1) if values else 0,
+                    "p50": tracing.percentile(values, 50), "max": values[-1] if values else 0}
+            for stage, values in memory.items()
+        },
+        "detection": {key: sum(result.get(key, 0) for result in results)
+                      for key in ("hits", "misses", "false_alarms")},
+        "files": results,
+    }
+
+
+def sensitivities(values: Union[List[float], None]) -> List[List[float]]:
+    """Gets the sensitivity for each wake word, for each run.
+
+    Args:
+        values: Sensitivities to be compared, one run each, applied to all the wake words.
+
+    Returns:
+        List[List[float]]:
+        List of sensitivities to be set for each run, only the one in the env vars when none are given.
+    """
+    if not values:
+        return [list(models.env.sensitivity)]
+    return [[value] * len(models.env.wake_words) for value in values]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replays WAV files through the wake word detection loop.")
+    parser.add_argument("paths", nargs="+", help="WAV files or directories with WAV files.")
+    parser.add_argument("--labels", help="YAML file of each WAV file name and the timestamps of the wake word.")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="Seconds within which a detection is a hit.")
+    parser.add_argument("--sensitivity", type=float, nargs="+", help="Sensitivities to be compared.")
+    parser.add_argument("--output", help="File to store the report, printed when not set.")
+    args = parser.parse_args()
+    labeled = {}
+    if args.labels:
+        with open(args.labels) as stream:
+            labeled = yaml.load(stream=stream, Loader=yaml.FullLoader) or {}
+    wav = wav_files(paths=args.paths)
+    reports = []
+    with tempfile.TemporaryDirectory() as tmp_dir, scratch_database(directory=tmp_dir):
+        for sensitivity in sensitivities(values=args.sensitivity):
+            with mock.patch.object(models.env, "sensitivity", sensitivity):
+                reports.append(run(files=wav, labels=labeled, tolerance=args.tolerance))
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(reports, stream, indent=2)
+    else:
+        print(json.dumps(reports, indent=2))
@@ -47,7 +47,9 @@ def remove_corrupted(task: Union[BackgroundTask, dict]) -> NoReturn:
     with open(models.fileio.background_tasks) as read_file:
         existing_data = yaml.load(stream=read_file, Loader=yaml.FullLoader)
     for task_ in existing_data:
-        if (isinstance(task, dict) and task_ == task) or (isinstance(task, BackgroundTask) and task_ == task.__dict__):
+        if (isinstance(task, dict) and task_ == task) or \
+                (isinstance(task, BackgroundTask) and isinstance(task_, dict) and
+                 task_.get('task', '').strip() == task.task and task_.get('seconds') == task.seconds):
             logger.info(f"Removing corrupted task: {task_}")
             existing_data.remove(task_)
     with open(models.fileio.background_tasks, 'w') as write_file:
@@ -86,8 +88,8 @@ def validate_background_tasks(log: bool = True) -> Iterable[BackgroundTask]:
             return
         for t in task_info:
             try:
-                task = BackgroundTask(seconds=t.get('seconds'), task=t.get('task'), ignore_hours=t.get('ignore_hours'))
-            except ValidationError as error:
+                task = BackgroundTask(**t)
+            except (ValidationError, TypeError) as error:
                 logger.error(error)
                 remove_corrupted(t)
                 continue
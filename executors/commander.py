@@ -13,8 +13,9 @@ from executors.word_match import word_match
 from modules.audio import listener, speaker
 from modules.conditions import conversation, keywords
 from modules.logger.custom_logger import logger
+from modules.metrics import tracing
 from modules.models import models
-from modules.offline import compatibles
+from modules.offline import compatibles, context, planner
 from modules.utils import shared, support, util
 
 
@@ -28,6 +29,9 @@ def split_phrase(phrase: str, should_return: bool = False) -> bool:
     Returns:
         bool:
         Return value from ``conditions()``
+
+    See Also:
+        - Compound commands are handed to the planner, which runs independent clauses concurrently.
     """
     exit_check = False  # this is specifically to catch the sleep command which should break the loop in renew()
 
@@ -37,14 +41,31 @@ def split_phrase(phrase: str, should_return: bool = False) -> bool:
                                f"{models.env.title}!")
             return False
 
-    # Keywords for which the ' and ' split should not happen.
-    multiexec = keywords.keywords.send_notification + keywords.keywords.reminder + keywords.keywords.distance
-
-    if ' and ' in phrase and not word_match(phrase=phrase, match_list=keywords.keywords.avoid) and \
-            not word_match(phrase=phrase, match_list=multiexec):
-        for each in phrase.split(' and '):
-            exit_check = conditions(phrase=each.strip(), should_return=should_return)
+    with tracing.span(stage="split_phrase"):
+        clauses = planner.plan(phrase=phrase)
+    if len(clauses) > 1:
+        def inline(clause: str) -> bool:
+            """Runs a clause that requires user interaction, on the live speaker."""
+            response = conditions(phrase=clause, should_return=should_return)
             speaker.speak(run=True)
+            return response
+
+        def runner(clause: str) -> str:
+            """Runs a clause that is offline compatible, and collects the text it would have spoken."""
+            with context.offline_request() as request:
+                conditions(phrase=clause, should_return=True)
+            return request.text_spoken or f"I was unable to process the request: {clause}"
+
+        def on_result(result: planner.Result) -> None:
+            """Speaks the response of each clause in the order they were requested."""
+            nonlocal exit_check
+            if result.clause.compatible:
+                speaker.speak(text=str(result.response), run=True)
+            else:
+                exit_check = exit_check or result.response is True
+
+        # Offline compatible clauses run concurrently, while the rest are run and spoken in order
+        planner.execute(clauses=clauses, runner=runner, on_result=on_result, inline=inline)
     else:
         exit_check = conditions(phrase=phrase.strip(), should_return=should_return)
     return exit_check
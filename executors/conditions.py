@@ -43,10 +43,15 @@ from modules.exceptions import StopSignal
 from modules.logger.custom_logger import logger
 from modules.meetings.events import events
 from modules.meetings.icalendar import meetings
+from modules.metrics import dispatch
 from modules.models.models import settings
 from modules.utils import support
 
+# Records the intent matched by a phrase, and the time it took to find it
+word_match = dispatch.recorder(func=word_match)
 
+
+@dispatch.instrument
 def conditions(phrase: str, should_return: bool = False) -> bool:
     """Conditions function is used to check the message processed.
 
@@ -63,6 +68,9 @@ def conditions(phrase: str, should_return: bool = False) -> bool:
     Returns:
         bool:
         Boolean True only when asked to sleep for conditioned sleep message.
+
+    See Also:
+        - Time taken to find the intent, and the time taken by its handler are observed per intent.
     """
     keywords = keywords_mod.keywords
     todo_checks = ['to do', 'to-do', 'todo']
@@ -275,8 +275,12 @@ def delete_logs() -> NoReturn:
     """Deletes log files that were updated before 48 hours."""
     for __path, __directory, __file in os.walk('logs'):
         for file_ in __file:
-            if (datetime.now() - datetime.strptime(file_.split('_')[-1].split('.')[0],
-                                                   '%d-%m-%Y')).total_seconds() > 172_800:
+            try:
+                # Rotated files retain the date, e.g. jarvis_19-10-2026.log.1.gz
+                created = datetime.strptime(file_.split('_')[-1].split('.')[0], '%d-%m-%Y')
+            except ValueError:  # Files without a date in their name rotate on their own, e.g. voice_traces.log
+                continue
+            if (datetime.now() - created).total_seconds() > 172_800:
                 logger.debug(f"Deleting log file: {os.path.join(__path, file_)}")
                 os.remove(os.path.join(__path, file_))  # removes the file if it is older than 48 hours
 
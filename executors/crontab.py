@@ -1,26 +1,224 @@
+import asyncio
+import hashlib
+import logging
 import os
-import subprocess
-from typing import NoReturn
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, NoReturn, Tuple, Union
 
-from modules.logger import config
+from modules.database import database
+from modules.logger.custom_logger import logger
+from modules.metrics.registry import registry
+from modules.models import models
 
-LOG_FILE = os.path.join('logs', 'cron_%d-%m-%Y.log')  # Used by api functions that run on cron schedule
+JOB_LOG_DIR = os.path.join('logs', 'cron')
+JOB_LOG_SIZE = 1_048_576  # Rotates per-job logs at 1 MB
+JOB_LOG_BACKUPS = 3
 
+HISTORY_COLUMNS = ("job", "statement", "pid", "started", "duration", "exit_code", "status")
 
-def crontab_executor(statement: str) -> NoReturn:
-    """Executes a cron statement.
+db = database.Database(database=models.fileio.base_db)
+cron_db = database.Database(database=models.fileio.cron_db)
+cron_db.create_table(table_name="history", columns=HISTORY_COLUMNS)
+
+RUNTIME = registry.histogram(name="cron_job_runtime_seconds",
+                             documentation="Time taken by each run of a cron job.",
+                             labels=("job", "status"))
+WAITING = registry.histogram(name="cron_job_wait_seconds",
+                             documentation="Time a due cron job waited for a free slot before starting.",
+                             labels=("job",))
+
+
+def job_id(statement: str) -> str:
+    """Creates a short identifier for a cron statement, to be used as its log filename.
+
+    Args:
+        statement: Cron statement.
+
+    Returns:
+        str:
+        First 10 characters of the SHA1 hash of the statement.
+    """
+    return hashlib.sha1(statement.encode(encoding='UTF-8')).hexdigest()[:10]
+
+
+def job_logger(statement: str) -> logging.Logger:
+    """Creates or gets a logger that writes the output of a cron job into a size-rotated log file.
 
     Args:
-        statement: Cron statement to be executed.
+        statement: Cron statement.
+
+    Returns:
+        logging.Logger:
+        Logger dedicated for the cron job.
+    """
+    identifier = job_id(statement=statement)
+    job_log = logging.getLogger(f"jarvis.cron.{identifier}")
+    if not job_log.handlers:
+        os.makedirs(JOB_LOG_DIR, exist_ok=True)
+        handler = RotatingFileHandler(filename=os.path.join(JOB_LOG_DIR, f"{identifier}.log"),
+                                      maxBytes=JOB_LOG_SIZE, backupCount=JOB_LOG_BACKUPS)
+        handler.setFormatter(fmt=logging.Formatter(fmt='%(asctime)s - %(stream)s - %(message)s',
+                                                   datefmt='%b-%d-%Y %I:%M:%S %p'))
+        job_log.addHandler(hdlr=handler)
+        job_log.setLevel(level=logging.INFO)
+        job_log.propagate = False
+    return job_log
+
+
+def get_history(limit: int = 50) -> List[Tuple[str, str, int, float, float, int, str]]:
+    """Reads the latest runs from the cron history table.
+
+    Args:
+        limit: Number of runs to be returned.
+
+    Returns:
+        list:
+        List of tuples in the order of ``HISTORY_COLUMNS``, latest first.
+    """
+    with cron_db.connection:
+        cursor = cron_db.connection.cursor()
+        return cursor.execute(f"SELECT {', '.join(HISTORY_COLUMNS)} FROM history ORDER BY started DESC LIMIT ?",
+                              (limit,)).fetchall()
+
+
+class CronSupervisor:
+    """Initiates ``CronSupervisor`` to run cron jobs as asyncio subprocesses within a dedicated event loop.
+
+    >>> CronSupervisor
+
+    See Also:
+        - Each cron statement is started directly as a shell subprocess, instead of a python process that starts one.
+        - A semaphore caps the number of concurrent jobs, the rest wait for a slot in the order they were submitted.
+        - Jobs exceeding the timeout are terminated along with their process group.
+        - stdout and stderr are streamed line by line into size-rotated per-job logs.
+        - Each run is recorded with its exit code and duration in the ``history`` table of ``fileio.cron_db``
     """
-    filename = config.multiprocessing_logger(filename=LOG_FILE)
-    with open(filename, 'a') as file:
-        file.write('\n')
+
+    def __init__(self, workers: int = models.env.cron_workers,
+                 timeout: Union[int, float] = models.env.cron_timeout):
+        """Creates an event loop and runs it forever in a daemon thread.
+
+        Args:
+            workers: Maximum number of cron jobs that can run at the same time.
+            timeout: Seconds after which a cron job is terminated.
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.semaphore = asyncio.Semaphore(value=workers)
+        self.running: Dict[int, asyncio.subprocess.Process] = {}
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def submit(self, statement: str) -> Future:
+        """Schedules a cron statement to be executed by the supervisor. Safe to call from any thread.
+
+        Args:
+            statement: Cron statement to be executed.
+
+        Returns:
+            Future:
+            Future that resolves to the exit code of the job.
+        """
+        return asyncio.run_coroutine_threadsafe(coro=self.run(statement=statement), loop=self.loop)
+
+    @staticmethod
+    async def _stream(reader: asyncio.StreamReader, job_log: logging.Logger, name: str) -> NoReturn:
+        """Writes each line from the reader into the job's log as soon as it is available."""
+        while line := await reader.readline():
+            job_log.info(line.decode(encoding='UTF-8', errors='replace').rstrip(), extra={"stream": name})
+
+    @staticmethod
+    async def _terminate(process: asyncio.subprocess.Process) -> NoReturn:
+        """Terminates the process group of a job and kills it if it doesn't exit within 5 seconds."""
         try:
-            subprocess.call(statement, shell=True, stdout=file, stderr=file)
-        except Exception as error:
-            if isinstance(error, subprocess.CalledProcessError):
-                result = error.output.decode(encoding='UTF-8').strip()
-                file.write(f"[{error.returncode}]: {result}\n")
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGTERM)
             else:
-                file.write(f"{error}\n")
+                process.terminate()
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
+    def _record(self, statement: str, pid: Union[int, None], started: float, exit_code: Union[int, None],
+                status: str) -> NoReturn:
+        """Stores the run in the history table and removes the PID from the children table."""
+        duration = round(time.time() - started, 3)
+        RUNTIME.observe(duration, job=job_id(statement=statement), status=status)
+        with cron_db.connection:
+            cursor = cron_db.connection.cursor()
+            cursor.execute(f"INSERT INTO history {HISTORY_COLUMNS} VALUES ({','.join('?' for _ in HISTORY_COLUMNS)});",
+                           (job_id(statement=statement), statement, pid, started, duration, exit_code, status))
+            cron_db.connection.commit()
+        if pid:
+            with db.connection:
+                cursor = db.connection.cursor()
+                cursor.execute("DELETE FROM children WHERE crontab=(?)", (pid,))
+                db.connection.commit()
+        logger.info(f"Cron job {job_id(statement=statement)!r} finished with {status!r} [{exit_code}] "
+                    f"in {duration}s")
+
+    async def run(self, statement: str) -> Union[int, None]:
+        """Runs a cron statement once a slot is available, streaming its output and enforcing the timeout.
+
+        Args:
+            statement: Cron statement to be executed.
+
+        Returns:
+            int:
+            Exit code of the job.
+        """
+        submitted = time.time()
+        async with self.semaphore:
+            job_log = job_logger(statement=statement)
+            job_log.info(statement, extra={"stream": "command"})
+            started = time.time()
+            WAITING.observe(started - submitted, job=job_id(statement=statement))
+            try:
+                process = await asyncio.create_subprocess_shell(statement, stdout=asyncio.subprocess.PIPE,
+                                                                stderr=asyncio.subprocess.PIPE,
+                                                                start_new_session=os.name == "posix")
+            except OSError as error:
+                logger.error(error)
+                job_log.error(error, extra={"stream": "supervisor"})
+                self._record(statement=statement, pid=None, started=started, exit_code=None, status="error")
+                return
+            self.running[process.pid] = process
+            with db.connection:
+                cursor = db.connection.cursor()
+                cursor.execute("INSERT INTO children (crontab) VALUES (?);", (process.pid,))
+                db.connection.commit()
+            logger.info(f"Started cron job {job_id(statement=statement)!r} with PID: {process.pid}")
+            streams = asyncio.gather(self._stream(reader=process.stdout, job_log=job_log, name="stdout"),
+                                     self._stream(reader=process.stderr, job_log=job_log, name="stderr"))
+            status = "success"
+            try:
+                # A job that closes its output streams but keeps running is bound by the same timeout
+                await asyncio.wait_for(asyncio.gather(asyncio.shield(streams), process.wait()), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                status = "timeout"
+                job_log.error(f"Exceeded the timeout of {self.timeout}s", extra={"stream": "supervisor"})
+                await self._terminate(process=process)
+                await streams
+                await process.wait()
+            finally:
+                self.running.pop(process.pid, None)
+            if status == "success" and process.returncode:
+                status = "failure"
+            self._record(statement=statement, pid=process.pid, started=started, exit_code=process.returncode,
+                         status=status)
+            return process.returncode
+
+    def stop(self) -> NoReturn:
+        """Terminates the running jobs and stops the event loop."""
+        for process in list(self.running.values()):
+            asyncio.run_coroutine_threadsafe(coro=self._terminate(process=process), loop=self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
@@ -11,6 +11,7 @@ from modules.audio import listener, speaker
 from modules.conditions import keywords
 from modules.logger.custom_logger import logger
 from modules.models import models
+from modules.offline import context
 from modules.utils import shared, support
 
 
@@ -34,6 +35,7 @@ def github(phrase: str) -> None:
     except (requests.RequestException, requests.Timeout, ConnectionError, TimeoutError, requests.JSONDecodeError) \
             as error:
         logger.error(error)
+        context.fail()
         speaker.speak(text=f"I'm sorry {models.env.title}! I wasn't able to connect to the GitHub API.")
         return
     result, repos, total, forked, private, archived, licensed = [], [], 0, 0, 0, 0, 0
@@ -14,6 +14,7 @@ from executors.location import get_location_from_coordinates
 from modules.audio import speaker
 from modules.logger.custom_logger import logger
 from modules.models import models
+from modules.offline import context
 from modules.utils import shared, support
 
 
@@ -84,6 +85,7 @@ def ip_info(phrase: str) -> None:
     """
     if "public" in phrase.lower():
         if not ip_address():
+            context.fail()
             speaker.speak(text=f"You are not connected to the internet {models.env.title}!")
             return
         if ssid := get_connection_info():
@@ -93,6 +95,7 @@ def ip_info(phrase: str) -> None:
         if public_ip := public_ip_info():
             output = f"My public IP {ssid}is {public_ip.get('ip')}"
         else:
+            context.fail()
             output = f"I was unable to fetch the public IP {models.env.title}!"
     else:
         output = f"My local IP address for {socket.gethostname().split('.')[0]} is {ip_address()}"
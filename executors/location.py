@@ -21,6 +21,7 @@ from timezonefinder import TimezoneFinder
 from modules.audio import listener, speaker
 from modules.logger.custom_logger import logger
 from modules.models import models
+from modules.offline import context
 from modules.utils import shared, support
 
 # stores necessary values for geolocation to receive the latitude, longitude and address
@@ -113,6 +114,7 @@ def location() -> NoReturn:
             current_location = yaml.load(stream=file, Loader=yaml.FullLoader)
     except yaml.YAMLError as error:
         logger.error(error)
+        context.fail()
         speaker.speak(text=f"I'm sorry {models.env.title}! "
                            "I wasn't able to get the location details. Please check the logs.")
         return
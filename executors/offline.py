@@ -13,10 +13,9 @@ from pydantic import HttpUrl
 from _preexec import keywords_handler
 from executors.alarm import alarm_executor
 from executors.automation import auto_helper
-from executors.background_tasks import (remove_corrupted,
-                                        validate_background_tasks)
+from executors.background_tasks import validate_background_tasks
 from executors.conditions import conditions
-from executors.crontab import crontab_executor
+from executors.crontab import CronSupervisor
 from executors.others import photo
 from executors.remind import reminder_executor
 from executors.word_match import word_match
@@ -28,50 +27,61 @@ from modules.exceptions import EgressErrors
 from modules.logger import config
 from modules.logger.custom_logger import logger
 from modules.meetings import events, icalendar
+from modules.metrics import sink
+from modules.metrics.registry import registry
 from modules.models import models
 from modules.models.classes import BackgroundTask
-from modules.offline import compatibles
-from modules.utils import shared, support
+from modules.offline import cache, compatibles, context, singleflight
+from modules.tasks.pool import TaskPool
+from modules.utils import support
 
 db = database.Database(database=models.fileio.base_db)
 
+LAG = registry.histogram(name="scheduler_lag_seconds",
+                         documentation="Delay between when a background task or a cron minute was due, and when "
+                                       "it was dispatched.",
+                         labels=("scheduler",))
+
 
 def background_tasks() -> NoReturn:
-    """Initiates background tasks as per the set time."""
-    config.multiprocessing_logger(filename=os.path.join('logs', 'background_tasks_%d-%m-%Y.log'))
+    """Initiates background tasks as per the set time.
+
+    See Also:
+        - Tasks that are due are dispatched to a bounded pool of processes, so a slow task doesn't delay the others.
+        - Failed or timed out runs are retried with an exponential backoff, instead of removing the task.
+        - Cron jobs that are due are handed over to the ``CronSupervisor`` which runs them as async subprocesses.
+        - Delay between when a task or a cron minute was due and when it was dispatched, is observed as the lag.
+    """
+    log_file = config.multiprocessing_logger(filename=os.path.join('logs', 'background_tasks_%d-%m-%Y.log'))
     logger.addFilter(filter=config.AddProcessName(process_name=background_tasks.__name__))
     tasks: List[BackgroundTask] = list(validate_background_tasks())
+    pool = TaskPool(target=background_task, workers=models.env.background_workers, log_file=log_file)
 
-    start_cron = time.time()
+    cron_batch = expression.CronBatch(expressions=models.env.crontab)
+    supervisor = CronSupervisor()
+    last_cron = None
     task_dict = {i: time.time() for i in range(len(tasks))}  # Creates a start time for each task
     dry_run = True
     while True:
         for i, task in enumerate(tasks):
             if task_dict[i] + task.seconds <= time.time() or dry_run:  # Checks a particular tasks' elapsed time
+                if not dry_run:
+                    LAG.observe(time.time() - task_dict[i] - task.seconds, scheduler="background_tasks")
                 task_dict[i] = time.time()  # Updates that particular tasks' start time
                 if datetime.now().hour in task.ignore_hours:
                     logger.info("Schedule skipped honoring ignore hours")
                     continue
-                logger.info(f'Executing {task.task}')
-                try:
-                    offline_communicator(task.task)
-                except Exception as error:
-                    logger.error(error)
-                    logger.warning(f"Removing {task} from background tasks.")
-                    remove_corrupted(task=task)
-
-        if start_cron + 60 <= time.time() or dry_run:  # Condition passes every minute
-            start_cron = time.time()
-            for cron in models.env.crontab:
-                job = expression.CronExpression(line=cron)
-                if job.check_trigger():
-                    logger.info(f"Executing cron job: {job.comment}")
-                    cron_process = Process(target=crontab_executor, args=(job.comment,))
-                    cron_process.start()
-                    with db.connection:
-                        cursor = db.connection.cursor()
-                        cursor.execute("INSERT or REPLACE INTO children (crontab) VALUES (?);", (cron_process.pid,))
-                        db.connection.commit()
+                pool.submit(task=task)
+        pool.poll()
+
+        current_minute = datetime.now().replace(second=0, microsecond=0)
+        if current_minute != last_cron:  # Condition passes once every minute
+            last_cron = current_minute
+            LAG.observe((datetime.now() - current_minute).total_seconds(), scheduler="crontab")
+            for job in cron_batch.triggered(date_tuple=current_minute.timetuple()[:5]):
+                logger.info(f"Executing cron job: {job.comment}")
+                supervisor.submit(statement=job.comment)
+            sink.flush(source=background_tasks.__name__)
 
         dry_run = False
         time.sleep(1)  # Reduces CPU utilization as constant fileIO operations spike CPU %
@@ -81,6 +91,7 @@ def background_tasks() -> NoReturn:
             logger.debug(DeepDiff(tasks, new_tasks, ignore_order=True))
             tasks = new_tasks
             task_dict = {i: time.time() for i in range(len(tasks))}  # Re-create start time for each task
+            pool.prune(statements=[task.task for task in tasks])
 
 
 def automator() -> NoReturn:
@@ -100,6 +111,7 @@ def automator() -> NoReturn:
     """
     config.multiprocessing_logger(filename=os.path.join('logs', 'automation_%d-%m-%Y.log'))
     logger.addFilter(filter=config.AddProcessName(process_name=automator.__name__))
+    sink.start_flusher(source=automator.__name__)
     offline_list = compatibles.offline_compatible() + keywords.keywords.restart_control
     start_events = start_meetings = time.time()
     if models.settings.os == "Darwin":
@@ -242,8 +254,9 @@ def on_demand_offline_automation(task: str) -> Union[str, None]:
         return response.json()['detail'].split('\n')[-1]
 
 
+@singleflight.coalesce
 def offline_communicator(command: str) -> Union[AnyStr, HttpUrl]:
-    """Initiates conditions after flipping ``status`` flag in ``called_by_offline`` dict which suppresses the speaker.
+    """Initiates conditions within an offline request context which suppresses the speaker.
 
     Args:
         command: Takes the command that has to be executed as an argument.
@@ -251,22 +264,47 @@ def offline_communicator(command: str) -> Union[AnyStr, HttpUrl]:
     Returns:
         AnyStr:
         Response from Jarvis.
+
+    See Also:
+        - The response is collected in a request scoped context, so concurrent executions don't share the response.
+        - Responses of read-mostly intents are served from a TTL cache, until they expire.
+        - Identical read-only commands that arrive while one is being executed, wait for its response.
     """
-    shared.called_by_offline = True
-    # Specific for offline communication and not needed for live conversations
-    if word_match(phrase=command, match_list=keywords.keywords.ngrok):
-        if public_url := get_tunnel():
-            return public_url
-        else:
-            raise LookupError("Failed to retrieve the public URL")
-    if word_match(phrase=command, match_list=keywords.keywords.photo):
-        return photo()
-    # Call condition instead of split_phrase as the 'and' and 'also' filter will overwrite the first response
-    conditions(phrase=command, should_return=True)
-    shared.called_by_offline = False
-    if response := shared.text_spoken:
-        shared.text_spoken = None
+    with context.offline_request() as request:
+        # Specific for offline communication and not needed for live conversations
+        if word_match(phrase=command, match_list=keywords.keywords.ngrok):
+            if public_url := get_tunnel():
+                return public_url
+            else:
+                raise LookupError("Failed to retrieve the public URL")
+        if word_match(phrase=command, match_list=keywords.keywords.photo):
+            return photo()
+        if cached := cache.get(phrase=command):
+            return cached
+        # Call condition instead of split_phrase as the 'and' and 'also' filter will overwrite the first response
+        conditions(phrase=command, should_return=True)
+    if response := request.text_spoken:
+        if not request.failed:  # Errors are transient, so they are never replayed from the cache
+            cache.put(phrase=command, response=response)
         return response
     else:
-        logger.error(f"Offline request failed: {shared.text_spoken}")
+        logger.error(f"Offline request failed: {request.text_spoken}")
+        context.fail()  # Marks the enclosing request, as this one is already closed
         return f"I was unable to process the request: {command}"
+
+
+def background_task(command: str) -> NoReturn:
+    """Executes a background task within a process of the ``TaskPool``.
+
+    Args:
+        command: Background task to be executed.
+
+    Raises:
+        RuntimeError:
+        If the task didn't produce a response or reported a failure, so the process exits with a non-zero code and
+        the pool retries it.
+    """
+    with context.offline_request() as request:
+        response = offline_communicator(command=command)
+    if request.failed:
+        raise RuntimeError(f"Background task {command!r} failed: {response}")
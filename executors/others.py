@@ -33,6 +33,7 @@ from modules.exceptions import CameraError, EgressErrors
 from modules.facenet import face
 from modules.logger.custom_logger import logger
 from modules.models import models
+from modules.offline import context
 from modules.utils import shared, support, util
 from version import version_info
 
@@ -291,6 +292,7 @@ def news(news_source: str = 'fox') -> None:
     try:
         all_articles = news_client.get_top_headlines(sources=f'{news_source}-news')
     except newsapi_exception.NewsAPIException:
+        context.fail()
         speaker.speak(text=f"I wasn't able to get the news {models.env.title}! "
                            "I think the News API broke, you may try after sometime.")
         return
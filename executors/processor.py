@@ -13,12 +13,17 @@ from executors.telegram import telegram_api
 from modules.audio.speech_synthesis import speech_synthesizer
 from modules.database import database
 from modules.logger.custom_logger import logger
+from modules.metrics.registry import registry
 from modules.models import models
 from modules.retry import retry
 from modules.utils import shared, support
 
 db = database.Database(database=models.fileio.base_db)
 
+RESTARTS = registry.counter(name="child_process_restarts_total",
+                            documentation="Restarts of each child process, requested internally or externally.",
+                            labels=("process",))
+
 
 @retry.retry(attempts=3, interval=2, warn=True)
 def delete_db() -> NoReturn:
@@ -9,6 +9,7 @@ from executors.controls import restart_control
 from modules.exceptions import BotInUse, EgressErrors
 from modules.logger import config
 from modules.logger.custom_logger import logger
+from modules.metrics import sink
 from modules.models import models
 from modules.telegram.bot import TelegramBot
 
@@ -18,7 +19,7 @@ FAILED_CONNECTIONS = {'count': 0}
 
 
 def telegram_api() -> NoReturn:
-    """Initiates polling for new messages.
+    """Initiates polling for new messages, or sets a webhook for the API to receive them when ``BOT_WEBHOOK`` is set.
 
     Handles:
         - BotInUse: Restarts polling to take control over.
@@ -29,10 +30,17 @@ def telegram_api() -> NoReturn:
     if not models.env.bot_token:
         logger.info("Bot token is required to start the Telegram Bot")
         return
+    sink.start_flusher(source=telegram_api.__name__)
     limit = sys.getrecursionlimit()  # fetches current recursion limit
     sys.setrecursionlimit(limit * 10)  # increases the recursion limit by 10 times
     try:
-        TelegramBot().poll_for_messages()
+        bot = TelegramBot()
+        if models.env.bot_webhook:
+            if bot.set_webhook().ok:
+                logger.info(f"Webhook is set to {models.env.bot_webhook}, updates will be received by the API")
+                return
+            logger.error("Failed to set the webhook, falling back to polling")
+        bot.poll_for_messages()
     except BotInUse as error:
         logger.error(error)
         logger.info("Restarting message poll to take over..")
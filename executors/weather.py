@@ -12,6 +12,7 @@ from executors.word_match import word_match
 from modules.audio import speaker
 from modules.logger.custom_logger import logger
 from modules.models import models
+from modules.offline import context
 from modules.temperature import temperature
 from modules.utils import shared, support
 
@@ -40,6 +41,7 @@ def weather(phrase: str = None) -> None:
         desired_location = geo_locator.geocode(place)
         if not desired_location:
             logger.error(f"Failed to get coordinates for the place: {place!r}")
+            context.fail()
             speaker.speak(text=f"I'm sorry {models.env.title}! "
                                f"I wasn't able to get the weather information at {place}!")
             return
@@ -57,6 +59,7 @@ def weather(phrase: str = None) -> None:
                 current_location = yaml.load(stream=file, Loader=yaml.FullLoader)
         except yaml.YAMLError as error:
             logger.error(error)
+            context.fail()
             speaker.speak(text=f"I'm sorry {models.env.title}! I wasn't able to read your location.")
             return
 
@@ -71,6 +74,7 @@ def weather(phrase: str = None) -> None:
         response = json.loads(urllib.request.urlopen(url=weather_url).read())  # loads the response in a json
     except (urllib.error.HTTPError, urllib.error.URLError) as error:
         logger.error(error)
+        context.fail()
         speaker.speak(text=f"I'm sorry {models.env.title}! I ran into an exception. Please check your logs.")
         return
 
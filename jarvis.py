@@ -1,9 +1,10 @@
 import string
 import struct
 import sys
+import time
 import traceback
 from datetime import datetime
-from typing import NoReturn
+from typing import NoReturn, Tuple, Union
 
 import pvporcupine
 import pyaudio
@@ -15,11 +16,14 @@ from executors.commander import initiator
 from executors.controls import exit_process, starter, terminator
 from executors.internet import get_connection_info, ip_address, public_ip_info
 from executors.location import write_current_location
-from executors.processor import clear_db, start_processes, stop_processes
+from executors.processor import (RESTARTS, clear_db, start_processes,
+                                 stop_processes)
 from executors.system import hosted_device_info
 from modules.audio import listener, speaker
 from modules.exceptions import StopSignal
+from modules.logger import listener as log_listener
 from modules.logger.custom_logger import custom_handler, logger
+from modules.metrics import sink, tracing
 from modules.models import models
 from modules.peripherals import audio_engine
 from modules.utils import shared, support
@@ -40,9 +44,13 @@ def restart_checker() -> NoReturn:
             logger.addHandler(hdlr=handler)
             starter()
             shared.processes = start_processes()
+            for func_name in shared.processes:
+                RESTARTS.inc(process=func_name)
         else:
             stop_processes(func_name=flag[1])
             shared.processes[flag[1]] = start_processes(func_name=flag[1])
+            RESTARTS.inc(process=flag[1])
+        sink.flush(source="jarvis")
 
 
 class Activator:
@@ -57,9 +65,12 @@ class Activator:
         - The ``should_return`` flag ensures, the user is not disturbed when accidentally woke up by wake work engine.
     """
 
-    def __init__(self):
+    def __init__(self, microphone: bool = True):
         """Initiates Porcupine object for hot word detection.
 
+        Args:
+            microphone: Opens an audio stream from the microphone, disabled to process recorded audio instead.
+
         See Also:
             - Instantiates an instance of Porcupine object and monitors audio stream for occurrences of keywords.
             - A higher sensitivity results in fewer misses at the cost of increasing the false alarm rate.
@@ -86,7 +97,7 @@ class Activator:
             arguments["keyword_paths"] = keyword_paths
 
         self.detector = pvporcupine.create(**arguments)
-        self.audio_stream = self.open_stream()
+        self.audio_stream = self.open_stream() if microphone else None
         self.label = f"Awaiting: [{label}]"
 
     def open_stream(self) -> pyaudio.Stream:
@@ -105,50 +116,89 @@ class Activator:
             input_device_index=models.env.microphone_index
         )
 
-    def executor(self) -> NoReturn:
-        """Calls the listener for actionable phrase and runs the speaker node for response."""
+    def executor(self, detected_at: float = None) -> NoReturn:
+        """Calls the listener for actionable phrase and runs the speaker node for response.
+
+        Args:
+            detected_at: Value of ``time.perf_counter`` when the frame that had the wake word started processing.
+
+        See Also:
+            - Each command is traced from the wake word to the first audio of its response.
+        """
         logger.debug(f"Detected {models.settings.bot} at {datetime.now()}")
-        playsound(sound=models.indicators.acknowledgement, block=False)
-        audio_engine.close(stream=self.audio_stream)
-        if phrase := listener.listen(sound=False):
-            try:
-                initiator(phrase=phrase, should_return=True)
-            except Exception as error:
-                logger.fatal(error)
-                logger.error(traceback.format_exc())
-                speaker.speak(text=f"I'm sorry {models.env.title}! I ran into an unknown error. "
-                                   "Please check the logs for more information.")
-            speaker.speak(run=True)
+        with tracing.trace(origin=detected_at) as trace:
+            tracing.record(stage="wake", start=trace.origin, end=time.perf_counter())
+            with tracing.span(stage="acknowledgement"):
+                playsound(sound=models.indicators.acknowledgement, block=False)
+            with tracing.span(stage="wake_stream_close"):
+                audio_engine.close(stream=self.audio_stream)
+            if phrase := listener.listen(sound=False):
+                trace.phrase = phrase
+                try:
+                    with tracing.span(stage="initiator"):
+                        initiator(phrase=phrase, should_return=True)
+                except Exception as error:
+                    logger.fatal(error)
+                    logger.error(traceback.format_exc())
+                    speaker.speak(text=f"I'm sorry {models.env.title}! I ran into an unknown error. "
+                                       "Please check the logs for more information.")
+                speaker.speak(run=True)
         self.audio_stream = self.open_stream()
 
+    def convert(self, data: bytes) -> Tuple[int, ...]:
+        """Converts a frame of raw audio into the PCM values that the detector takes.
+
+        Args:
+            data: Frame of 16-bit mono audio, with as many samples as the frame length of the detector.
+
+        Returns:
+            Tuple[int, ...]:
+            PCM values of the frame.
+        """
+        return struct.unpack_from("h" * self.detector.frame_length, data)
+
+    def detect(self, pcm: Tuple[int, ...]) -> Union[str, None]:
+        """Processes a frame of PCM values through the detector.
+
+        Args:
+            pcm: PCM values of the frame.
+
+        Returns:
+            str:
+            Wake word detected in the frame, None if there isn't one.
+        """
+        result = self.detector.process(pcm=pcm)
+        if models.settings.legacy:
+            if len(models.env.wake_words) == 1 and result:
+                return models.env.wake_words[0]
+            elif len(models.env.wake_words) > 1 and result >= 0:
+                return models.env.wake_words[result]
+        elif result >= 0:
+            return models.env.wake_words[result]
+
+    def housekeeping(self) -> NoReturn:
+        """Reloads the keywords and checks for restart and stop requests, after every frame."""
+        keywords_handler.rewrite_keywords()
+        restart_checker()
+        if flag := support.check_stop():
+            logger.info(f"Stopper condition is set to {flag[0]} by {flag[1]}")
+            self.stop()
+            terminator()
+
     def start(self) -> NoReturn:
         """Runs ``audio_stream`` in a forever loop and calls ``initiator`` when the phrase ``Jarvis`` is heard."""
         try:
             while True:
                 sys.stdout.write(f"\r{self.label}")
-                pcm = struct.unpack_from("h" * self.detector.frame_length,
-                                         self.audio_stream.read(num_frames=self.detector.frame_length,
-                                                                exception_on_overflow=False))
-                result = self.detector.process(pcm=pcm)
-                if models.settings.legacy:
-                    if len(models.env.wake_words) == 1 and result:
-                        models.settings.bot = models.env.wake_words[0]
-                        self.executor()
-                    elif len(models.env.wake_words) > 1 and result >= 0:
-                        models.settings.bot = models.env.wake_words[result]
-                        self.executor()
-                else:
-                    if result >= 0:
-                        models.settings.bot = models.env.wake_words[result]
-                        self.executor()
+                pcm = self.convert(data=self.audio_stream.read(num_frames=self.detector.frame_length,
+                                                               exception_on_overflow=False))
+                frame_start = time.perf_counter()
+                if wake_word := self.detect(pcm=pcm):
+                    models.settings.bot = wake_word
+                    self.executor(detected_at=frame_start)
                 if models.settings.limited:
                     continue
-                keywords_handler.rewrite_keywords()
-                restart_checker()
-                if flag := support.check_stop():
-                    logger.info(f"Stopper condition is set to {flag[0]} by {flag[1]}")
-                    self.stop()
-                    terminator()
+                self.housekeeping()
         except StopSignal:
             exit_process()
             self.audio_stream = None
@@ -185,6 +235,8 @@ class Activator:
 
 def begin() -> NoReturn:
     """Starts main process to activate Jarvis after checking internet connection and initiating background processes."""
+    if models.env.log_queue:
+        log_listener.start_listener()
     logger.info(f"Current Process ID: {models.settings.pid}")
     starter()
     if ip_address() and public_ip_info():
@@ -206,6 +258,7 @@ def begin() -> NoReturn:
             shared.processes = start_processes(func_name="speech_synthesizer")
     else:
         shared.processes = start_processes()
+    sink.start_flusher(source="jarvis")
     write_current_location()
     Activator().start()
 
@@ -5,6 +5,7 @@
 
 """
 import sys
+import time
 from typing import Union
 
 from playsound import playsound
@@ -13,6 +14,7 @@ from speech_recognition import (Microphone, Recognizer, RequestError,
 
 from modules.exceptions import EgressErrors
 from modules.logger.custom_logger import logger
+from modules.metrics import tracing
 from modules.models import models
 from modules.utils import support
 
@@ -39,15 +41,19 @@ def listen(sound: bool = True, stdout: bool = True) -> Union[str, None]:
         str:
          - Returns recognized statement from the microphone.
     """
+    opening = time.perf_counter()
     with microphone as source:
+        tracing.record(stage="listener_open", start=opening, end=time.perf_counter())
         try:
             playsound(sound=models.indicators.start, block=False) if sound else None
             sys.stdout.write("\rListener activated...") if stdout else None
-            listened = recognizer.listen(source=source, timeout=models.env.timeout,
-                                         phrase_time_limit=models.env.phrase_limit)
+            with tracing.span(stage="endpointing"):
+                listened = recognizer.listen(source=source, timeout=models.env.timeout,
+                                             phrase_time_limit=models.env.phrase_limit)
             playsound(sound=models.indicators.end, block=False) if sound else None
             support.flush_screen()
-            recognized = recognizer.recognize_google(audio_data=listened)
+            with tracing.span(stage="stt"):
+                recognized = recognizer.recognize_google(audio_data=listened)
             logger.info(recognized)
             return recognized
         except (UnknownValueError, RequestError, WaitTimeoutError):
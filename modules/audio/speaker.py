@@ -18,8 +18,9 @@ from playsound import playsound
 from modules.conditions import conversation, keywords
 from modules.exceptions import EgressErrors
 from modules.logger.custom_logger import logger
+from modules.metrics import tracing
 from modules.models import models
-from modules.utils import shared
+from modules.offline import context
 
 KEYWORDS = [__keyword for __keyword in dir(keywords) if not __keyword.startswith('__')]
 CONVERSATION = [__conversation for __conversation in dir(conversation) if not __conversation.startswith('__')]
@@ -81,22 +82,28 @@ def speak(text: str = None, run: bool = False, block: bool = True) -> NoReturn:
     caller = sys._getframe(1).f_code.co_name  # noqa
     if text:
         text = text.replace('\n', '\t').strip()
-        shared.text_spoken = text
-        if shared.called_by_offline:
-            shared.offline_caller = caller
+        if request := context.current():
+            request.text_spoken = text
+            request.caller = caller
             return
         logger.info(f'Speaker called by: {caller!r}')
         logger.info(f'Response: {text}')
         sys.stdout.write(f"\r{text}")
-        if models.env.speech_synthesis_timeout and \
-                speech_synthesizer(text=text) and \
-                os.path.isfile(models.fileio.speech_synthesis_wav):
-            playsound(sound=models.fileio.speech_synthesis_wav, block=block)
+        synthesized = False
+        if models.env.speech_synthesis_timeout:
+            with tracing.span(stage="tts"):
+                synthesized = speech_synthesizer(text=text) and os.path.isfile(models.fileio.speech_synthesis_wav)
+        if synthesized:
+            tracing.first_audio()
+            with tracing.span(stage="playback"):
+                playsound(sound=models.fileio.speech_synthesis_wav, block=block)
             os.remove(models.fileio.speech_synthesis_wav)
         else:
             models.audio_driver.say(text=text)
     if run:
-        models.audio_driver.runAndWait()
+        tracing.first_audio()
+        with tracing.span(stage="playback"):
+            models.audio_driver.runAndWait()
     Thread(target=frequently_used, kwargs={"function_name": caller}).start() if caller in FUNCTIONS_TO_TRACK else None
 
 
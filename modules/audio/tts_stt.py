@@ -16,7 +16,7 @@ from speech_recognition import AudioFile, Recognizer, UnknownValueError
 
 from modules.audio import voices
 from modules.logger.custom_logger import logger
-from modules.utils import shared
+from modules.offline import context
 
 recognizer = Recognizer()
 
@@ -43,9 +43,9 @@ def text_to_audio(text: str, filename: Union[FilePath, str] = None) -> Union[Fil
         text: Text that has to be converted to audio.
     """
     if not filename:
-        if shared.offline_caller:
-            filename = f"{shared.offline_caller}.wav"
-            shared.offline_caller = None  # Reset caller after using it
+        if (request := context.current()) and request.caller:
+            filename = f"{request.caller}.wav"
+            request.caller = None  # Reset caller after using it
         else:
             filename = f"{int(time.time())}.wav"
     process = Process(target=_generate_audio_file, kwargs={'filename': filename, 'text': text})
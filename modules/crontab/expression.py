@@ -1,6 +1,6 @@
 import calendar
 import datetime
-from typing import Tuple, Union
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
 from modules.exceptions import InvalidArgument
 
@@ -32,6 +32,8 @@ class CronExpression:
         "@midnight": "0 0 * * *",
         "@hourly": "0 * * * *"
     }
+    SPECIAL_CHARS = ('%', '#', 'L', 'W')
+    LOOKAHEAD_DAYS = 366 * 8  # Covers expressions that only fire on leap days, including skipped century leap years
 
     def __init__(self, line: str, epoch: tuple = DEFAULT_EPOCH, epoch_utc_offset: int = 0):
         """Instantiates a CronExpression object with an optionally defined epoch.
@@ -119,7 +121,7 @@ class CronExpression:
             unified = set()
             for cron_atom in split_field_str:
                 # parse_atom only handles static cases
-                for special_char in ('%', '#', 'L', 'W'):
+                for special_char in self.SPECIAL_CHARS:
                     if special_char in cron_atom:
                         break
                 else:
@@ -129,6 +131,110 @@ class CronExpression:
 
         if self.string_tab[2] == "*" and self.string_tab[4] != "*":
             self.numerical_tab[2] = set()
+        self.compile()
+
+    def compile(self) -> None:
+        """Precompiles the static sets into bitmasks, so that matching a date doesn't require parsing or set lookups.
+
+        See Also:
+            - ``bitmasks`` holds one integer per field, where the bit at each valid value is set.
+            - ``static`` indicates that the expression has no context or epoch sensitive atoms (``%``, ``#``, ``L``,
+              ``W``), so the bitmasks alone can decide a match.
+            - ``either_day`` indicates that both day of the month and day of the week are restricted, in which case
+              a match on either one of them is sufficient.
+        """
+        self.static = not any(special in field for field in self.string_tab for special in self.SPECIAL_CHARS)
+        self.static_time = not any(special in field for field in self.string_tab[:2]
+                                   for special in self.SPECIAL_CHARS)
+        masks = [sum(1 << value for value in values) for values in self.numerical_tab]
+        if self.string_tab[2] == "*":
+            masks[2] = sum(1 << value for value in range(self.DAYS_OF_MONTH[0], self.DAYS_OF_MONTH[1] + 1))
+        self.bitmasks: Tuple[int, int, int, int, int] = tuple(masks)
+        self.either_day = self.string_tab[2] != "*" and self.string_tab[4] != "*"
+
+    def _match_static(self, year: int, month: int, day: int, hour: int, mins: int) -> bool:
+        """Matches the given date against the precompiled bitmasks."""
+        minutes, hours, days, months, weekdays = self.bitmasks
+        if not (minutes >> mins & 1 and hours >> hour & 1 and months >> month & 1):
+            return False
+        dom_hit = days >> day & 1
+        dow_hit = weekdays >> (datetime.date(year, month, day).weekday() + 1) % 7 & 1
+        if self.either_day:
+            return bool(dom_hit or dow_hit)
+        return bool(dom_hit and dow_hit)
+
+    def _times(self, hour_from: int = 0, mins_from: int = 0) -> Iterator[Tuple[int, int]]:
+        """Yields the hour and minute combinations allowed by the bitmasks, starting from the given time."""
+        for hour in _set_bits(mask=self.bitmasks[1], start=hour_from):
+            for mins in _set_bits(mask=self.bitmasks[0], start=mins_from if hour == hour_from else 0):
+                yield hour, mins
+
+    def _first_fire(self, date: datetime.date, hour_from: int, mins_from: int,
+                    utc_offset: int) -> Optional[datetime.datetime]:
+        """Returns the first time on the given date, at or after the given hour and minute, that fires the trigger."""
+        if not self.static_time:
+            for hour in range(hour_from, 24):
+                for mins in range(mins_from if hour == hour_from else 0, 60):
+                    if self.check_trigger((date.year, date.month, date.day, hour, mins), utc_offset=utc_offset):
+                        return datetime.datetime(date.year, date.month, date.day, hour, mins)
+            return
+        if (first := next(self._times(hour_from=hour_from, mins_from=mins_from), None)) is None:
+            return
+        # Hour and minute fields are static, so whether the date matches does not depend on the time
+        if self.check_trigger((date.year, date.month, date.day, *first), utc_offset=utc_offset):
+            return datetime.datetime(date.year, date.month, date.day, *first)
+
+    def next_fire(self, after: datetime.datetime = None, utc_offset: int = 0,
+                  lookahead: int = LOOKAHEAD_DAYS) -> Optional[datetime.datetime]:
+        """Computes the next time, strictly after the given time, when the trigger will be active.
+
+        Args:
+            after: Datetime after which the next fire has to be computed. Defaults to current.
+            utc_offset: UTC offset.
+            lookahead: Number of days to look ahead before giving up.
+
+        See Also:
+            - Months that are not allowed are skipped entirely, and only the allowed hours and minutes are checked.
+            - Expressions with ``%`` in the hour or minute fields are checked minute by minute, which is slower.
+
+        Returns:
+            datetime.datetime:
+            Datetime (down to the minute) of the next fire, or ``None`` if there isn't one within the lookahead.
+        """
+        start = (after or datetime.datetime.now()).replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        date = start.date()
+        last_date = date + datetime.timedelta(days=lookahead)
+        while date <= last_date:
+            if self.static and not self.bitmasks[3] >> date.month & 1:
+                date = (date.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+                continue
+            if date == start.date():
+                fire = self._first_fire(date=date, hour_from=start.hour, mins_from=start.minute, utc_offset=utc_offset)
+            else:
+                fire = self._first_fire(date=date, hour_from=0, mins_from=0, utc_offset=utc_offset)
+            if fire:
+                return fire
+            date += datetime.timedelta(days=1)
+
+    def iter_fires(self, start: datetime.datetime, end: datetime.datetime,
+                   utc_offset: int = 0) -> Iterator[datetime.datetime]:
+        """Yields every time the trigger will be active within a time range.
+
+        Args:
+            start: Start of the range (inclusive).
+            end: End of the range (exclusive).
+            utc_offset: UTC offset.
+
+        Yields:
+            datetime.datetime:
+            Datetime (down to the minute) of each fire.
+        """
+        if start == start.replace(second=0, microsecond=0):
+            start -= datetime.timedelta(minutes=1)  # next_fire is exclusive, so step back to include the start
+        fire = self.next_fire(after=start, utc_offset=utc_offset)
+        while fire and fire < end:
+            yield fire
+            fire = self.next_fire(after=fire, utc_offset=utc_offset)
 
     def check_trigger(self, date_tuple: Union[Tuple[int, int, int, int, int], Tuple[int, ...]] = None,
                       utc_offset: int = 0) -> bool:
@@ -151,6 +257,8 @@ class CronExpression:
             year, month, day, hour, mins = date_tuple
         else:
             year, month, day, hour, mins = tuple(map(int, datetime.datetime.now().strftime("%Y %m %d %H %M").split()))
+        if self.static:
+            return self._match_static(year, month, day, hour, mins)
         given_date = datetime.date(year, month, day)
         zeroday = datetime.date(*self.epoch[:3])
         last_dom = calendar.monthrange(year, month)[-1]
@@ -239,6 +347,122 @@ class CronExpression:
         return True
 
 
+class CronBatch:
+    """Initiates ``CronBatch`` object to check a collection of crontab entries against a date in one pass.
+
+    >>> CronBatch
+
+    See Also:
+        - The bitmasks of all static expressions are transposed into one bitset per field value, where the bit at
+          each expression's position is set if that expression allows the value.
+        - Checking a date is then a handful of bitwise operations, regardless of the number of expressions.
+        - Expressions with context or epoch sensitive atoms fall back to ``check_trigger``
+    """
+
+    def __init__(self, expressions: Iterable[Union[str, CronExpression]]):
+        """Parses the expressions (if required) and precompiles the transposed bitsets.
+
+        Args:
+            expressions: Crontab entries or ``CronExpression`` objects.
+        """
+        self.expressions: List[CronExpression] = [
+            each if isinstance(each, CronExpression) else CronExpression(line=each) for each in expressions
+        ]
+        self.dynamic = [index for index, each in enumerate(self.expressions) if not each.static]
+        self.fields: List[List[int]] = [[0] * (span[1] + 1) for span in CronExpression.FIELD_RANGES]
+        self.either_day = 0
+        for index, expression in enumerate(self.expressions):
+            if not expression.static:
+                continue
+            for field, mask in zip(self.fields, expression.bitmasks):
+                for value in _set_bits(mask=mask):
+                    field[value] |= 1 << index
+            if expression.either_day:
+                self.either_day |= 1 << index
+
+    def __len__(self) -> int:
+        """Built-in override."""
+        return len(self.expressions)
+
+    def check_triggers(self, date_tuple: Union[Tuple[int, int, int, int, int], Tuple[int, ...]] = None,
+                       utc_offset: int = 0) -> int:
+        """Returns a bitset indicating which expressions are active at the given time.
+
+        Args:
+            date_tuple: Tuple of year, month, date, hour and minute. Defaults to current.
+            utc_offset: UTC offset.
+
+        Returns:
+            int:
+            Integer with the bit at each matching expression's position set.
+        """
+        if date_tuple:
+            year, month, day, hour, mins = date_tuple
+        else:
+            year, month, day, hour, mins = tuple(map(int, datetime.datetime.now().strftime("%Y %m %d %H %M").split()))
+        minutes, hours, days, months, weekdays = self.fields
+        dom_hit = days[day]
+        dow_hit = weekdays[(datetime.date(year, month, day).weekday() + 1) % 7]
+        day_hit = ((dom_hit | dow_hit) & self.either_day) | (dom_hit & dow_hit & ~self.either_day)
+        matched = minutes[mins] & hours[hour] & months[month] & day_hit
+        for index in self.dynamic:
+            if self.expressions[index].check_trigger((year, month, day, hour, mins), utc_offset=utc_offset):
+                matched |= 1 << index
+        return matched
+
+    def triggered(self, date_tuple: Union[Tuple[int, int, int, int, int], Tuple[int, ...]] = None,
+                  utc_offset: int = 0) -> List[CronExpression]:
+        """Returns the expressions that are active at the given time, in the order they were received.
+
+        Args:
+            date_tuple: Tuple of year, month, date, hour and minute. Defaults to current.
+            utc_offset: UTC offset.
+
+        Returns:
+            list:
+            List of ``CronExpression`` objects.
+        """
+        return [self.expressions[index] for index in _set_bits(mask=self.check_triggers(date_tuple, utc_offset))]
+
+    def next_fire(self, after: datetime.datetime = None,
+                  utc_offset: int = 0) -> Optional[Tuple[datetime.datetime, List[CronExpression]]]:
+        """Computes the earliest next fire among all the expressions.
+
+        Args:
+            after: Datetime after which the next fire has to be computed. Defaults to current.
+            utc_offset: UTC offset.
+
+        Returns:
+            tuple:
+            Tuple of the datetime of the next fire and the expressions that fire at that time.
+        """
+        fires = [(expression.next_fire(after=after, utc_offset=utc_offset), expression)
+                 for expression in self.expressions]
+        if not (fires := [(fire, expression) for fire, expression in fires if fire]):
+            return
+        earliest = min(fire for fire, _ in fires)
+        return earliest, [expression for fire, expression in fires if fire == earliest]
+
+
+def _set_bits(mask: int, start: int = 0) -> Iterator[int]:
+    """Yields the position of each bit that is set in the mask, starting from the given position.
+
+    Args:
+        mask: Integer to be scanned.
+        start: Position to start from.
+
+    Yields:
+        int:
+        Position of each set bit in ascending order.
+    """
+    mask >>= start
+    while mask:
+        lowest = mask & -mask
+        position = lowest.bit_length() - 1
+        yield start + position
+        mask ^= lowest
+
+
 def parse_atom(parse: str, minmax: tuple) -> set:
     """Returns a set containing valid values for a given cron-style range of numbers.
 
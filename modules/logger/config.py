@@ -6,6 +6,8 @@ from pydantic import BaseModel
 
 from modules.logger.custom_logger import custom_handler, logger
 
+CRON_LOG_FILE = os.path.join('logs', 'cron_%d-%m-%Y.log')  # Used by api functions that run on cron schedule
+
 
 def multiprocessing_logger(filename: str, log_format: Formatter = None) -> str:
     """Remove existing handlers and adds a new handler when a subprocess kicks in.
@@ -18,6 +18,7 @@ from typing import Union
 
 import pytz
 
+from modules.logger import listener
 from modules.models import models
 
 if not os.path.isdir(os.path.join('logs', 'api')) and not models.settings.limited:
@@ -41,15 +42,19 @@ def log_file(filename: str) -> str:
     return datetime.now().strftime(filename)
 
 
-def custom_handler(filename: str = None, log_format: logging.Formatter = None) -> logging.FileHandler:
+def custom_handler(filename: str = None,
+                   log_format: logging.Formatter = None) -> Union[logging.FileHandler, listener.QueueFileHandler]:
     """Creates a FileHandler, sets the log format and returns it.
 
     Returns:
-        logging.FileHandler:
-        Returns file handler.
+        Union[logging.FileHandler, listener.QueueFileHandler]:
+        Returns file handler, or a handler that queues the records for the log listener when ``LOG_QUEUE`` is set.
     """
-    handler = logging.FileHandler(filename=log_file(filename=filename or os.path.join('logs', 'jarvis_%d-%m-%Y.log')),
-                                  mode='a')
+    filename = filename or os.path.join('logs', 'jarvis_%d-%m-%Y.log')
+    if models.env.log_queue:
+        handler = listener.QueueFileHandler(filename=filename)
+    else:
+        handler = logging.FileHandler(filename=log_file(filename=filename), mode='a')
     handler.setFormatter(fmt=log_format or DEFAULT_LOG_FORMAT)
     return handler
 
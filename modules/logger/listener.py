@@ -0,0 +1,343 @@
+# noinspection PyUnresolvedReferences
+"""Sends the log records of every process to a single writer, so that logging I/O stays out of the hot paths.
+
+>>> Listener
+
+See Also:
+    - Enabled with the env var ``LOG_QUEUE``, each process keeps logging to the same file as it did before.
+    - Records are formatted by the process that logs them and put on an in-memory queue by a ``QueueHandler``.
+      A forwarder thread in each process sends the queued lines to the listener in batches, over a local socket.
+    - The listener runs in a process of its own and writes each batch with a single write per file. Files are rotated
+      when the date in their name changes or when they grow beyond ``LOG_MAX_BYTES``, and rotated files are gzipped.
+    - Lines are written to the file by the forwarder itself, when the listener can't be reached.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import socket
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler
+from multiprocessing import Process, util
+from typing import Dict, Iterable, List, NoReturn, TextIO, Tuple, Union
+
+from modules.models import models
+
+HOST = "127.0.0.1"
+BATCH_SIZE = 500
+STARTUP_WAIT = 5  # Seconds a new process waits for the listener to come up, before writing to the files directly
+
+Line = Tuple[str, str]
+
+
+def compress(path: str) -> NoReturn:
+    """Compresses a file with gzip and removes the original.
+
+    Args:
+        path: File to be compressed.
+    """
+    with open(path, 'rb') as source, gzip.open(f"{path}.gz", 'wb') as destination:
+        shutil.copyfileobj(source, destination)
+    os.remove(path)
+
+
+def rotate(path: str) -> NoReturn:
+    """Renames a log file with the next available index, and compresses it in a background thread.
+
+    Args:
+        path: Log file to be rotated.
+    """
+    index = 1
+    while os.path.exists(f"{path}.{index}") or os.path.exists(f"{path}.{index}.gz"):
+        index += 1
+    os.rename(path, f"{path}.{index}")
+    threading.Thread(target=compress, args=(f"{path}.{index}",)).start()
+
+
+class RotatingWriter:
+    """Initiates ``RotatingWriter`` object to append lines to log files, that rotate by date and size.
+
+    >>> RotatingWriter
+
+    See Also:
+        - Filenames can have ``strftime`` directives, which are resolved at the time of each write.
+    """
+
+    def __init__(self, max_bytes: int = models.env.log_max_bytes):
+        """Stores the size after which a file is rotated.
+
+        Args:
+            max_bytes: Size of a file in bytes, after which it is rotated.
+        """
+        self.max_bytes = max_bytes
+        self.files: Dict[str, Tuple[str, TextIO]] = {}
+
+    def close(self, filename: str) -> str:
+        """Closes the file that is open for a filename.
+
+        Args:
+            filename: Filename as logged, before resolving the date in it.
+
+        Returns:
+            str:
+            Path of the file that was closed.
+        """
+        path, file = self.files.pop(filename)
+        file.close()
+        return path
+
+    def write(self, filename: str, lines: Iterable[str]) -> NoReturn:
+        """Appends lines to a log file, rotating the file before or after the write when due.
+
+        Args:
+            filename: Filename as logged, before resolving the date in it.
+            lines: Lines to be written.
+        """
+        path = datetime.now().strftime(filename)
+        if filename in self.files and self.files[filename][0] != path:
+            rotate(path=self.close(filename=filename))
+        if filename not in self.files:
+            os.makedirs(os.path.dirname(path) or os.curdir, exist_ok=True)
+            self.files[filename] = (path, open(path, 'a'))
+        file = self.files[filename][1]
+        file.write(''.join(f"{line}\n" for line in lines))
+        file.flush()
+        if file.tell() >= self.max_bytes:
+            rotate(path=self.close(filename=filename))
+
+    def write_batch(self, batch: List[Line]) -> NoReturn:
+        """Groups a batch of lines by their file, and writes them with a single write per file.
+
+        Args:
+            batch: List of filename and line.
+        """
+        grouped: Dict[str, List[str]] = {}
+        for filename, line in batch:
+            grouped.setdefault(filename, []).append(line)
+        for filename, lines in grouped.items():
+            try:
+                self.write(filename=filename, lines=lines)
+            except OSError as error:
+                sys.stderr.write(f"Failed to write {len(lines)} line(s) to {filename!r}: {error}\n")
+
+
+def drain(source: queue.SimpleQueue) -> List[Union[Line, None]]:
+    """Waits for an item on the queue, and collects the ones that are already waiting along with it.
+
+    Args:
+        source: Queue to drain.
+
+    Returns:
+        List[Union[Line, None]]:
+        Batch of items, up to the batch size.
+    """
+    batch = [source.get()]
+    while len(batch) < BATCH_SIZE:
+        try:
+            batch.append(source.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+class Forwarder:
+    """Initiates ``Forwarder`` object to send the lines queued within a process to the listener in batches.
+
+    >>> Forwarder
+
+    """
+
+    def __init__(self):
+        """Creates the queue and starts the thread that sends the lines from it."""
+        self.queue = queue.SimpleQueue()
+        self.sock: Union[socket.socket, None] = None
+        self.fallback: Union[RotatingWriter, None] = None
+        self.deadline = time.time() + STARTUP_WAIT
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def connect(self) -> bool:
+        """Connects to the listener, waiting for it to come up only until the startup deadline.
+
+        Returns:
+            bool:
+            Boolean flag to indicate whether the connection is available.
+        """
+        while not self.sock:
+            try:
+                self.sock = socket.create_connection(address=(HOST, models.env.log_port), timeout=STARTUP_WAIT)
+            except OSError:
+                if time.time() >= self.deadline:
+                    return False
+                time.sleep(0.1)
+        return True
+
+    def send(self, batch: List[Line]) -> NoReturn:
+        """Sends a batch to the listener, or writes it to the files directly if the listener can't be reached.
+
+        Args:
+            batch: List of filename and line.
+        """
+        payload = ''.join(json.dumps({"file": filename, "line": line}) + "\n" for filename, line in batch).encode()
+        for _ in range(2):  # Reconnects once, in case the listener was restarted
+            if not self.connect():
+                break
+            try:
+                self.sock.sendall(payload)
+                return
+            except OSError:
+                self.sock.close()
+                self.sock = None
+        if not self.fallback:
+            self.fallback = RotatingWriter()
+        self.fallback.write_batch(batch=batch)
+
+    def run(self) -> NoReturn:
+        """Sends the queued lines in batches, until a None is queued."""
+        while True:
+            batch = drain(source=self.queue)
+            lines = [line for line in batch if line is not None]
+            if lines:
+                self.send(batch=lines)
+            if len(lines) != len(batch):
+                return
+
+    def stop(self, timeout: Union[int, float] = 3) -> NoReturn:
+        """Sends the lines that are still queued, before the process exits.
+
+        Args:
+            timeout: Seconds to wait for the queued lines to be sent.
+        """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout=timeout)
+
+
+_lock = threading.Lock()
+_forwarders: Dict[int, Forwarder] = {}
+
+
+def forwarder() -> Forwarder:
+    """Gets the forwarder of the current process, creating it on first use.
+
+    Returns:
+        Forwarder:
+        Forwarder that belongs to the current process.
+
+    See Also:
+        - Forwarders are stored by process ID, as a forked process inherits the parent's but not its thread.
+    """
+    pid = os.getpid()
+    if not (current := _forwarders.get(pid)):
+        with _lock:
+            if not (current := _forwarders.get(pid)):
+                current = _forwarders[pid] = Forwarder()
+                atexit.register(current.stop)
+                util.Finalize(current, current.stop, exitpriority=10)  # Child processes exit without atexit
+    return current
+
+
+class QueueFileHandler(QueueHandler):
+    """Initiates ``QueueFileHandler`` object to queue the lines of a log file, instead of writing them.
+
+    >>> QueueFileHandler
+
+    """
+
+    def __init__(self, filename: str):
+        """Stores the filename and the name it resolves to at the time of creation.
+
+        Args:
+            filename: Log filename, which can have ``strftime`` directives.
+        """
+        # Queue is looked up for each record, since handlers are inherited by forked processes
+        super().__init__(queue=None)
+        self.filename = filename
+        self.baseFilename = os.path.abspath(datetime.now().strftime(filename))
+
+    def prepare(self, record: logging.LogRecord) -> str:
+        """Formats the record in the process that logged it, so that only the line is sent to the listener.
+
+        Args:
+            record: Log record.
+
+        Returns:
+            str:
+            Formatted line.
+        """
+        return self.format(record)
+
+    def enqueue(self, record: str) -> NoReturn:
+        """Queues the line for the forwarder of the current process.
+
+        Args:
+            record: Formatted line.
+        """
+        forwarder().queue.put((self.filename, record))
+
+
+class RecordHandler(socketserver.StreamRequestHandler):
+    """Initiates ``RecordHandler`` object to receive the lines sent by a forwarder.
+
+    >>> RecordHandler
+
+    """
+
+    def handle(self) -> NoReturn:
+        """Queues each line received for the writer, until the forwarder disconnects."""
+        for payload in self.rfile:
+            try:
+                entry = json.loads(payload)
+            except json.JSONDecodeError:  # Partial payload from a process that was killed mid-send
+                continue
+            self.server.lines.put((entry["file"], entry["line"]))
+
+
+class ListenerServer(socketserver.ThreadingTCPServer):
+    """Initiates ``ListenerServer`` object to accept a connection from each process.
+
+    >>> ListenerServer
+
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+    lines = queue.SimpleQueue()
+
+
+def writer(lines: queue.SimpleQueue) -> NoReturn:
+    """Writes the lines received from all the processes in batches.
+
+    Args:
+        lines: Queue of filename and line.
+    """
+    rotating = RotatingWriter()
+    while True:
+        rotating.write_batch(batch=drain(source=lines))
+
+
+def log_listener() -> NoReturn:
+    """Receives the lines from every process and writes them through a single writer thread."""
+    with ListenerServer((HOST, models.env.log_port), RecordHandler) as server:
+        threading.Thread(target=writer, args=(server.lines,), daemon=True).start()
+        server.serve_forever()
+
+
+def start_listener() -> Process:
+    """Starts the listener in a daemon process.
+
+    Returns:
+        Process:
+        Process running the listener.
+    """
+    process = Process(target=log_listener, daemon=True)
+    process.start()
+    return process
@@ -12,6 +12,7 @@ from modules.audio import speaker
 from modules.database import database
 from modules.logger.custom_logger import logger
 from modules.models import models
+from modules.offline import context
 from modules.retry import retry
 from modules.utils import shared, support
 
@@ -123,10 +124,12 @@ def events() -> None:
         Process(target=events_writer).start()
         logger.warning(f"Date in event status ({event_status[1]}) does not match the current date "
                        f"({datetime.now().strftime('%Y_%m_%d')})")
+        context.fail()
         speaker.speak(text=f"Events table is outdated {models.env.title}. Please try again in a minute or two.")
     else:
         if shared.called_by_offline:
             Process(target=events_writer).start()
+            context.fail()
             speaker.speak(text=f"Events table is empty {models.env.title}. Please try again in a minute or two.")
             return
         event = ThreadPool(processes=1).apply_async(func=events_gatherer)  # Runs parallely and awaits completion
@@ -136,5 +139,6 @@ def events() -> None:
             speaker.speak(text=event.get(timeout=60), run=True)
         except ThreadTimeoutError:
             logger.error("Unable to read the calendar within 60 seconds.")
+            context.fail()
             speaker.speak(text=f"I wasn't able to read your calendar within the set time limit {models.env.title}!",
                           run=True)
@@ -14,6 +14,7 @@ from modules.database import database
 from modules.exceptions import EgressErrors
 from modules.logger.custom_logger import logger
 from modules.models import models
+from modules.offline import context
 from modules.retry import retry
 from modules.utils import shared
 
@@ -93,10 +94,12 @@ def meetings() -> None:
         Process(target=meetings_writer).start()
         logger.warning(f"Date in meeting status ({meeting_status[1]}) does not match the current date "
                        f"({datetime.now().strftime('%Y_%m_%d')})")
+        context.fail()
         speaker.speak(text=f"Meetings table is outdated {models.env.title}. Please try again in a minute or two.")
     else:
         if shared.called_by_offline:
             Process(target=meetings_writer).start()
+            context.fail()
             speaker.speak(text=f"Meetings table is empty {models.env.title}. Please try again in a minute or two.")
             return
         meeting = ThreadPool(processes=1).apply_async(func=meetings_gatherer)  # Runs parallely and awaits completion
@@ -105,5 +108,6 @@ def meetings() -> None:
             speaker.speak(text=meeting.get(timeout=60), run=True)
         except ThreadTimeoutError:
             logger.error("Unable to read the calendar schedule within 60 seconds.")
+            context.fail()
             speaker.speak(text=f"I wasn't able to read your calendar within the set time limit {models.env.title}!",
                           run=True)
@@ -0,0 +1,176 @@
+# noinspection PyUnresolvedReferences
+"""Latency of ``conditions``, split into finding the intent of a phrase and running the handler of that intent.
+
+>>> Dispatch
+
+See Also:
+    - The intent is the name of the keyword list that matched last, before the handler took over.
+    - Phrases that match no intent are recorded as ``unrecognized``, with all the time counted as dispatch.
+    - Both are also added as spans to the voice trace in progress, if there is one.
+    - ``observe`` collects the dispatches that complete within it, to find out where each phrase was routed to.
+"""
+
+import contextlib
+import functools
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from modules.conditions import conversation
+from modules.conditions import keywords as keywords_mod
+from modules.metrics import tracing
+from modules.metrics.registry import registry
+
+DISPATCH = registry.histogram(name="intent_dispatch_seconds",
+                              documentation="Time taken to find the intent of a phrase.",
+                              labels=("intent",))
+HANDLER = registry.histogram(name="intent_handler_seconds",
+                             documentation="Time taken by the handler of an intent.",
+                             labels=("intent",))
+
+# Keyword lists that are only used to veto another match
+IGNORED = ("avoid",)
+
+
+class Dispatch:
+    """Initiates ``Dispatch`` object to hold the intent matched by a phrase and when it was matched.
+
+    >>> Dispatch
+
+    """
+
+    def __init__(self):
+        """Stores the time when the dispatch started."""
+        self.start = time.perf_counter()
+        self.intent = None
+        self.matched = None
+        self.end = None
+
+
+_current: ContextVar[Union[Dispatch, None]] = ContextVar("dispatch", default=None)
+_observers: ContextVar[Union[List[Dispatch], None]] = ContextVar("observers", default=None)
+
+
+# Name of each keyword list by its id, along with the list to confirm the id, and the keywords it was built from
+_index: Dict[str, Any] = {"source": None, "names": {}}
+
+
+def names() -> Dict[int, Tuple[str, Iterable[str]]]:
+    """Maps the id of each list in the keywords and the conversation module to its name.
+
+    Returns:
+        Dict[int, Tuple[str, Iterable[str]]]:
+        Dictionary of the id of each list and a tuple of its name and the list, built again only when the keywords
+        are reloaded.
+    """
+    if _index["source"] is not (source := keywords_mod.keywords):
+        mapping = {}
+        for module in (vars(source), vars(conversation)):
+            for name, value in module.items():
+                mapping.setdefault(id(value), (name, value))
+        _index["names"], _index["source"] = mapping, source
+    return _index["names"]
+
+
+def intent_name(match_list: Iterable[str]) -> Union[str, None]:
+    """Gets the name of a keyword list.
+
+    Args:
+        match_list: Keyword list that was matched.
+
+    Returns:
+        str:
+        Name of the list in the keywords or the conversation module, None if it is neither.
+    """
+    if (entry := names().get(id(match_list))) and entry[1] is match_list:
+        return entry[0]
+
+
+def recorder(func: Callable) -> Callable:
+    """Wrapper for ``word_match`` to record the intent of the dispatch in progress.
+
+    Args:
+        func: Takes the function as an argument.
+
+    Returns:
+        Callable:
+        Calls the wrapper function.
+    """
+
+    @functools.wraps(func)
+    def wrapper(phrase: str, match_list: Iterable[str], strict: bool = False) -> Union[str, None]:
+        """Matches the phrase and records the name of the list, if it matched within a dispatch.
+
+        Args:
+            phrase: Takes the spoken phrase as an argument.
+            match_list: List or tuple of words against which the phrase has to be checked.
+            strict: Look for the exact word match instead of regex.
+
+        Returns:
+            str:
+            Returns the word that was matched.
+        """
+        matched = func(phrase=phrase, match_list=match_list, strict=strict)
+        if matched and (dispatch := _current.get()):
+            if (name := intent_name(match_list=match_list)) and name not in IGNORED:
+                dispatch.intent = name
+                dispatch.matched = time.perf_counter()
+        return matched
+
+    return wrapper
+
+
+def instrument(func: Callable) -> Callable:
+    """Wrapper for ``conditions`` to observe the dispatch and handler latency of each phrase.
+
+    Args:
+        func: Takes the function as an argument. Implemented as a decorator.
+
+    Returns:
+        Callable:
+        Calls the wrapper function.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> Any:
+        """Runs the function within a dispatch of its own.
+
+        Returns:
+            Any:
+            Return value of the function implemented.
+        """
+        dispatch = Dispatch()
+        token = _current.set(dispatch)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+            end = dispatch.end = time.perf_counter()
+            if (observer := _observers.get()) is not None:
+                observer.append(dispatch)
+            if dispatch.intent:
+                DISPATCH.observe(dispatch.matched - dispatch.start, intent=dispatch.intent)
+                HANDLER.observe(end - dispatch.matched, intent=dispatch.intent)
+                tracing.record(stage="dispatch", start=dispatch.start, end=dispatch.matched)
+                tracing.record(stage="handler", start=dispatch.matched, end=end)
+            else:
+                DISPATCH.observe(end - dispatch.start, intent="unrecognized")
+                tracing.record(stage="dispatch", start=dispatch.start, end=end)
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def observe() -> Iterator[List[Dispatch]]:
+    """Collects the dispatches that complete within the block, to find out the intent each phrase was routed to.
+
+    Yields:
+        List[Dispatch]:
+        List that is appended with each dispatch as it completes.
+    """
+    dispatches = []
+    token = _observers.set(dispatches)
+    try:
+        yield dispatches
+    finally:
+        _observers.reset(token)
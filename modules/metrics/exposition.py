@@ -0,0 +1,90 @@
+# noinspection PyUnresolvedReferences
+"""Renders the snapshots in the sink, in the Prometheus text exposition format.
+
+>>> Exposition
+
+See Also:
+    - Counters and histograms are summed across the processes, so each series covers all of Jarvis.
+    - Gauges are not summed, the latest snapshot that carries a series wins.
+"""
+
+import json
+import math
+from typing import Any, Dict, List, Tuple, Union
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape(value: str, quotes: bool = True) -> str:
+    """Escapes a label value or a help text.
+
+    Args:
+        value: Text to be escaped.
+        quotes: Whether double quotes have to be escaped, which is only the case for label values.
+
+    Returns:
+        str:
+        Text with backslashes, new lines and optionally double quotes escaped.
+    """
+    value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def format_value(value: Union[int, float]) -> str:
+    """Formats a sample value.
+
+    Args:
+        value: Value of the sample.
+
+    Returns:
+        str:
+        Integral values without the decimal point, infinity as ``+Inf``
+    """
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def aggregate(rows: List[Tuple[str, str, str, str, str, str, float]]) -> Dict[str, Dict[str, Any]]:
+    """Merges the snapshots of all the sources into a single value per series.
+
+    Args:
+        rows: Rows loaded from the sink.
+
+    Returns:
+        Dict[str, Dict[str, Any]]:
+        Dictionary of metric name and its kind, help text and the value of each series.
+    """
+    families = {}
+    for source, metric, kind, documentation, sample, labels, value in rows:
+        family = families.setdefault(metric, {"kind": kind, "help": documentation, "series": {}})
+        key = (sample, labels)
+        if kind == "gauge" or key not in family["series"]:
+            family["series"][key] = value
+        else:
+            family["series"][key] += value
+    return families
+
+
+def render(rows: List[Tuple[str, str, str, str, str, str, float]]) -> str:
+    """Renders the snapshots of all the sources as a single exposition.
+
+    Args:
+        rows: Rows loaded from the sink.
+
+    Returns:
+        str:
+        Metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric, family in aggregate(rows=rows).items():
+        lines.append(f"# HELP {metric} {escape(family['help'], quotes=False)}")
+        lines.append(f"# TYPE {metric} {family['kind']}")
+        for (sample, labels), value in family["series"].items():
+            if labels := json.loads(labels):
+                label_text = ",".join(f'{name}="{escape(label)}"' for name, label in labels.items())
+                lines.append(f"{sample}{{{label_text}}} {format_value(value)}")
+            else:
+                lines.append(f"{sample} {format_value(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,52 @@
+# noinspection PyUnresolvedReferences
+"""Resource usage of the processes listed in the processes mapping file.
+
+>>> Process
+
+See Also:
+    - CPU utilization is measured between two collections, so the first collection of a process reports zero.
+"""
+
+import os
+from typing import Dict, NoReturn
+
+import psutil
+import yaml
+
+from modules.metrics.registry import registry
+from modules.models import models
+
+RSS = registry.gauge(name="process_resident_memory_bytes",
+                     documentation="Resident memory of each process in the processes mapping file.",
+                     labels=("process",))
+CPU = registry.gauge(name="process_cpu_percent",
+                     documentation="CPU utilization of each process in the processes mapping file, since the "
+                                   "previous collection.",
+                     labels=("process",))
+UP = registry.gauge(name="process_up",
+                    documentation="Whether each process in the processes mapping file is running.",
+                    labels=("process",))
+
+_handles: Dict[int, psutil.Process] = {}
+
+
+def collect() -> NoReturn:
+    """Updates the gauges for every process in the processes mapping file."""
+    if not os.path.isfile(models.fileio.processes):
+        return
+    with open(models.fileio.processes) as file:
+        mapping = yaml.load(stream=file, Loader=yaml.FullLoader) or {}
+    RSS.clear()
+    CPU.clear()
+    UP.clear()
+    for name, (pid, _) in mapping.items():
+        try:
+            if not (handle := _handles.get(pid)) or not handle.is_running():
+                handle = _handles[pid] = psutil.Process(pid=pid)
+            with handle.oneshot():
+                RSS.set(handle.memory_info().rss, process=name)
+                CPU.set(handle.cpu_percent(interval=None), process=name)
+            UP.set(1, process=name)
+        except psutil.Error:  # Process has exited, or belongs to another user
+            _handles.pop(pid, None)
+            UP.set(0, process=name)
@@ -0,0 +1,324 @@
+# noinspection PyUnresolvedReferences
+"""In-process registry for counters, histograms and gauges shared across modules.
+
+>>> Registry
+
+See Also:
+    - Counters and histograms keep a cell per thread, so recording an observation never waits on a lock.
+    - Cells are merged only when the samples are collected, which is far less frequent than the observations.
+    - Cell of a thread that has ended is folded into a base, so the cells don't grow with every thread that ever
+      recorded an observation.
+"""
+
+import math
+import threading
+import weakref
+from typing import Dict, List, Tuple, Union
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class Counter:
+    """Initiates ``Counter`` object to track a monotonically increasing value per label set.
+
+    >>> Counter
+
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        """Instantiates the counter with an empty value store.
+
+        Args:
+            name: Name of the metric.
+            documentation: Help text describing the metric.
+            labels: Names of the labels that each observation has to carry.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._base: Dict[Tuple[str, ...], float] = {}
+        self._cells: Dict[int, Dict[Tuple[str, ...], float]] = {}
+        self._local = threading.local()
+        # Taken when a thread records its first observation or ends, and reentrant as the garbage collector can
+        # fold a cell while the lock is held
+        self._lock = threading.RLock()
+
+    def _cell(self) -> Dict[Tuple[str, ...], float]:
+        """Gets the cell owned by the current thread, which is the only thread that writes to it."""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = {}
+            with self._lock:
+                self._cells[id(cell)] = cell
+            weakref.finalize(threading.current_thread(), self._retire, cell)
+            return cell
+
+    def _retire(self, cell: Dict[Tuple[str, ...], float]) -> None:
+        """Folds the cell of a thread that has ended into the base."""
+        with self._lock:
+            del self._cells[id(cell)]
+            for key, value in cell.items():
+                self._base[key] = self._base.get(key, 0) + value
+
+    def _key(self, labels: Dict[str, Union[str, int, float]]) -> Tuple[str, ...]:
+        """Converts the keyword arguments into an ordered tuple of label values."""
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def inc(self, amount: Union[int, float] = 1, **labels: Union[str, int, float]) -> None:
+        """Increments the counter for the given label set.
+
+        Args:
+            amount: Value to increment by.
+            **labels: Label values for the observation.
+        """
+        cell = self._cell()
+        key = self._key(labels)
+        cell[key] = cell.get(key, 0) + amount
+
+    def samples(self) -> List[Sample]:
+        """Returns the current value of each label set.
+
+        Returns:
+            list:
+            List of tuples with the sample name, labels and value.
+        """
+        with self._lock:
+            values = dict(self._base)
+            cells = list(self._cells.values())
+        for cell in cells:
+            for key, value in dict(cell).items():  # Copying a dict is atomic, even while its owner writes to it
+                values[key] = values.get(key, 0) + value
+        return [(self.name, dict(zip(self.labels, key)), value) for key, value in values.items()]
+
+
+class Histogram:
+    """Initiates ``Histogram`` object to track the distribution of observed values per label set.
+
+    >>> Histogram
+
+    """
+
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, math.inf)
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[Union[int, float], ...] = DEFAULT_BUCKETS):
+        """Instantiates the histogram with the upper bounds of each bucket.
+
+        Args:
+            name: Name of the metric.
+            documentation: Help text describing the metric.
+            labels: Names of the labels that each observation has to carry.
+            buckets: Upper bounds (inclusive) for each bucket.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != math.inf:
+            self.buckets += (math.inf,)
+        # Each entry holds the count for every bucket, followed by the sum of the observations
+        self._base: Dict[Tuple[str, ...], List[Union[int, float]]] = {}
+        self._cells: Dict[int, Dict[Tuple[str, ...], List[Union[int, float]]]] = {}
+        self._local = threading.local()
+        # Taken when a thread records its first observation or ends, and reentrant as the garbage collector can
+        # fold a cell while the lock is held
+        self._lock = threading.RLock()
+
+    def _cell(self) -> Dict[Tuple[str, ...], List[Union[int, float]]]:
+        """Gets the cell owned by the current thread, which is the only thread that writes to it."""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = {}
+            with self._lock:
+                self._cells[id(cell)] = cell
+            weakref.finalize(threading.current_thread(), self._retire, cell)
+            return cell
+
+    def _retire(self, cell: Dict[Tuple[str, ...], List[Union[int, float]]]) -> None:
+        """Folds the cell of a thread that has ended into the base."""
+        with self._lock:
+            del self._cells[id(cell)]
+            for key, entry in cell.items():
+                if total := self._base.get(key):
+                    self._base[key] = [a + b for a, b in zip(total, entry)]
+                else:
+                    self._base[key] = list(entry)
+
+    def _key(self, labels: Dict[str, Union[str, int, float]]) -> Tuple[str, ...]:
+        """Converts the keyword arguments into an ordered tuple of label values."""
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def observe(self, value: Union[int, float], **labels: Union[str, int, float]) -> None:
+        """Records an observation in the first bucket that can hold it.
+
+        Args:
+            value: Observed value.
+            **labels: Label values for the observation.
+        """
+        key = self._key(labels)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        cell = self._cell()
+        if (entry := cell.get(key)) is None:
+            entry = cell[key] = [0] * (len(self.buckets) + 1)
+        entry[index] += 1
+        entry[-1] += value
+
+    def samples(self) -> List[Sample]:
+        """Returns cumulative bucket counts, sum and count for each label set.
+
+        Returns:
+            list:
+            List of tuples with the sample name, labels and value.
+        """
+        with self._lock:
+            merged: Dict[Tuple[str, ...], List[Union[int, float]]] = dict(self._base)
+            cells = list(self._cells.values())
+        for cell in cells:
+            for key, entry in dict(cell).items():
+                entry = list(entry)  # Copying a list is atomic, even while its owner writes to it
+                if total := merged.get(key):
+                    merged[key] = [a + b for a, b in zip(total, entry)]
+                else:
+                    merged[key] = entry
+        samples = []
+        for key, entry in merged.items():
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry[:-1]):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf" if bound == math.inf else str(bound)},
+                                cumulative))
+            samples.append((f"{self.name}_sum", labels, entry[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Gauge:
+    """Initiates ``Gauge`` object to track a value that can go up and down per label set.
+
+    >>> Gauge
+
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        """Instantiates the gauge with an empty value store.
+
+        Args:
+            name: Name of the metric.
+            documentation: Help text describing the metric.
+            labels: Names of the labels that each value has to carry.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def _key(self, labels: Dict[str, Union[str, int, float]]) -> Tuple[str, ...]:
+        """Converts the keyword arguments into an ordered tuple of label values."""
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def set(self, value: Union[int, float], **labels: Union[str, int, float]) -> None:
+        """Sets the value for the given label set.
+
+        Args:
+            value: Current value.
+            **labels: Label values for the value.
+        """
+        self._values[self._key(labels)] = value  # A single assignment is atomic, so no lock is needed
+
+    def clear(self) -> None:
+        """Removes the values of all the label sets."""
+        self._values = {}
+
+    def samples(self) -> List[Sample]:
+        """Returns the current value of each label set.
+
+        Returns:
+            list:
+            List of tuples with the sample name, labels and value.
+        """
+        return [(self.name, dict(zip(self.labels, key)), value) for key, value in dict(self._values).items()]
+
+
+class Registry:
+    """Initiates ``Registry`` object to hold all the metrics created within a process.
+
+    >>> Registry
+
+    """
+
+    def __init__(self):
+        """Instantiates an empty mapping of metric names and the metric objects."""
+        self._metrics: Dict[str, Union[Counter, Histogram, Gauge]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Union[Counter, Histogram, Gauge]) -> Union[Counter, Histogram, Gauge]:
+        """Stores the metric unless another metric with the same name exists already."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        """Gets or creates a counter.
+
+        Args:
+            name: Name of the metric.
+            documentation: Help text describing the metric.
+            labels: Names of the labels.
+
+        Returns:
+            Counter:
+            Counter object registered under the given name.
+        """
+        return self._register(Counter(name=name, documentation=documentation, labels=labels))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[Union[int, float], ...] = Histogram.DEFAULT_BUCKETS) -> Histogram:
+        """Gets or creates a histogram.
+
+        Args:
+            name: Name of the metric.
+            documentation: Help text describing the metric.
+            labels: Names of the labels.
+            buckets: Upper bounds for each bucket.
+
+        Returns:
+            Histogram:
+            Histogram object registered under the given name.
+        """
+        return self._register(Histogram(name=name, documentation=documentation, labels=labels, buckets=buckets))
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        """Gets or creates a gauge.
+
+        Args:
+            name: Name of the metric.
+            documentation: Help text describing the metric.
+            labels: Names of the labels.
+
+        Returns:
+            Gauge:
+            Gauge object registered under the given name.
+        """
+        return self._register(Gauge(name=name, documentation=documentation, labels=labels))
+
+    def collect(self) -> List[Union[Counter, Histogram, Gauge]]:
+        """Returns all the registered metrics.
+
+        Returns:
+            list:
+            List of metric objects.
+        """
+        with self._lock:
+            return list(self._metrics.values())
+
+
+registry = Registry()
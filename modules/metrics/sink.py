@@ -0,0 +1,102 @@
+# noinspection PyUnresolvedReferences
+"""SQLite sink that lets each process publish a snapshot of its metrics registry.
+
+>>> Sink
+
+See Also:
+    - Every process flushes its own registry, replacing the rows it wrote previously.
+    - Readers load the latest snapshot from all processes without having to talk to them.
+"""
+
+import json
+import threading
+import time
+from typing import Dict, List, NoReturn, Tuple, Union
+
+from modules.database import database
+from modules.logger.custom_logger import logger
+from modules.metrics.registry import registry
+from modules.models import models
+
+COLUMNS = ("source", "metric", "kind", "help", "sample", "labels", "value")
+
+metrics_db = database.Database(database=models.fileio.metrics_db)
+metrics_db.create_table(table_name="metrics", columns=COLUMNS)
+
+_flushers: Dict[str, threading.Thread] = {}
+
+
+def flush(source: str) -> NoReturn:
+    """Writes the current state of the registry for the given source.
+
+    Args:
+        source: Name of the process that owns the metrics.
+    """
+    rows = []
+    for metric in registry.collect():
+        for sample, labels, value in metric.samples():
+            rows.append((source, metric.name, metric.kind, metric.documentation, sample,
+                         json.dumps(labels, sort_keys=True), value))
+    with metrics_db.connection:
+        cursor = metrics_db.connection.cursor()
+        cursor.execute("DELETE FROM metrics WHERE source=(?)", (source,))
+        cursor.executemany(f"INSERT INTO metrics {COLUMNS} VALUES ({','.join('?' for _ in COLUMNS)});", rows)
+        metrics_db.connection.commit()
+
+
+def load() -> List[Tuple[str, str, str, str, str, str, float]]:
+    """Reads the latest snapshot flushed by every process.
+
+    Returns:
+        list:
+        List of tuples in the order of ``COLUMNS``.
+    """
+    with metrics_db.connection:
+        cursor = metrics_db.connection.cursor()
+        return cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM metrics").fetchall()
+
+
+def clear(prefix: str) -> NoReturn:
+    """Removes the snapshots of all the sources that start with the given prefix.
+
+    Args:
+        prefix: Prefix of the sources, to remove snapshots left behind by processes that have exited.
+    """
+    with metrics_db.connection:
+        cursor = metrics_db.connection.cursor()
+        cursor.execute("DELETE FROM metrics WHERE substr(source, 1, ?)=(?)", (len(prefix), prefix))
+        metrics_db.connection.commit()
+
+
+def flusher(source: str, interval: Union[int, float] = 15) -> NoReturn:
+    """Flushes the registry for the given source, every interval.
+
+    Args:
+        source: Name of the process that owns the metrics.
+        interval: Seconds to wait between each flush.
+    """
+    while True:
+        time.sleep(interval)
+        try:
+            flush(source=source)
+        except Exception as error:  # Flusher should never stop
+            logger.error(error)
+
+
+def start_flusher(source: str, interval: Union[int, float] = 15) -> threading.Thread:
+    """Starts the flusher in a daemon thread, unless one is running for the source already.
+
+    Args:
+        source: Name of the process that owns the metrics.
+        interval: Seconds to wait between each flush.
+
+    Returns:
+        threading.Thread:
+        Thread running the flusher.
+    """
+    if (thread := _flushers.get(source)) and thread.is_alive():
+        return thread
+    thread = _flushers[source] = threading.Thread(target=flusher, kwargs={"source": source, "interval": interval},
+                                                  daemon=True)
+    thread.start()
+    return thread
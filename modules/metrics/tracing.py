@@ -0,0 +1,247 @@
+# noinspection PyUnresolvedReferences
+"""Span tracing for the voice pipeline, from the wake word to the first audio of the response.
+
+>>> Tracing
+
+See Also:
+    - A trace is created by ``Activator.executor`` and carried through the request context, so any function that
+      runs within it can add a span without passing the trace around.
+    - Spans are not recorded when there is no trace, so the same functions are free to run outside the voice pipeline.
+    - Each trace is written as a single line of JSON to a rolling trace log, when the command completes.
+
+Usage:
+    python -m modules.metrics.tracing [number of recent traces]
+"""
+
+import contextlib
+import glob
+import json
+import logging
+import math
+import os
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Iterator, List, NoReturn, Union
+
+TRACE_LOG = os.path.join('logs', 'voice_traces.log')
+
+# Stages in the order they occur, stages that are not listed here are summarized after these
+STAGES = ("wake", "acknowledgement", "wake_stream_close", "listener_open", "endpointing", "stt", "initiator",
+          "split_phrase", "dispatch", "handler", "tts", "playback")
+
+
+class Trace:
+    """Initiates ``Trace`` object to hold the spans of a single voice command.
+
+    >>> Trace
+
+    """
+
+    def __init__(self, origin: float = None):
+        """Creates a trace ID and stores the time from which the spans are measured.
+
+        Args:
+            origin: Value of ``time.perf_counter`` at which the trace starts, defaults to now.
+        """
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.started = datetime.now()
+        self.origin = origin or time.perf_counter()
+        self.phrase = None
+        self.first_audio = None
+        self.spans: List[Dict[str, Union[str, float]]] = []
+
+    def record(self, stage: str, start: float, end: float) -> NoReturn:
+        """Adds a span that was measured already.
+
+        Args:
+            stage: Name of the stage.
+            start: Value of ``time.perf_counter`` when the stage started.
+            end: Value of ``time.perf_counter`` when the stage ended.
+        """
+        self.spans.append({"stage": stage, "start_ms": round((start - self.origin) * 1_000, 3),
+                           "duration_ms": round((end - start) * 1_000, 3)})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converts the trace into a timeline record.
+
+        Returns:
+            Dict[str, Any]:
+            Dictionary of the trace ID, phrase, total time, time to first audio and the spans.
+        """
+        return {"trace_id": self.trace_id, "started": self.started.isoformat(), "phrase": self.phrase,
+                "total_ms": round((time.perf_counter() - self.origin) * 1_000, 3),
+                "first_audio_ms": round((self.first_audio - self.origin) * 1_000, 3) if self.first_audio else None,
+                "spans": self.spans}
+
+
+_current: ContextVar[Union[Trace, None]] = ContextVar("trace", default=None)
+
+
+def current() -> Union[Trace, None]:
+    """Gets the trace of the voice command in progress.
+
+    Returns:
+        Trace:
+        Trace in the current context, None if there isn't one.
+    """
+    return _current.get()
+
+
+def trace_logger() -> logging.Logger:
+    """Gets the logger that writes to the rolling trace log, creating its handler on first use.
+
+    Returns:
+        logging.Logger:
+        Logger that writes each message as is.
+    """
+    trace_log = logging.getLogger("jarvis.traces")
+    if not trace_log.handlers:
+        os.makedirs(os.path.dirname(TRACE_LOG), exist_ok=True)
+        handler = RotatingFileHandler(filename=TRACE_LOG, maxBytes=1_048_576, backupCount=3)
+        handler.setFormatter(fmt=logging.Formatter(fmt="%(message)s"))
+        trace_log.addHandler(hdlr=handler)
+        trace_log.setLevel(level=logging.INFO)
+        trace_log.propagate = False
+    return trace_log
+
+
+@contextlib.contextmanager
+def trace(origin: float = None) -> Iterator[Trace]:
+    """Creates a trace for a voice command and writes its timeline to the trace log on exit.
+
+    Args:
+        origin: Value of ``time.perf_counter`` at which the trace starts, defaults to now.
+
+    Yields:
+        Trace:
+        Trace of the voice command.
+    """
+    new = Trace(origin=origin)
+    token = _current.set(new)
+    try:
+        yield new
+    finally:
+        _current.reset(token)
+        if new.spans:
+            trace_logger().info(json.dumps(new.to_dict()))
+
+
+@contextlib.contextmanager
+def span(stage: str) -> Iterator[NoReturn]:
+    """Measures the block within as a span of the trace in progress, if there is one.
+
+    Args:
+        stage: Name of the stage.
+    """
+    if not (active := _current.get()):
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        active.record(stage=stage, start=start, end=time.perf_counter())
+
+
+def record(stage: str, start: float, end: float) -> NoReturn:
+    """Adds a span that was measured already, to the trace in progress if there is one.
+
+    Args:
+        stage: Name of the stage.
+        start: Value of ``time.perf_counter`` when the stage started.
+        end: Value of ``time.perf_counter`` when the stage ended.
+    """
+    if active := _current.get():
+        active.record(stage=stage, start=start, end=end)
+
+
+def first_audio() -> NoReturn:
+    """Marks the start of audio playback, only the first one within a trace is kept."""
+    if (active := _current.get()) and not active.first_audio:
+        active.first_audio = time.perf_counter()
+
+
+def load(limit: int = None) -> List[Dict[str, Any]]:
+    """Reads the timeline records from the trace log and its backups.
+
+    Args:
+        limit: Number of the most recent records to return, all of them when not set.
+
+    Returns:
+        List[Dict[str, Any]]:
+        List of timeline records, oldest first.
+    """
+    records = []
+    # Backups have a higher suffix the older they are
+    for filename in sorted(glob.glob(f"{TRACE_LOG}.*"), key=lambda name: -int(name.rsplit('.', 1)[-1])) + [TRACE_LOG]:
+        if not os.path.isfile(filename):
+            continue
+        with open(filename) as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:  # Partial line from a process that was killed mid-write
+                    continue
+    return records[-limit:] if limit else records
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Gets the nearest-rank percentile of values.
+
+    Args:
+        values: Values to get the percentile from.
+        pct: Percentile to get.
+
+    Returns:
+        float:
+        Value at the percentile, 0 if there are no values.
+    """
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[max(math.ceil(pct / 100 * len(values)) - 1, 0)]
+
+
+def summary(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Union[int, float]]]:
+    """Summarizes the time spent in each stage across the timeline records.
+
+    Args:
+        records: Timeline records.
+
+    Returns:
+        Dict[str, Dict[str, Union[int, float]]]:
+        Dictionary of each stage and the number of traces it appeared in, along with its p50 and p95 in milliseconds.
+
+    See Also:
+        - Spans of the same stage within a trace are added up, as a command can listen or speak more than once.
+    """
+    per_stage: Dict[str, List[float]] = {}
+    for each in records:
+        totals: Dict[str, float] = {}
+        for entry in each.get("spans", []):
+            totals[entry["stage"]] = totals.get(entry["stage"], 0) + entry["duration_ms"]
+        if each.get("first_audio_ms") is not None:
+            totals["first_audio"] = each["first_audio_ms"]
+        totals["total"] = each["total_ms"]
+        for stage, value in totals.items():
+            per_stage.setdefault(stage, []).append(value)
+    order = [stage for stage in STAGES if stage in per_stage] + \
+        sorted(stage for stage in per_stage if stage not in STAGES + ("first_audio", "total")) + \
+        [stage for stage in ("first_audio", "total") if stage in per_stage]
+    return {stage: {"count": len(per_stage[stage]), "p50": round(percentile(per_stage[stage], 50), 1),
+                    "p95": round(percentile(per_stage[stage], 95), 1)} for stage in order}
+
+
+if __name__ == '__main__':
+    traces = load(limit=int(sys.argv[1]) if len(sys.argv) > 1 else None)
+    if not traces:
+        print(f"No traces found in {TRACE_LOG!r}")
+        sys.exit(0)
+    print(f"Traces: {len(traces)}\tFrom: {traces[0]['started']}\tTo: {traces[-1]['started']}")
+    print(f"{'stage':<16}{'count':>8}{'p50 (ms)':>12}{'p95 (ms)':>12}")
+    for name, stats in summary(records=traces).items():
+        print(f"{name:<16}{stats['count']:>8}{stats['p50']:>12}{stats['p95']:>12}")
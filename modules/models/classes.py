@@ -13,7 +13,7 @@ import socket
 import sys
 from datetime import datetime
 from enum import Enum
-from typing import List, Union
+from typing import List, Optional, Union
 
 import psutil
 import pyttsx3
@@ -116,6 +116,63 @@ class CustomDict(BaseModel):
         raise ValueError('Bad value')
 
 
+class OverlapPolicy(str, Enum):
+    """Actions allowed when a background task is due while its previous run is still going.
+
+    >>> OverlapPolicy
+
+    """
+
+    skip = 'skip'
+    queue = 'queue'
+    replace = 'replace'
+
+
+class BackgroundTask(BaseModel):
+    """Background task model with its interval, deadline, overlap policy and retry settings.
+
+    >>> BackgroundTask
+
+    """
+
+    seconds: int
+    task: constr(strip_whitespace=True)
+    ignore_hours: Union[List[int], List[str], str, int, List[Union[int, str]], None] = []
+    timeout: Optional[PositiveInt] = None
+    overlap: OverlapPolicy = OverlapPolicy.skip
+    retries: int = Field(default=3, ge=0)
+    backoff: Union[PositiveInt, PositiveFloat] = 5
+
+    @validator('task', allow_reuse=True)
+    def check_empty_string(cls, v, values, **kwargs):  # noqa
+        """Validate task field in tasks."""
+        if v:
+            return v
+        raise ValueError('Bad value')
+
+    @validator('ignore_hours', allow_reuse=True)
+    def check_hours_format(cls, v, values, **kwargs):  # noqa
+        """Validate each entry in ignore hours list."""
+        if not v:
+            return []
+        if isinstance(v, int):
+            v = [v]
+        elif isinstance(v, str):
+            form_list = v.split('-')
+            if len(form_list) == 1:
+                v = [form_list[0]]
+            else:
+                start_hour, end_hour = int(form_list[0]), int(form_list[1])
+                if start_hour <= end_hour:
+                    v = list(range(start_hour, end_hour + 1))
+                else:
+                    v = list(range(start_hour, 24)) + list(range(0, end_hour + 1))
+        hours = [int(hour) for hour in v]
+        if all(0 <= hour <= 23 for hour in hours):
+            return hours
+        raise ValueError('Bad value')
+
+
 class EnvConfig(BaseSettings):
     """Configure all env vars and validate using ``pydantic`` to share across modules.
 
@@ -136,6 +193,9 @@ class EnvConfig(BaseSettings):
 
     # Log config
     debug: bool = Field(default=False, env='DEBUG')
+    log_queue: bool = Field(default=False, env='LOG_QUEUE')
+    log_max_bytes: PositiveInt = Field(default=10_485_760, env='LOG_MAX_BYTES')
+    log_port: PositiveInt = Field(default=9020, env='LOG_PORT')
 
     # User add-ons
     birthday: str = Field(default=None, env='BIRTHDAY')
@@ -162,6 +222,9 @@ class EnvConfig(BaseSettings):
     offline_port: PositiveInt = Field(default=4483, env='OFFLINE_PORT')
     offline_pass: str = Field(default='OfflineComm', env='OFFLINE_PASS')
     workers: PositiveInt = Field(default=1, env='WORKERS')
+    api_production: bool = Field(default=False, env='API_PRODUCTION')
+    clause_timeout: Union[PositiveInt, PositiveFloat] = Field(default=30, env='CLAUSE_TIMEOUT')
+    planner_workers: PositiveInt = Field(default=8, env='PLANNER_WORKERS')
 
     # Calendar events and meetings config
     event_app: EventApp = Field(default=EventApp.CALENDAR, env='EVENT_APP')
@@ -185,8 +248,10 @@ class EnvConfig(BaseSettings):
     robinhood_qr: str = Field(default=None, env='ROBINHOOD_QR')
     robinhood_endpoint_auth: str = Field(default=None, env='ROBINHOOD_ENDPOINT_AUTH')
 
-    # StockMonitor endpoint auth
+    # StockMonitor config
     stock_monitor_endpoint_auth: str = Field(default=None, env='STOCK_MONITOR_ENDPOINT_AUTH')
+    stock_monitor_interval: PositiveInt = Field(default=900, env='STOCK_MONITOR_INTERVAL')
+    stock_monitor_market_interval: PositiveInt = Field(default=300, env='STOCK_MONITOR_MARKET_INTERVAL')
 
     # GitHub config
     git_user: str = Field(default=None, env='GIT_USER')
@@ -221,6 +286,10 @@ class EnvConfig(BaseSettings):
     bot_token: str = Field(default=None, env='BOT_TOKEN')
     bot_chat_ids: List[int] = Field(default=[], env='BOT_CHAT_IDS')
     bot_users: List[str] = Field(default=[], env='BOT_USERS')
+    bot_workers: PositiveInt = Field(default=4, env='BOT_WORKERS')
+    bot_backlog: PositiveInt = Field(default=100, env='BOT_BACKLOG')
+    bot_webhook: HttpUrl = Field(default=None, env='BOT_WEBHOOK')
+    bot_secret: str = Field(default=None, regex="^[A-Za-z0-9_-]{1,256}$", env='BOT_SECRET')
 
     # Speech synthesis config
     speech_synthesis_timeout: int = Field(default=3, env='SPEECH_SYNTHESIS_TIMEOUT')
@@ -229,7 +298,10 @@ class EnvConfig(BaseSettings):
 
     # Background tasks
     tasks: List[CustomDict] = Field(default=[], env='TASKS')
+    background_workers: PositiveInt = Field(default=3, env='BACKGROUND_WORKERS')
     crontab: List[str] = Field(default=[], env='CRONTAB')
+    cron_workers: PositiveInt = Field(default=5, env='CRON_WORKERS')
+    cron_timeout: Union[PositiveInt, PositiveFloat] = Field(default=3_600, env='CRON_TIMEOUT')
 
     # WiFi config
     wifi_ssid: str = Field(default=None, env='WIFI_SSID')
@@ -285,9 +357,14 @@ class FileIO(BaseModel):
     base_db: FilePath = os.path.join('fileio', 'database.db')
     task_db: FilePath = os.path.join('fileio', 'tasks.db')
     stock_db: FilePath = os.path.join('fileio', 'stock.db')
+    metrics_db: FilePath = os.path.join('fileio', 'metrics.db')
+    cron_db: FilePath = os.path.join('fileio', 'cron.db')
+    cache_db: FilePath = os.path.join('fileio', 'cache.db')
+    session_db: FilePath = os.path.join('fileio', 'session.db')
+    bars_db: FilePath = os.path.join('fileio', 'bars.db')
 
     # API used
-    stock_list_backup: FilePath = os.path.join('fileio', 'stock_list_backup.yaml')
+    stock_list_backup: FilePath = os.path.join('fileio', 'stock_list_backup.npy')
     robinhood: FilePath = os.path.join('fileio', 'robinhood.html')
 
     # Future useful
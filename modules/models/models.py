@@ -5,6 +5,7 @@
 
 """
 
+import hashlib
 import os
 import platform
 from multiprocessing import current_process
@@ -14,7 +15,7 @@ import cv2
 import pvporcupine
 from pydantic import PositiveInt
 
-from api.scheduler import rh_cron_schedule, sm_cron_schedule
+from api.scheduler import rh_cron_schedule
 from modules.camera.camera import Camera
 from modules.crontab.expression import CronExpression
 from modules.database import database
@@ -79,6 +80,10 @@ if env.ics_url and not env.ics_url.endswith('.ics'):
 if env.tv_mac and isinstance(env.tv_mac, str):
     env.tv_mac = [env.tv_mac]
 
+# Secret has to be the same in every process, so the default is derived from the bot token
+if env.bot_webhook and not env.bot_secret:
+    env.bot_secret = hashlib.sha256(str(env.bot_token).encode()).hexdigest()
+
 if env.speech_synthesis_port == env.offline_port:
     raise InvalidEnvVars(
         "Speech synthesizer and offline communicator cannot run simultaneously on the same port number."
@@ -86,7 +91,6 @@ if env.speech_synthesis_port == env.offline_port:
 
 if all([env.robinhood_user, env.robinhood_pass, env.robinhood_pass]):
     env.crontab.append(rh_cron_schedule(extended=True))
-env.crontab.append(sm_cron_schedule())
 
 # Forces limited version if env var is set, otherwise it is enforced based on the number of physical cores
 if env.limited:
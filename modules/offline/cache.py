@@ -0,0 +1,142 @@
+# noinspection PyUnresolvedReferences
+"""TTL cache for responses of read-mostly intents, shared across processes through SQLite.
+
+>>> Cache
+
+See Also:
+    - Responses are keyed by the intent and the normalized words of the command, so re-phrasing doesn't miss.
+    - Commands that match any actuating keyword are never served from, or stored in the cache.
+"""
+
+import string
+import time
+from typing import Iterable, NoReturn, Tuple, Union
+
+from executors.word_match import word_match
+from modules.conditions import keywords as keywords_mod
+from modules.database import database
+from modules.logger.custom_logger import logger
+from modules.metrics.registry import registry
+from modules.models import models
+
+keywords = keywords_mod.keywords
+
+# Time to live (in seconds) for the response of each intent that can be cached
+TTL = {
+    "weather": 900,
+    "news": 1_800,
+    "meetings": 300,
+    "events": 300,
+    "system_info": 3_600,
+    "ip_info": 600,
+    "location": 600,
+    "github": 3_600,
+}
+
+# Intents that change the state of something, and keywords of otherwise cacheable intents that do the same
+ACTUATING = (keywords.lights + keywords.car + keywords.garage + keywords.television + keywords.volume +
+             keywords.brightness + keywords.google_home + keywords.guard_enable + keywords.guard_disable +
+             keywords.sleep_control + keywords.restart_control + keywords.shutdown + keywords.kill +
+             keywords.set_alarm + keywords.reminder + keywords.send_notification + keywords.automation +
+             keywords.vpn_server + keywords.apps + keywords.add_todo + keywords.delete_todo +
+             ["clone", "update yourself", "update your self"])
+
+# Words that don't change the meaning of a command
+FILLERS = {"what", "whats", "is", "the", "a", "an", "me", "my", "please", "tell", "can", "you", "could", "would",
+           "jarvis", "hey", "get", "show", "give", "current", "currently", "for", "of", "in", "are", "there", "any"}
+
+COLUMNS = ("key", "intent", "response", "expiry")
+
+CACHE = registry.counter(name="offline_cache_requests_total",
+                         documentation="Lookups made to the response cache for read-mostly intents.",
+                         labels=("intent", "result"))
+
+cache_db = database.Database(database=models.fileio.cache_db)
+cache_db.create_table(table_name="responses", columns=COLUMNS)
+
+
+def intent(phrase: str, intents: Iterable[str] = TTL) -> Union[str, None]:
+    """Gets the read-only intent of a command.
+
+    Args:
+        phrase: Command received.
+        intents: Names of the keywords to look for, defaults to the intents that can be cached.
+
+    Returns:
+        str:
+        Name of the intent, None if the command is actuating or doesn't match any of the intents.
+    """
+    if word_match(phrase=phrase, match_list=ACTUATING):
+        return
+    for name in intents:
+        if word_match(phrase=phrase, match_list=getattr(keywords, name)):
+            return name
+
+
+def normalize(phrase: str) -> str:
+    """Normalizes a command to the sorted set of words that aren't fillers.
+
+    Args:
+        phrase: Command received.
+
+    Returns:
+        str:
+        Normalized command.
+    """
+    words = phrase.lower().translate(str.maketrans('', '', string.punctuation)).split()
+    return ' '.join(sorted(set(words) - FILLERS))
+
+
+def cache_key(phrase: str) -> Union[Tuple[str, str], None]:
+    """Creates a cache key from the intent and the normalized words of a command.
+
+    Args:
+        phrase: Command received.
+
+    Returns:
+        Tuple[str, str]:
+        Tuple of the intent and the key, None if the command is not cacheable.
+    """
+    if not (name := intent(phrase=phrase)):
+        return
+    return name, f"{name}|{normalize(phrase=phrase)}"
+
+
+def get(phrase: str) -> Union[str, None]:
+    """Gets the cached response for a command, if it hasn't expired.
+
+    Args:
+        phrase: Command received.
+
+    Returns:
+        str:
+        Cached response, None if there isn't one or the command is not cacheable.
+    """
+    if not (key := cache_key(phrase=phrase)):
+        return
+    with cache_db.connection:
+        cursor = cache_db.connection.cursor()
+        row = cursor.execute("SELECT response FROM responses WHERE key=(?) AND expiry>(?)",
+                             (key[1], time.time())).fetchone()
+    CACHE.inc(intent=key[0], result="hit" if row else "miss")
+    if row:
+        logger.info(f"Serving {phrase!r} from cache")
+        return row[0]
+
+
+def put(phrase: str, response: str) -> NoReturn:
+    """Stores the response for a command with the TTL of its intent, and removes the expired responses.
+
+    Args:
+        phrase: Command received.
+        response: Response for the command.
+    """
+    if not (key := cache_key(phrase=phrase)):
+        return
+    now = time.time()
+    with cache_db.connection:
+        cursor = cache_db.connection.cursor()
+        cursor.execute("DELETE FROM responses WHERE key=(?) OR expiry<=(?)", (key[1], now))
+        cursor.execute(f"INSERT INTO responses {COLUMNS} VALUES (?,?,?,?);",
+                       (key[1], key[0], response, now + TTL[key[0]]))
+        cache_db.connection.commit()
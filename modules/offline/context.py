@@ -0,0 +1,77 @@
+# noinspection PyUnresolvedReferences
+"""Request scoped context for offline executions, to keep concurrent requests from reading each other's responses.
+
+>>> Context
+
+See Also:
+    - Each offline execution gets its own ``OfflineRequest`` through a context variable, instead of module globals.
+    - Threads and tasks started with a copy of the current context write into the same request.
+    - Handlers mark a request as failed with ``fail``, so a response that reports an error isn't cached.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, NoReturn, Union
+
+
+class OfflineRequest:
+    """Initiates ``OfflineRequest`` object to collect the response of a single offline execution.
+
+    >>> OfflineRequest
+
+    """
+
+    def __init__(self, parent: "OfflineRequest" = None):
+        """Instantiates an empty response.
+
+        Args:
+            parent: Request that was active when this one was created, if any.
+        """
+        self.parent = parent
+        self.text_spoken = None
+        self.caller = None
+        self.failed = False
+
+
+_current: ContextVar[Union[OfflineRequest, None]] = ContextVar("offline_request", default=None)
+
+
+def current() -> Union[OfflineRequest, None]:
+    """Gets the offline request that is active in the current context.
+
+    Returns:
+        OfflineRequest:
+        Offline request object or None if the current context is not an offline execution.
+    """
+    return _current.get()
+
+
+def fail() -> NoReturn:
+    """Marks the offline request that is active in the current context as failed, outside of which it does nothing."""
+    if request := _current.get():
+        request.failed = True
+
+
+@contextmanager
+def offline_request() -> Iterator[OfflineRequest]:
+    """Activates a new offline request for the duration of the block.
+
+    Yields:
+        OfflineRequest:
+        Offline request object that the speaker writes the response into.
+
+    See Also:
+        - The caller of a nested request is handed to the parent, so an API or Telegram handler can name the audio
+          file after the function that responded.
+        - A nested request that failed marks its parent as failed as well.
+    """
+    request = OfflineRequest(parent=_current.get())
+    token = _current.set(request)
+    try:
+        yield request
+    finally:
+        _current.reset(token)
+        if request.parent and request.caller:
+            request.parent.caller = request.caller
+        if request.parent and request.failed:
+            request.parent.failed = True
@@ -0,0 +1,228 @@
+# noinspection PyUnresolvedReferences
+"""Planner for compound commands, shared by the voice, API and Telegram front-ends.
+
+>>> Planner
+
+See Also:
+    - A compound command is split at ``' and '`` into clauses, unless it carries keywords that use ``and`` themselves.
+    - Clauses that touch the same resource (camera, a device group etc.) run one after the other in a single lane.
+    - Lanes run concurrently on a shared executor, so a compound command takes as long as its slowest lane.
+    - Results are handed back in the original order of the clauses, regardless of the order they finish in.
+    - A lane that exceeds the deadline keeps its worker until it finishes, as a running clause cannot be cancelled.
+      The executor is bounded by ``PLANNER_WORKERS``, so hung clauses queue the lanes after them instead of piling up
+      threads.
+"""
+
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextvars import copy_context
+from typing import Any, Callable, Dict, FrozenSet, List, NoReturn, Union
+
+from executors.word_match import word_match
+from modules.conditions import keywords as keywords_mod
+from modules.logger.custom_logger import logger
+from modules.models import models
+from modules.offline import compatibles
+
+EXECUTOR = ThreadPoolExecutor(max_workers=models.env.planner_workers, thread_name_prefix="planner")
+
+keywords = keywords_mod.keywords
+
+# Clauses matching keywords of the same resource are never executed at the same time
+RESOURCES = {
+    "camera": keywords.photo + keywords.faces + keywords.guard_enable + keywords.guard_disable,
+    "lights": keywords.lights,
+    "television": keywords.television,
+    "car": keywords.car,
+    "garage": keywords.garage,
+    "audio": keywords.volume + keywords.google_home,
+    "system": (keywords.sleep_control + keywords.brightness + keywords.restart_control + keywords.shutdown +
+               keywords.kill),
+}
+
+
+class Clause:
+    """Initiates ``Clause`` object to hold a single clause of a compound command.
+
+    >>> Clause
+
+    """
+
+    def __init__(self, index: int, text: str):
+        """Stores the text along with the resources it touches and whether it can be executed without interaction.
+
+        Args:
+            index: Position of the clause in the compound command.
+            text: Text of the clause.
+        """
+        self.index = index
+        self.text = text.strip()
+        self.resources: FrozenSet[str] = frozenset(resource for resource, words in RESOURCES.items()
+                                                   if word_match(phrase=self.text, match_list=words))
+        self.compatible = bool(word_match(phrase=self.text, match_list=compatibles.offline_compatible()))
+
+
+class Result:
+    """Initiates ``Result`` object to hold the outcome of a clause.
+
+    >>> Result
+
+    """
+
+    def __init__(self, clause: Clause, status: str, response: Any = None, elapsed: float = 0):
+        """Stores the outcome of a clause.
+
+        Args:
+            clause: Clause that was executed.
+            status: One of ``success``, ``error``, ``timeout`` or ``incompatible``
+            response: Response from the runner, or the error message.
+            elapsed: Seconds taken to execute the clause.
+        """
+        self.clause = clause
+        self.status = status
+        self.response = response
+        self.elapsed = round(elapsed, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converts the result into a dictionary that can be serialized.
+
+        Returns:
+            Dict[str, Any]:
+            Dictionary of the clause's index, text, status, response and the time it took.
+        """
+        return {"index": self.clause.index, "clause": self.clause.text, "status": self.status,
+                "response": self.response, "elapsed": self.elapsed}
+
+
+def split(phrase: str) -> List[str]:
+    """Splits a compound command into clauses.
+
+    Args:
+        phrase: Command received.
+
+    Returns:
+        List[str]:
+        List of clauses, which is the phrase itself when it shouldn't be split.
+    """
+    # Keywords for which the ' and ' split should not happen.
+    multiexec = keywords.send_notification + keywords.reminder + keywords.distance
+    if ' and ' in phrase and not word_match(phrase=phrase, match_list=keywords.avoid) and \
+            not word_match(phrase=phrase, match_list=multiexec):
+        return [each.strip() for each in phrase.split(' and ') if each.strip()]
+    return [phrase]
+
+
+def plan(phrase: str) -> List[Clause]:
+    """Splits a compound command into clauses along with the resources each of them touches.
+
+    Args:
+        phrase: Command received.
+
+    Returns:
+        List[Clause]:
+        List of clauses in the order they were received.
+    """
+    return [Clause(index=index, text=text) for index, text in enumerate(split(phrase=phrase))]
+
+
+def lanes(clauses: List[Clause]) -> List[List[Clause]]:
+    """Groups clauses that share a resource (directly or through another clause) into lanes.
+
+    Args:
+        clauses: Clauses to be grouped.
+
+    Returns:
+        List[List[Clause]]:
+        List of lanes, each holding clauses in their original order.
+    """
+    grouped: List[List[Clause]] = []
+    for clause in clauses:
+        overlapping = [lane for lane in grouped
+                       if any(clause.resources & other.resources for other in lane)]
+        merged = [each for lane in overlapping for each in lane] + [clause]
+        grouped = [lane for lane in grouped if lane not in overlapping] + [sorted(merged, key=lambda c: c.index)]
+    return sorted(grouped, key=lambda lane: lane[0].index)
+
+
+def _run(clause: Clause, runner: Callable[[str], Any]) -> Result:
+    """Runs a clause and converts the outcome into a ``Result`` object."""
+    start = time.time()
+    try:
+        return Result(clause=clause, status="success", response=runner(clause.text), elapsed=time.time() - start)
+    except Exception as error:
+        logger.error(error)
+        logger.error(traceback.format_exc())
+        return Result(clause=clause, status="error", response=error.__str__(), elapsed=time.time() - start)
+
+
+def _run_lane(lane: List[Clause], runner: Callable[[str], Any], futures: Dict[int, Future]) -> NoReturn:
+    """Runs the clauses of a lane one after the other, resolving the future of each clause as it finishes."""
+    for clause in lane:
+        result = _run(clause=clause, runner=runner)
+        if not futures[clause.index].done():  # Caller may have given up on the clause already
+            futures[clause.index].set_result(result)
+
+
+def submit(clauses: List[Clause], runner: Callable[[str], Any]) -> Dict[int, Future]:
+    """Dispatches the lanes of the given clauses to the shared executor.
+
+    Args:
+        clauses: Clauses to be executed.
+        runner: Function that executes the text of a clause and returns the response.
+
+    Returns:
+        Dict[int, Future]:
+        Dictionary of the clause's index and a future that resolves to its ``Result``
+    """
+    futures = {clause.index: Future() for clause in clauses}
+    for lane in lanes(clauses=clauses):
+        # Each lane runs in a copy of the caller's context, so the trace of a voice command carries over
+        EXECUTOR.submit(copy_context().run, _run_lane, lane, runner, futures)
+    return futures
+
+
+def execute(clauses: List[Clause],
+            runner: Callable[[str], Any],
+            on_result: Callable[[Result], Any] = None,
+            inline: Callable[[str], Any] = None,
+            timeout: Union[int, float] = None) -> List[Result]:
+    """Executes the clauses concurrently and hands over the results in the original order.
+
+    Args:
+        clauses: Clauses to be executed.
+        runner: Function that executes a clause that is offline compatible, on the shared executor.
+        on_result: Function called with each result in the original order, as soon as it and the ones before it are
+            available.
+        inline: Function that executes a clause that is not offline compatible, in the calling thread and in order.
+            Such clauses are marked as ``incompatible`` when this is not set.
+        timeout: Seconds to wait for each clause, counted from when the clauses were dispatched. A clause that times
+            out is reported as such, but its lane keeps running on the executor until it finishes.
+
+    Returns:
+        List[Result]:
+        List of results in the order of the clauses.
+    """
+    futures = submit(clauses=[clause for clause in clauses if clause.compatible], runner=runner)
+    dispatched = time.time()
+    results = []
+    for clause in clauses:
+        if clause.index not in futures:
+            if inline:
+                result = _run(clause=clause, runner=inline)
+            else:
+                logger.warning(f"{clause.text!r} is not a part of offline communicator compatible request.")
+                result = Result(clause=clause, status="incompatible",
+                                response=f"{clause.text!r} is not a part of offline communicator compatible request.")
+        else:
+            try:
+                remaining = max(timeout - (time.time() - dispatched), 0) if timeout else None
+                result = futures[clause.index].result(timeout=remaining)
+            except FutureTimeout:
+                logger.error(f"{clause.text!r} exceeded the deadline of {timeout}s")
+                result = Result(clause=clause, status="timeout", elapsed=time.time() - dispatched,
+                                response=f"{clause.text!r} did not finish within {timeout} seconds.")
+        results.append(result)
+        on_result(result) if on_result else None
+    return results
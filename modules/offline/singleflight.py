@@ -0,0 +1,110 @@
+# noinspection PyUnresolvedReferences
+"""Coalesces identical read-only offline commands that arrive while one of them is already being executed.
+
+>>> SingleFlight
+
+See Also:
+    - The first request for a normalized command executes it, the ones arriving meanwhile wait for its result.
+    - Only applies to read-only intents, so an actuating command is always executed as many times as it is sent.
+    - Waiting is bound by ``CLAUSE_TIMEOUT``, after which the command is executed without the one in flight.
+    - Followers take over the failure and the caller of the leader's request context, along with its result.
+    - Coalescing ratio is ``offline_singleflight_requests_total{result="follower"}`` over all the requests.
+"""
+
+import functools
+import threading
+from concurrent.futures import Future, TimeoutError
+from typing import Any, Callable, Dict, Union
+
+from modules.logger.custom_logger import logger
+from modules.metrics.registry import registry
+from modules.models import models
+from modules.offline import cache, context
+
+# Intents that only read information, in addition to the ones that can be cached
+READ_ONLY = tuple(cache.TTL) + ("robinhood", "system_vitals", "speed_test", "current_time", "current_date",
+                                "distance", "locate_places", "read_gmail", "meaning", "version")
+
+REQUESTS = registry.counter(name="offline_singleflight_requests_total",
+                            documentation="Read-only offline commands that led an execution or waited on one.",
+                            labels=("intent", "result"))
+
+_lock = threading.Lock()
+_in_flight: Dict[str, Future] = {}
+
+
+def flight_key(phrase: str) -> Union[str, None]:
+    """Creates a key from the intent and the normalized words of a command.
+
+    Args:
+        phrase: Command received.
+
+    Returns:
+        str:
+        Key for the command, None if the command is not read-only.
+    """
+    if name := cache.intent(phrase=phrase, intents=READ_ONLY):
+        return f"{name}|{cache.normalize(phrase=phrase)}"
+
+
+def coalesce(func: Callable) -> Callable:
+    """Wrapper for a function that executes a command, to share the result of identical commands in flight.
+
+    Args:
+        func: Takes the function as an argument. Implemented as a decorator.
+
+    Returns:
+        Callable:
+        Calls the wrapper function.
+    """
+
+    @functools.wraps(func)
+    def wrapper(command: str) -> Any:
+        """Executes the command or waits for the execution of an identical command that is already running.
+
+        Args:
+            command: Command to be executed.
+
+        Returns:
+            Any:
+            Return value of the function implemented, or the one shared by the execution in flight.
+        """
+        if not (key := flight_key(phrase=command)):
+            return func(command)
+        intent = key.split('|')[0]
+        with _lock:
+            if future := _in_flight.get(key):
+                leader = False
+            else:
+                future = _in_flight[key] = Future()
+                leader = True
+        if not leader:
+            REQUESTS.inc(intent=intent, result="follower")
+            logger.info(f"Waiting on the execution in flight for {command!r}")
+            try:
+                result, failed, caller = future.result(timeout=models.env.clause_timeout)
+            except TimeoutError:
+                # A leader that hangs shouldn't hold up every identical command, so the follower runs on its own
+                logger.warning(f"Execution in flight for {command!r} exceeded {models.env.clause_timeout}s, "
+                               "executing it directly")
+                REQUESTS.inc(intent=intent, result="timeout")
+                return func(command)
+            if request := context.current():
+                request.failed = request.failed or failed
+                request.caller = caller or request.caller
+            return result
+        REQUESTS.inc(intent=intent, result="leader")
+        try:
+            # Failure and caller are handed to the enclosing request on exit, and shared with the followers
+            with context.offline_request() as request:
+                result = func(command)
+            future.set_result((result, request.failed, request.caller))
+            return result
+        except Exception as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with _lock:
+                del _in_flight[key]
+
+    return wrapper
@@ -0,0 +1,196 @@
+# noinspection PyUnresolvedReferences
+"""Bounded process pool to run background tasks with deadlines, overlap policies and retries.
+
+>>> Pool
+
+See Also:
+    - Each run is a dedicated process, so a run that exceeds its deadline can be terminated instead of being abandoned.
+    - The pool never blocks, ``poll`` is called from the background tasks' loop to reap, retry and dispatch runs.
+"""
+
+import time
+from multiprocessing import Process
+from typing import Callable, Dict, NoReturn, Tuple
+
+from modules.logger import config
+from modules.logger.custom_logger import logger
+from modules.metrics.registry import registry
+from modules.models.classes import BackgroundTask, OverlapPolicy
+
+RUNTIME = registry.histogram(name="background_task_runtime_seconds",
+                             documentation="Time taken by each run of a background task.",
+                             labels=("task", "outcome"))
+OUTCOMES = registry.histogram(name="background_task_attempts",
+                              documentation="Number of attempts it took for a background task to reach an outcome.",
+                              labels=("task", "outcome"), buckets=(1, 2, 3, 4, 5, 10))
+DISPATCH = registry.counter(name="background_task_dispatch_total",
+                            documentation="Dispatch decisions made for background tasks that are due.",
+                            labels=("task", "decision"))
+
+
+def _execute(target: Callable, command: str, log_file: str) -> NoReturn:
+    """Runs the target within the child process after attaching the log handler.
+
+    Args:
+        target: Function to be called with the command.
+        command: Background task to be executed.
+        log_file: Log file for the child process.
+    """
+    config.multiprocessing_logger(filename=log_file)
+    target(command)
+
+
+class Run:
+    """Initiates ``Run`` object to hold the process and the state of a single attempt.
+
+    >>> Run
+
+    """
+
+    def __init__(self, task: BackgroundTask, process: Process, attempt: int):
+        """Stores the task, process and attempt along with the start time.
+
+        Args:
+            task: Background task that is being executed.
+            process: Process executing the task.
+            attempt: Attempt number starting from 1.
+        """
+        self.task = task
+        self.process = process
+        self.attempt = attempt
+        self.start = time.time()
+
+    @property
+    def expired(self) -> bool:
+        """Checks whether the run has exceeded the deadline set for the task.
+
+        Returns:
+            bool:
+            True if the task has a timeout and the run has been going on longer than that.
+        """
+        return bool(self.task.timeout) and time.time() - self.start > self.task.timeout
+
+
+class TaskPool:
+    """Initiates ``TaskPool`` to dispatch background tasks to a bounded number of processes.
+
+    >>> TaskPool
+
+    """
+
+    def __init__(self, target: Callable, workers: int, log_file: str):
+        """Instantiates the pool with empty run, queue and retry stores, keyed by the task statement.
+
+        Args:
+            target: Function that executes a background task statement.
+            workers: Maximum number of runs allowed at any given time.
+            log_file: Log file for the child processes.
+        """
+        self.target = target
+        self.workers = workers
+        self.log_file = log_file
+        self.running: Dict[str, Run] = {}
+        self.queued: Dict[str, Tuple[BackgroundTask, int]] = {}
+        self.retries: Dict[str, Tuple[float, BackgroundTask, int]] = {}
+
+    def _start(self, task: BackgroundTask, attempt: int = 1) -> NoReturn:
+        """Starts a process for the given task."""
+        process = Process(target=_execute, args=(self.target, task.task, self.log_file))
+        process.start()
+        logger.info(f"Executing {task.task!r} [attempt: {attempt}] with PID: {process.pid}")
+        self.running[task.task] = Run(task=task, process=process, attempt=attempt)
+
+    def _stop(self, run: Run) -> NoReturn:
+        """Terminates the process running a task."""
+        logger.warning(f"Terminating {run.task.task!r} with PID: {run.process.pid}")
+        run.process.terminate()
+        run.process.join(timeout=1)
+        if run.process.is_alive():
+            run.process.kill()
+
+    def _record(self, run: Run, outcome: str) -> NoReturn:
+        """Records the runtime and the outcome of a run, and schedules a retry if required."""
+        elapsed = time.time() - run.start
+        RUNTIME.observe(elapsed, task=run.task.task, outcome=outcome)
+        logger.info(f"{run.task.task!r} finished with {outcome!r} in {round(elapsed, 2)}s")
+        if outcome in ("failure", "timeout") and run.attempt <= run.task.retries:
+            delay = run.task.backoff * 2 ** (run.attempt - 1)
+            logger.warning(f"Retrying {run.task.task!r} in {delay}s [attempt: {run.attempt + 1}]")
+            self.retries[run.task.task] = (time.time() + delay, run.task, run.attempt + 1)
+            return
+        if outcome in ("failure", "timeout"):
+            logger.error(f"{run.task.task!r} exceeded retry count::{run.task.retries}")
+        OUTCOMES.observe(run.attempt, task=run.task.task, outcome=outcome)
+
+    @property
+    def available(self) -> bool:
+        """Checks whether a run can be started without exceeding the number of workers."""
+        return len(self.running) < self.workers
+
+    def submit(self, task: BackgroundTask) -> NoReturn:
+        """Submits a task that is due, honoring the overlap policy if its previous run is still going.
+
+        Args:
+            task: Background task that is due.
+        """
+        if task.task in self.retries:
+            logger.info(f"{task.task!r} is awaiting a retry, skipping schedule.")
+            DISPATCH.inc(task=task.task, decision="retry_pending")
+            return
+        if run := self.running.get(task.task):
+            if task.overlap == OverlapPolicy.skip:
+                logger.info(f"Previous run of {task.task!r} is still going, skipping schedule.")
+                DISPATCH.inc(task=task.task, decision="skipped")
+                return
+            if task.overlap == OverlapPolicy.queue:
+                logger.info(f"Previous run of {task.task!r} is still going, queueing schedule.")
+                DISPATCH.inc(task=task.task, decision="queued")
+                self.queued[task.task] = (task, 1)
+                return
+            self._stop(run=self.running.pop(task.task))
+            self._record(run=run, outcome="replaced")
+            self.retries.pop(task.task, None)
+        if not self.available:
+            logger.info(f"All {self.workers} workers are busy, queueing {task.task!r}")
+            DISPATCH.inc(task=task.task, decision="queued")
+            self.queued[task.task] = (task, 1)
+            return
+        DISPATCH.inc(task=task.task, decision="started")
+        self._start(task=task)
+
+    def poll(self) -> NoReturn:
+        """Reaps finished runs, enforces deadlines and starts due retries and queued tasks when workers free up."""
+        for statement, run in list(self.running.items()):
+            if run.process.is_alive():
+                if not run.expired:
+                    continue
+                logger.error(f"{statement!r} exceeded the deadline of {run.task.timeout}s")
+                self._stop(run=run)
+                outcome = "timeout"
+            else:
+                run.process.join()
+                outcome = "success" if run.process.exitcode == 0 else "failure"
+            del self.running[statement]
+            self._record(run=run, outcome=outcome)
+
+        now = time.time()
+        for statement, (due, task, attempt) in list(self.retries.items()):
+            if due <= now and statement not in self.running and self.available:
+                del self.retries[statement]
+                self._start(task=task, attempt=attempt)
+        for statement, (task, attempt) in list(self.queued.items()):
+            if statement not in self.running and self.available:
+                del self.queued[statement]
+                self._start(task=task, attempt=attempt)
+
+    def prune(self, statements: list) -> NoReturn:
+        """Drops queued tasks and pending retries that are no longer a part of the background tasks.
+
+        Args:
+            statements: Task statements that are currently valid.
+        """
+        for store in (self.queued, self.retries):
+            for statement in list(store.keys()):
+                if statement not in statements:
+                    logger.info(f"Dropping {statement!r} as it was removed from background tasks.")
+                    del store[statement]
@@ -6,10 +6,11 @@ import random
 import string
 import time
 import traceback
-from typing import NoReturn, Union
+from typing import Dict, List, NoReturn, Union
 
 import requests
 from pydantic import FilePath
+from requests.adapters import HTTPAdapter
 
 from _preexec import keywords_handler
 from executors.commander import timed_delay
@@ -21,8 +22,10 @@ from modules.database import database
 from modules.exceptions import BotInUse
 from modules.logger.custom_logger import logger
 from modules.models import models
-from modules.offline import compatibles
+from modules.offline import compatibles, context, planner
 from modules.telegram import audio_handler
+from modules.telegram.dispatcher import Dispatcher
+from modules.telegram.sender import SEND_WORKERS, Sender, split_message
 from modules.utils import support
 
 importlib.reload(module=logging)
@@ -111,9 +114,13 @@ class TelegramBot:
     FILE_CONTENT_URL = f'https://api.telegram.org/file/bot{models.env.bot_token}/' + '{file_path}'
 
     def __init__(self):
-        """Initiates a session."""
+        """Initiates a session, a dispatcher to handle the updates received and a sender for the responses."""
         self.session = requests.Session()
         self.session.verify = True
+        # Pool is sized for the threads of the dispatcher and the sender, so that every thread reuses a connection
+        self.session.mount(prefix='https://', adapter=HTTPAdapter(pool_maxsize=models.env.bot_workers + SEND_WORKERS))
+        self.dispatcher = Dispatcher(handler=self.handle_update)
+        self.sender = Sender(session=self.session)
 
     def _get_file(self, payload: dict) -> Union[bytes, None]:
         """Makes a request to get the file and file path.
@@ -158,6 +165,28 @@ class TelegramBot:
             logger.error(response.json())
         return response
 
+    def _send(self, chat_id: int, method: str, payloads: List[dict], files: dict = None) -> requests.Response:
+        """Queues the requests in the sender, and waits for them to be sent in order.
+
+        Args:
+            chat_id: Chat ID.
+            method: Bot API method to call.
+            payloads: Payload of each request.
+            files: Take filename as an optional argument.
+
+        Returns:
+            Response:
+            Response class of the last request.
+        """
+        url = self.BASE_URL + models.env.bot_token + '/' + method
+        futures = [self.sender.send(chat_id=chat_id, url=url, payload=payload, files=files) for payload in payloads]
+        response = None
+        for future in futures:
+            response = future.result()
+            if not response.ok:
+                logger.error(response.json())
+        return response
+
     def send_audio(self, chat_id: int, filename: Union[str, FilePath], parse_mode: str = 'HTML') -> requests.Response:
         """Sends an audio file to the user.
 
@@ -172,8 +201,8 @@ class TelegramBot:
         """
         with open(filename, 'rb') as audio:
             files = {'audio': audio.read()}
-        return self._make_request(url=self.BASE_URL + models.env.bot_token + '/sendAudio', files=files,
-                                  payload={'chat_id': chat_id, 'title': filename, 'parse_mode': parse_mode})
+        return self._send(chat_id=chat_id, method='sendAudio', files=files,
+                          payloads=[{'chat_id': chat_id, 'title': filename, 'parse_mode': parse_mode}])
 
     def send_photo(self, chat_id: int, filename: Union[str, FilePath]) -> requests.Response:
         """Sends an image file to the user.
@@ -188,8 +217,8 @@ class TelegramBot:
         """
         with open(filename, 'rb') as image:
             files = {'photo': image.read()}
-        return self._make_request(url=self.BASE_URL + models.env.bot_token + '/sendPhoto', files=files,
-                                  payload={'chat_id': chat_id, 'title': os.path.split(filename)[-1]})
+        return self._send(chat_id=chat_id, method='sendPhoto', files=files,
+                          payloads=[{'chat_id': chat_id, 'title': os.path.split(filename)[-1]}])
 
     def reply_to(self, payload: dict, response: str, parse_mode: str = 'markdown') -> requests.Response:
         """Generates a payload to reply to a message received.
@@ -203,10 +232,11 @@ class TelegramBot:
             Response:
             Response class.
         """
-        return self._make_request(url=self.BASE_URL + models.env.bot_token + '/sendMessage',
-                                  payload={'chat_id': payload['from']['id'],
-                                           'reply_to_message_id': payload['message_id'],
-                                           'text': response, 'parse_mode': parse_mode})
+        messages = split_message(text=response)
+        payloads = [{'chat_id': payload['from']['id'], 'text': message, 'parse_mode': parse_mode}
+                    for message in messages]
+        payloads[0]['reply_to_message_id'] = payload['message_id']
+        return self._send(chat_id=payload['from']['id'], method='sendMessage', payloads=payloads)
 
     def send_message(self, chat_id: int, response: str, parse_mode: str = 'markdown') -> requests.Response:
         """Generates a payload to reply to a message received.
@@ -220,8 +250,29 @@ class TelegramBot:
             Response:
             Response class.
         """
-        return self._make_request(url=self.BASE_URL + models.env.bot_token + '/sendMessage',
-                                  payload={'chat_id': chat_id, 'text': response, 'parse_mode': parse_mode})
+        return self._send(chat_id=chat_id, method='sendMessage',
+                          payloads=[{'chat_id': chat_id, 'text': message, 'parse_mode': parse_mode}
+                                    for message in split_message(text=response)])
+
+    def set_webhook(self) -> requests.Response:
+        """Sets a webhook for telegram to push the updates to the API, instead of polling for them.
+
+        Returns:
+            Response:
+            Response class.
+        """
+        return self._make_request(url=self.BASE_URL + models.env.bot_token + '/setWebhook',
+                                  payload={'url': models.env.bot_webhook, 'secret_token': models.env.bot_secret,
+                                           'max_connections': 1, 'allowed_updates': json.dumps(['message'])})
+
+    def delete_webhook(self) -> requests.Response:
+        """Deletes the webhook if there is one, as telegram doesn't allow polling while a webhook is set.
+
+        Returns:
+            Response:
+            Response class.
+        """
+        return self._make_request(url=self.BASE_URL + models.env.bot_token + '/deleteWebhook', payload={})
 
     def poll_for_messages(self) -> NoReturn:
         """Polls ``api.telegram.org`` for new messages.
@@ -233,9 +284,11 @@ class TelegramBot:
                 - If unable to connect to the endpoint.
 
         See Also:
-            Swaps ``offset`` value during every iteration to avoid hanging new messages.
+            - Swaps ``offset`` value during every iteration to avoid hanging new messages.
+            - Offset of an update is acknowledged only after it is queued in the dispatcher.
         """
         offset = 0
+        self.delete_webhook()
         logger.info(msg="Polling for incoming messages..")
         while True:
             response = self._make_request(url=self.BASE_URL + models.env.bot_token + '/getUpdates',
@@ -254,13 +307,22 @@ class TelegramBot:
             if not response.get('result'):
                 continue
             for result in response['result']:
-                message = result.get('message', {})
-                if message.get('text'):
-                    self.process_text(payload=message)
-                elif message.get('voice'):
-                    self.process_voice(payload=message)
+                if result.get('message', {}).get('text') or result.get('message', {}).get('voice'):
+                    self.dispatcher.submit(update=result)
                 offset = result['update_id'] + 1
 
+    def handle_update(self, update: dict) -> None:
+        """Processes the message within an update, based on its type.
+
+        Args:
+            update: Update received from telegram.
+        """
+        message = update.get('message', {})
+        if message.get('text'):
+            self.process_text(payload=message)
+        elif message.get('voice'):
+            self.process_voice(payload=message)
+
     def authenticate(self, payload: dict) -> bool:
         """Authenticates the user with ``userId`` and ``userName``.
 
@@ -439,19 +501,24 @@ class TelegramBot:
             self.send_message(chat_id=payload['from']['id'], response="Test message received.")
             return
 
-        # Keywords for which the ' and ' split should not happen.
-        multiexec = keywords.keywords.send_notification + keywords.keywords.reminder + keywords.keywords.distance
-
-        if ' and ' in command and not word_match(phrase=command, match_list=keywords.keywords.avoid) and \
-                not word_match(phrase=command, match_list=multiexec):
-            for index, each in enumerate(command.split(' and '), 1 - len(command.split(' and '))):
-                if not word_match(phrase=each, match_list=compatibles.offline_compatible()):
-                    logger.warning(f"{each!r} is not a part of offline communicator compatible request.")
-                    self.send_message(chat_id=payload['from']['id'],
-                                      response=f"{each!r} is not a part of offline communicator compatible request.")
-                else:
-                    self.executor(command=each, payload=payload)
-                    time.sleep(2) if index else None  # Avoid time.sleep during the last iteration
+        if len(clauses := planner.plan(phrase=command)) > 1:
+            callers: Dict[str, str] = {}
+
+            def runner(clause: str) -> str:
+                """Executes a clause, and keeps the caller that names its audio response."""
+                with context.offline_request() as request:
+                    response = self.executor(command=clause, payload=payload, respond=False)
+                callers[clause] = request.caller
+                return response
+
+            def on_result(result: planner.Result) -> None:
+                """Sends the response of a clause within a request that carries its caller."""
+                with context.offline_request() as request:
+                    request.caller = callers.get(result.clause.text)
+                    self.process_response(payload=payload, response=str(result.response))
+
+            # Clauses run concurrently, but the responses are sent in the order they were requested
+            planner.execute(clauses=clauses, runner=runner, on_result=on_result)
             return
 
         if not word_match(phrase=command, match_list=compatibles.offline_compatible()):
@@ -469,24 +536,30 @@ class TelegramBot:
                 return
         self.executor(command=command, payload=payload)
 
-    def executor(self, command: str, payload: dict, respond: bool = True) -> NoReturn:
+    def executor(self, command: str, payload: dict, respond: bool = True) -> str:
         """Executes the command via offline communicator.
 
         Args:
             command: Command to be executed.
             payload: Payload received, to extract information from.
             respond: Boolean flag to restrict the response after executing a command.
+
+        Returns:
+            str:
+            Response from Jarvis.
         """
         logger.info(f'Request: {command}')
-        try:
-            response = offline_communicator(command=command).replace(models.env.title,
-                                                                     USER_TITLE.get(payload['from']['username']))
-        except Exception as error:
-            logger.error(error)
-            logger.error(traceback.format_exc())
-            response = f"Jarvis failed to process the request.\n\n`{error}`"
-        logger.info(f'Response: {response}')
-        self.process_response(payload=payload, response=response) if respond else None
+        with context.offline_request():  # Collects the caller to name the audio response
+            try:
+                response = offline_communicator(command=command).replace(models.env.title,
+                                                                         USER_TITLE.get(payload['from']['username']))
+            except Exception as error:
+                logger.error(error)
+                logger.error(traceback.format_exc())
+                response = f"Jarvis failed to process the request.\n\n`{error}`"
+            logger.info(f'Response: {response}')
+            self.process_response(payload=payload, response=response) if respond else None
+        return response
 
     def process_response(self, response: str, payload: dict) -> NoReturn:
         """Processes the response via Telegram API.
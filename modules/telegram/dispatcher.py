@@ -0,0 +1,121 @@
+# noinspection PyUnresolvedReferences
+"""Dispatches telegram updates to a pool of workers, one chat at a time in the order they were received.
+
+>>> Dispatcher
+
+See Also:
+    - Updates of a chat wait in a lane of their own, which is handled by at most one worker at any time, so the
+      responses within a chat retain the order of the requests while different chats are served in parallel.
+    - A worker handles a single update before the chat goes back in line, so a busy chat can't hold a worker.
+    - Updates waiting across all the chats are bounded, ``submit`` blocks once the limit is reached.
+    - Pending updates and the time taken to handle each update are exposed as metrics.
+"""
+
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, NoReturn, Tuple
+
+from modules.logger.custom_logger import logger
+from modules.metrics.registry import registry
+from modules.models import models
+
+PENDING = registry.gauge(name="telegram_updates_pending",
+                         documentation="Telegram updates waiting to be handled or being handled.")
+WAIT = registry.histogram(name="telegram_update_wait_seconds",
+                          documentation="Time a telegram update waited in its chat's lane before it was handled.",
+                          labels=("kind",))
+HANDLER = registry.histogram(name="telegram_update_handler_seconds",
+                             documentation="Time taken to handle a telegram update.",
+                             labels=("kind",))
+
+
+def update_kind(update: Dict[str, Any]) -> str:
+    """Gets the kind of message within an update.
+
+    Args:
+        update: Update received from telegram.
+
+    Returns:
+        str:
+        ``text``, ``voice`` or ``other``
+    """
+    message = update.get('message', {})
+    if message.get('text'):
+        return "text"
+    if message.get('voice'):
+        return "voice"
+    return "other"
+
+
+class Dispatcher:
+    """Initiates ``Dispatcher`` object to handle updates concurrently across chats, and in order within a chat.
+
+    >>> Dispatcher
+
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Any],
+                 workers: int = models.env.bot_workers, backlog: int = models.env.bot_backlog):
+        """Creates the worker pool and the lanes.
+
+        Args:
+            handler: Function that handles a single update.
+            workers: Number of updates that can be handled at the same time.
+            backlog: Number of updates that can be pending across all the chats.
+        """
+        self.handler = handler
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="telegram")
+        self.slots = threading.BoundedSemaphore(value=backlog)
+        self.lock = threading.Lock()
+        self.lanes: Dict[int, Deque[Tuple[Dict[str, Any], float]]] = {}
+        self.pending = 0
+
+    def submit(self, update: Dict[str, Any]) -> NoReturn:
+        """Queues an update in its chat's lane, waits for a slot when the backlog is full.
+
+        Args:
+            update: Update received from telegram.
+        """
+        chat_id = update['message']['chat']['id']
+        self.slots.acquire()
+        with self.lock:
+            self.pending += 1
+            PENDING.set(self.pending)
+            if lane := self.lanes.get(chat_id):
+                lane.append((update, time.perf_counter()))
+                return
+            self.lanes[chat_id] = deque([(update, time.perf_counter())])
+        self.executor.submit(self._run, chat_id)
+
+    def _run(self, chat_id: int) -> NoReturn:
+        """Handles the oldest update of a chat, and puts the chat back in line if it has more.
+
+        Args:
+            chat_id: Chat ID.
+        """
+        with self.lock:
+            update, queued = self.lanes[chat_id][0]
+        kind = update_kind(update=update)
+        start = time.perf_counter()
+        WAIT.observe(start - queued, kind=kind)
+        try:
+            self.handler(update)
+        except Exception as error:  # Worker should never stop
+            logger.error(error)
+            logger.error(traceback.format_exc())
+        finally:
+            # Lane moves on even when the handler raises a BaseException, like StopSignal, so the chat isn't stuck
+            HANDLER.observe(time.perf_counter() - start, kind=kind)
+            with self.lock:
+                lane = self.lanes[chat_id]
+                lane.popleft()
+                self.pending -= 1
+                PENDING.set(self.pending)
+                if not lane:
+                    del self.lanes[chat_id]
+            self.slots.release()
+            if lane:
+                self.executor.submit(self._run, chat_id)
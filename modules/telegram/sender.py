@@ -0,0 +1,261 @@
+# noinspection PyUnresolvedReferences
+"""Sends the outbound telegram messages through a queue, paced within the rate limits of the Bot API.
+
+>>> Sender
+
+See Also:
+    - Messages of a chat wait in a lane of their own, and are sent one at a time in the order they were queued.
+    - Each chat has a token bucket of its own, in addition to a global bucket that is shared by all the chats.
+    - A message that is throttled with a ``429`` is retried after the ``retry_after`` sent by telegram, without
+      breaking the order of the chat.
+    - Requests are sent by a small pool of threads, through the session of the bot.
+    - Long text is split into messages within the size limit, at boundaries that don't break the markdown.
+"""
+
+import heapq
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, List, NoReturn, Tuple
+
+import requests
+
+from modules.logger.custom_logger import logger
+from modules.metrics.registry import registry
+from modules.utils.ratelimit import TokenBucket
+
+MESSAGE_LIMIT = 4096  # Characters allowed in a single text message
+GLOBAL_RATE = 30  # Messages per second across all the chats
+CHAT_RATE = 1  # Messages per second within a chat
+CHAT_BURST = 3  # Messages a chat can send at once, before it is paced
+SEND_WORKERS = 4
+MAX_ATTEMPTS = 3  # Attempts for a message that is throttled, before the throttled response is returned
+
+FENCE = re.compile(r"```[^\n`]*")
+
+THROTTLED = registry.counter(name="telegram_throttled_total",
+                             documentation="Outbound telegram messages that were throttled with a 429.",
+                             labels=("method",))
+OUTBOUND = registry.gauge(name="telegram_outbound_pending",
+                          documentation="Outbound telegram messages waiting to be sent or being sent.")
+
+
+def unbalanced(text: str) -> bool:
+    """Checks if the text leaves an inline markdown entity open, ignoring the code blocks.
+
+    Args:
+        text: Text to be checked.
+
+    Returns:
+        bool:
+        Boolean flag to indicate whether an entity is left open.
+    """
+    text = re.sub(r"```.*?(```|$)", "", text, flags=re.DOTALL)
+    if text.count('[') != text.count(']'):
+        return True
+    return any(text.count(marker) % 2 for marker in ('*', '_', '`'))
+
+
+def boundary(text: str, limit: int) -> Tuple[int, int]:
+    """Finds where the text has to be cut, to fit within the limit.
+
+    Args:
+        text: Text to be cut.
+        limit: Maximum length of the first part.
+
+    Returns:
+        Tuple[int, int]:
+        Tuple of the end of the first part and the start of the second part.
+
+    See Also:
+        - Paragraphs are preferred over lines, and lines over words. A cut that leaves an inline entity open is
+          used only when there is no other, and the text is cut at the limit when it has no separators at all.
+    """
+    fallback = None
+    for separator in ("\n\n", "\n", " "):
+        position = text.rfind(separator, 0, limit)
+        while position > 0:
+            if not unbalanced(text=text[:position]):
+                return position, position + len(separator)
+            fallback = fallback or (position, position + len(separator))
+            position = text.rfind(separator, 0, position)
+    return fallback or (limit, limit)
+
+
+def split_message(text: str, limit: int = MESSAGE_LIMIT) -> List[str]:
+    """Splits a text into messages that are within the size limit.
+
+    Args:
+        text: Text to be split.
+        limit: Maximum length of each message.
+
+    Returns:
+        List[str]:
+        List of messages, a code block that is cut is closed in one message and reopened in the next.
+    """
+    messages = []
+    while len(text) > limit:
+        end, start = boundary(text=text, limit=limit - len("\n```"))
+        message, text = text[:end].rstrip(), text[start:]
+        if (fences := FENCE.findall(message)) and len(fences) % 2:
+            message += "\n```"
+            text = f"{fences[-1]}\n{text}"
+        messages.append(message)
+    if text.strip() or not messages:
+        messages.append(text)
+    return messages
+
+
+class Outbound:
+    """Initiates ``Outbound`` object to hold a request that is waiting to be sent.
+
+    >>> Outbound
+
+    """
+
+    def __init__(self, url: str, payload: dict, files: dict = None):
+        """Stores the request and creates a future for its response.
+
+        Args:
+            url: URL to submit the request.
+            payload: Payload of the request.
+            files: Files to be sent along with the request.
+        """
+        self.url = url
+        self.payload = payload
+        self.files = files
+        self.attempts = 0
+        self.future = Future()
+
+
+class Sender:
+    """Initiates ``Sender`` object to send the messages of each chat in order, within the rate limits.
+
+    >>> Sender
+
+    """
+
+    def __init__(self, session: requests.Session, workers: int = SEND_WORKERS):
+        """Creates the lanes and the buckets, and starts the thread that schedules the chats.
+
+        Args:
+            session: Session to send the requests through.
+            workers: Number of requests that can be sent at the same time.
+        """
+        self.session = session
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="telegram-sender")
+        self.condition = threading.Condition()
+        self.lanes: Dict[int, Deque[Outbound]] = {}
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.bucket = TokenBucket(rate=GLOBAL_RATE, capacity=GLOBAL_RATE)
+        self.ready: List[Tuple[float, int]] = []
+        self.pending = 0
+        threading.Thread(target=self._schedule, daemon=True).start()
+
+    def send(self, chat_id: int, url: str, payload: dict, files: dict = None) -> Future:
+        """Queues a request in its chat's lane.
+
+        Args:
+            chat_id: Chat ID.
+            url: URL to submit the request.
+            payload: Payload of the request.
+            files: Files to be sent along with the request.
+
+        Returns:
+            Future:
+            Future that resolves to the response.
+        """
+        outbound = Outbound(url=url, payload=payload, files=files)
+        with self.condition:
+            self.pending += 1
+            OUTBOUND.set(self.pending)
+            if lane := self.lanes.get(chat_id):
+                lane.append(outbound)
+            else:
+                self.lanes[chat_id] = deque([outbound])
+                self._ready(chat_id=chat_id, delay=0)
+        return outbound.future
+
+    def _ready(self, chat_id: int, delay: float) -> NoReturn:
+        """Puts a chat in line to send its next message after a delay, the condition should be held by the caller.
+
+        Args:
+            chat_id: Chat ID.
+            delay: Seconds to wait before the chat can send.
+        """
+        heapq.heappush(self.ready, (time.monotonic() + delay, chat_id))
+        self.condition.notify()
+
+    def _schedule(self) -> NoReturn:
+        """Hands over the next message of each chat to the workers, as the buckets allow."""
+        while True:
+            with self.condition:
+                if not self.ready:
+                    self.condition.wait()
+                    continue
+                due, chat_id = self.ready[0]
+                if (wait := due - time.monotonic()) > 0:
+                    self.condition.wait(timeout=wait)
+                    continue
+                heapq.heappop(self.ready)
+                bucket = self.buckets.setdefault(chat_id, TokenBucket(rate=CHAT_RATE, capacity=CHAT_BURST))
+                if wait := bucket.take():
+                    self._ready(chat_id=chat_id, delay=wait)
+                    continue
+            while wait := self.bucket.take():
+                time.sleep(wait)
+            self.executor.submit(self._send, chat_id)
+
+    def _send(self, chat_id: int) -> NoReturn:
+        """Sends the oldest message of a chat, and puts the chat back in line.
+
+        Args:
+            chat_id: Chat ID.
+        """
+        with self.condition:
+            outbound = self.lanes[chat_id][0]
+        outbound.attempts += 1
+        try:
+            response = self.session.post(url=outbound.url, data=outbound.payload, files=outbound.files,
+                                         timeout=(5, 60))
+        except Exception as error:  # Worker should never stop, the error is raised to the caller instead
+            self._done(chat_id=chat_id, outbound=outbound, error=error)
+            return
+        if response.status_code == 429 and outbound.attempts < MAX_ATTEMPTS:
+            try:
+                retry_after = response.json().get('parameters', {}).get('retry_after', 1)
+            except ValueError:
+                retry_after = 1
+            THROTTLED.inc(method=outbound.url.rsplit('/', 1)[-1])
+            logger.warning(f"Message to {chat_id} was throttled, retrying in {retry_after} seconds")
+            with self.condition:
+                self._ready(chat_id=chat_id, delay=retry_after)
+            return
+        self._done(chat_id=chat_id, outbound=outbound, response=response)
+
+    def _done(self, chat_id: int, outbound: Outbound,
+              response: requests.Response = None, error: Exception = None) -> NoReturn:
+        """Removes a message from its lane, resolves its future and puts the chat back in line if it has more.
+
+        Args:
+            chat_id: Chat ID.
+            outbound: Message that was sent.
+            response: Response received.
+            error: Error raised while sending.
+        """
+        with self.condition:
+            lane = self.lanes[chat_id]
+            lane.popleft()
+            self.pending -= 1
+            OUTBOUND.set(self.pending)
+            if lane:
+                self._ready(chat_id=chat_id, delay=0)
+            else:
+                del self.lanes[chat_id]
+        if error:
+            logger.error(error)
+            outbound.future.set_exception(error)
+        else:
+            outbound.future.set_result(response)
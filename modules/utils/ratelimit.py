@@ -0,0 +1,47 @@
+# noinspection PyUnresolvedReferences
+"""Rate limiter shared by the modules that call the rate limited APIs.
+
+>>> RateLimit
+
+"""
+
+import threading
+import time
+from typing import Union
+
+
+class TokenBucket:
+    """Initiates ``TokenBucket`` object to allow a burst of requests, and pace the ones after at a fixed rate.
+
+    >>> TokenBucket
+
+    """
+
+    def __init__(self, rate: Union[int, float], capacity: Union[int, float]):
+        """Starts the bucket with full capacity.
+
+        Args:
+            rate: Tokens added per second.
+            capacity: Maximum tokens the bucket can hold.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        """Takes a token if one is available.
+
+        Returns:
+            float:
+            Zero if a token was taken, otherwise the seconds until a token is available.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
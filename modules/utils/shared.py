@@ -5,11 +5,11 @@
 
 """
 
-greeting = False
-called_by_offline = False
+from typing import Any
+
+from modules.offline import context
 
-text_spoken = None
-offline_caller = None
+greeting = False
 tv = None
 
 processes = {}
@@ -24,3 +24,18 @@ called = {
     'todo': False,
     'add_todo': False
 }
+
+
+def __getattr__(name: str) -> Any:
+    """Resolves ``called_by_offline`` from the request context, so that concurrent requests don't share the flag.
+
+    Args:
+        name: Name of the attribute.
+
+    Returns:
+        Any:
+        True if the current context is an offline execution, for ``called_by_offline``.
+    """
+    if name == "called_by_offline":
+        return context.current() is not None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
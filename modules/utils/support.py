@@ -31,6 +31,7 @@ from modules.conditions import keywords
 from modules.database import database
 from modules.logger.custom_logger import logger
 from modules.models import models
+from modules.offline import context
 
 db = database.Database(database=models.fileio.base_db)
 
@@ -516,6 +517,7 @@ def exit_message() -> str:
 def no_env_vars() -> NoReturn:
     """Says a message about permissions when env vars are missing."""
     logger.error(f"Called by: {sys._getframe(1).f_code.co_name}")  # noqa
+    context.fail()
     speaker.speak(text=f"I'm sorry {models.env.title}! I lack the permissions!")
 
 
@@ -0,0 +1,77 @@
+import json
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Tuple
+from urllib.parse import parse_qsl
+
+import pytest
+
+
+class TelegramStandIn(ThreadingHTTPServer):
+    """Local stand-in for the Bot API, which records the requests and replies with the queued responses.
+
+    >>> TelegramStandIn
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        """Binds to a free port on the loopback interface."""
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.lock = threading.Lock()
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+        self.responses: Deque[Tuple[int, dict]] = deque()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the stand-in, in the format of ``TelegramBot.BASE_URL``."""
+        return f"http://127.0.0.1:{self.server_address[1]}/bot"
+
+    def reply(self, status: int, body: dict) -> None:
+        """Queues a response for the next request, requests that find the queue empty get a ``200``.
+
+        Args:
+            status: Status code of the response.
+            body: JSON body of the response.
+        """
+        with self.lock:
+            self.responses.append((status, body))
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Handles the requests sent to the stand-in.
+
+    >>> StandInHandler
+
+    """
+
+    server: TelegramStandIn
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Records the method and the form payload, and sends the next queued response."""
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+        with self.server.lock:
+            self.server.requests.append((self.path.rsplit('/', 1)[-1], dict(parse_qsl(body))))
+            status, reply = self.server.responses.popleft() if self.server.responses else (200, {"ok": True})
+        content = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args) -> None:
+        """Keeps the test output clean."""
+
+
+@pytest.fixture
+def telegram():
+    """Runs a local stand-in for the Bot API in a thread."""
+    stand_in = TelegramStandIn()
+    thread = threading.Thread(target=stand_in.serve_forever, daemon=True)
+    thread.start()
+    yield stand_in
+    stand_in.shutdown()
+    stand_in.server_close()
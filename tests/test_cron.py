@@ -0,0 +1,97 @@
+import datetime
+
+import pytest
+
+from modules.crontab.expression import CronBatch, CronExpression
+from modules.exceptions import InvalidArgument
+
+
+def minutes(start: datetime.datetime, count: int):
+    """Yields the date tuples of consecutive minutes."""
+    for offset in range(count):
+        moment = start + datetime.timedelta(minutes=offset)
+        yield moment.year, moment.month, moment.day, moment.hour, moment.minute
+
+
+def test_bitmasks():
+    """Each field is compiled into a bitmask with a bit set at every allowed value."""
+    job = CronExpression("*/15 9-17 * jan,jul mon-fri")
+    assert job.static
+    assert job.bitmasks[0] == sum(1 << value for value in (0, 15, 30, 45))
+    assert job.bitmasks[1] == sum(1 << value for value in range(9, 18))
+    assert job.bitmasks[2] == sum(1 << value for value in range(1, 32))
+    assert job.bitmasks[3] == (1 << 1) | (1 << 7)
+    assert job.bitmasks[4] == sum(1 << value for value in range(1, 6))
+    assert not job.either_day
+
+
+def test_substitution_and_comment():
+    """Nicknames are substituted, and the text after the fields is kept as the comment."""
+    job = CronExpression("@hourly cd /tmp && ls")
+    assert job.expression == "0 * * * *"
+    assert job.comment == "cd /tmp && ls"
+
+
+@pytest.mark.parametrize("line", ["* * * *", "61 * * * *", "* 24 * * *", "1,* * * * *", "* * x * *"])
+def test_invalid(line: str):
+    """Expressions with missing fields or values out of bounds are rejected."""
+    with pytest.raises(InvalidArgument):
+        CronExpression(line)
+
+
+def test_either_day():
+    """When both day fields are restricted, a match on either of them fires the trigger."""
+    job = CronExpression("0 0 13 * 5")
+    assert job.either_day
+    assert job.check_trigger((2022, 5, 13, 0, 0))  # Friday the 13th
+    assert job.check_trigger((2022, 5, 20, 0, 0))  # Friday
+    assert job.check_trigger((2022, 6, 13, 0, 0))  # Monday the 13th
+    assert not job.check_trigger((2022, 6, 14, 0, 0))
+
+
+@pytest.mark.parametrize("line", ["0 0 * * 1-5/2", "*/7 */5 1-10 * *", "30 4 * 2 0", "0 12 1,15 * 3"])
+def test_static_matches_general(line: str):
+    """Bitmasks agree with the general matcher that the expressions with special characters use."""
+    job = CronExpression(line)
+    assert job.static
+    for date_tuple in minutes(start=datetime.datetime(2024, 2, 25), count=60 * 24 * 7):
+        job.static = True
+        fast = job.check_trigger(date_tuple)
+        job.static = False
+        assert fast == job.check_trigger(date_tuple), date_tuple
+
+
+def test_next_fire():
+    """Next fire is strictly after the given time, and skips the months that are not allowed."""
+    job = CronExpression("0 0 * * 1-5/2")
+    assert job.next_fire(after=datetime.datetime(2022, 7, 27, 0, 0)) == datetime.datetime(2022, 7, 29, 0, 0)
+    assert job.next_fire(after=datetime.datetime(2022, 7, 26, 23, 59)) == datetime.datetime(2022, 7, 27, 0, 0)
+    leap = CronExpression("0 6 29 2 *")
+    assert leap.next_fire(after=datetime.datetime(2097, 1, 1)) == datetime.datetime(2104, 2, 29, 6, 0)
+
+
+def test_iter_fires():
+    """Fires within a range include the start and exclude the end."""
+    job = CronExpression("*/20 10 * * *")
+    fires = list(job.iter_fires(start=datetime.datetime(2022, 1, 1, 10, 0), end=datetime.datetime(2022, 1, 2, 10, 20)))
+    assert fires == [datetime.datetime(2022, 1, 1, 10, 0), datetime.datetime(2022, 1, 1, 10, 20),
+                     datetime.datetime(2022, 1, 1, 10, 40), datetime.datetime(2022, 1, 2, 10, 0)]
+
+
+def test_batch():
+    """Batch agrees with checking each expression on its own, including the ones with special characters."""
+    lines = ["*/15 9-17 * * 1-5", "0 0 13 * 5", "0 0 L * *", "5 4 * * 6#2", "@daily", "0 12 15W * *"]
+    batch = CronBatch(expressions=lines)
+    assert len(batch) == len(lines)
+    assert batch.dynamic == [2, 3, 5]
+    for date_tuple in minutes(start=datetime.datetime(2022, 4, 28), count=60 * 24 * 21):
+        expected = [job for job in batch.expressions if job.check_trigger(date_tuple)]
+        assert batch.triggered(date_tuple) == expected, date_tuple
+
+
+def test_batch_next_fire():
+    """Earliest fire is returned along with every expression that fires at that time."""
+    batch = CronBatch(expressions=["0 9 * * *", "0 9 * * 1", "30 8 * * 6"])
+    fire, jobs = batch.next_fire(after=datetime.datetime(2022, 8, 14, 12, 0))  # Sunday
+    assert fire == datetime.datetime(2022, 8, 15, 9, 0)
+    assert [job.expression for job in jobs] == ["0 9 * * *", "0 9 * * 1"]
@@ -0,0 +1,109 @@
+import random
+import threading
+import time
+from typing import Any, Dict
+
+from modules.telegram.dispatcher import Dispatcher
+
+
+def update(chat_id: int, sequence: int) -> Dict[str, Any]:
+    """Creates a text update for a chat."""
+    return {'message': {'chat': {'id': chat_id}, 'text': str(sequence)}}
+
+
+def wait_for(condition, timeout: float = 10) -> bool:
+    """Waits for a condition to be met, and returns whether it was met within the timeout."""
+    end = time.time() + timeout
+    while not condition():
+        if time.time() > end:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_order_within_chat():
+    """Updates of a chat are handled one at a time, in the order they were submitted."""
+    handled = {chat_id: [] for chat_id in range(3)}
+    active = {chat_id: 0 for chat_id in range(3)}
+    overlaps = []
+    lock = threading.Lock()
+
+    def handler(payload: Dict[str, Any]) -> None:
+        """Records the update, and whether another update of its chat was being handled."""
+        chat_id = payload['message']['chat']['id']
+        with lock:
+            active[chat_id] += 1
+            overlaps.append(active[chat_id] > 1)
+        time.sleep(random.uniform(0, 0.005))
+        with lock:
+            handled[chat_id].append(int(payload['message']['text']))
+            active[chat_id] -= 1
+
+    dispatcher = Dispatcher(handler=handler, workers=4, backlog=100)
+    for sequence in range(20):
+        for chat_id in range(3):
+            dispatcher.submit(update=update(chat_id=chat_id, sequence=sequence))
+    assert wait_for(lambda: sum(map(len, handled.values())) == 60)
+    assert handled == {chat_id: list(range(20)) for chat_id in range(3)}
+    assert not any(overlaps)
+    assert wait_for(lambda: not dispatcher.lanes and dispatcher.pending == 0)
+
+
+def test_chats_in_parallel():
+    """A chat that is being handled doesn't hold up the other chats."""
+    other = threading.Event()
+    waited = []
+
+    def handler(payload: Dict[str, Any]) -> None:
+        """Blocks the first chat until the second one is handled."""
+        if payload['message']['chat']['id'] == 1:
+            waited.append(other.wait(timeout=5))
+        else:
+            other.set()
+
+    dispatcher = Dispatcher(handler=handler, workers=2, backlog=10)
+    dispatcher.submit(update=update(chat_id=1, sequence=0))
+    dispatcher.submit(update=update(chat_id=2, sequence=0))
+    assert wait_for(lambda: waited)
+    assert waited == [True]
+
+
+class Stop(BaseException):
+    """Stands in for the signals that are raised as a ``BaseException``."""
+
+
+def test_lane_moves_on_after_failure():
+    """An update that fails doesn't hold up the ones after it, or the slot it was holding."""
+    handled = []
+
+    def handler(payload: Dict[str, Any]) -> None:
+        """Fails the first two updates."""
+        sequence = int(payload['message']['text'])
+        if sequence == 0:
+            raise ValueError("handler failed")
+        if sequence == 1:
+            raise Stop
+        handled.append(sequence)
+
+    dispatcher = Dispatcher(handler=handler, workers=1, backlog=3)
+    for sequence in range(3):
+        dispatcher.submit(update=update(chat_id=1, sequence=sequence))
+    assert wait_for(lambda: handled == [2])
+    assert wait_for(lambda: not dispatcher.lanes and dispatcher.pending == 0)
+    for _ in range(3):  # Every slot was released
+        assert dispatcher.slots.acquire(timeout=1)
+
+
+def test_backlog_blocks_submit():
+    """Submit blocks once the backlog is full, until an update is handled."""
+    release = threading.Event()
+    dispatcher = Dispatcher(handler=lambda payload: release.wait(timeout=5), workers=1, backlog=2)
+    dispatcher.submit(update=update(chat_id=1, sequence=0))
+    dispatcher.submit(update=update(chat_id=2, sequence=0))
+    submitted = threading.Event()
+    threading.Thread(target=lambda: (dispatcher.submit(update=update(chat_id=3, sequence=0)), submitted.set()),
+                     daemon=True).start()
+    assert not submitted.wait(timeout=0.2)
+    release.set()
+    assert submitted.wait(timeout=5)
+    assert wait_for(lambda: dispatcher.pending == 0)
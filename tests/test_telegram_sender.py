@@ -0,0 +1,120 @@
+import random
+import socket
+
+import pytest
+import requests
+
+from modules.telegram import sender
+from modules.telegram.sender import (FENCE, Sender, boundary, split_message,
+                                     unbalanced)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("plain text", False),
+    ("*bold* and _italic_ with `code`", False),
+    ("```\n*open inside a code block\n```", False),
+    ("*bold", True),
+    ("[link", True),
+    ("`code", True),
+])
+def test_unbalanced(text: str, expected: bool):
+    """Inline entities left open are detected, and the code blocks are ignored."""
+    assert unbalanced(text=text) is expected
+
+
+def test_boundary_prefers_paragraphs():
+    """Paragraphs are preferred over lines, and lines over words."""
+    assert boundary(text="aaa bbb\nccc\n\nddd eee", limit=18) == (11, 13)
+    assert boundary(text="aaa bbb\nccc ddd eee", limit=18) == (7, 8)
+    assert boundary(text="aaa bbb ccc ddd", limit=10) == (7, 8)
+
+
+def test_boundary_avoids_open_entity():
+    """Cut that leaves an entity open is skipped, and used only when there is no other."""
+    assert boundary(text="say *hello world* now", limit=15) == (3, 4)
+    assert boundary(text="*x y z*", limit=5) == (4, 5)
+    assert boundary(text="abcdefghij", limit=4) == (4, 4)
+
+
+def test_split_short():
+    """Text within the limit is sent as it is."""
+    assert split_message(text="hello") == ["hello"]
+    assert split_message(text="") == [""]
+
+
+def test_split_within_limit():
+    """Every message is within the limit, and no text is lost."""
+    rand = random.Random(7)
+    words = ["".join(rand.choices("abcdefgh", k=rand.randint(1, 12))) for _ in range(500)]
+    text = "".join(word + rand.choice([" ", " ", " ", "\n", "\n\n"]) for word in words)
+    messages = split_message(text=text, limit=64)
+    assert len(messages) > 1
+    assert all(len(message) <= 64 for message in messages)
+    assert " ".join(messages).split() == words
+
+
+def test_split_reopens_fence():
+    """Code block that is cut is closed in one message and reopened with its language in the next."""
+    code = [f"print({number})" for number in range(40)]
+    text = "intro\n```python\n" + "\n".join(code) + "\n```\noutro"
+    messages = split_message(text=text, limit=100)
+    assert len(messages) > 2
+    for message in messages:
+        assert len(message) <= 100
+        assert len(FENCE.findall(message)) % 2 == 0
+    for message in messages[1:-1]:
+        assert message.startswith("```python\n")
+    lines = [line for message in messages for line in message.splitlines() if line.startswith("print(")]
+    assert lines == code
+    assert messages[-1].endswith("```\noutro")
+
+
+@pytest.fixture
+def outbox(monkeypatch, telegram):
+    """Sender with the chat limits lifted, that sends to the local stand-in."""
+    monkeypatch.setattr(sender, 'CHAT_RATE', 1000)
+    monkeypatch.setattr(sender, 'CHAT_BURST', 1000)
+    return Sender(session=requests.Session(), workers=4)
+
+
+def test_order_within_chat(outbox, telegram):
+    """Messages of a chat are sent in the order they were queued, while the chats are interleaved."""
+    futures = [outbox.send(chat_id=chat_id, url=f"{telegram.url}/sendMessage",
+                           payload={'chat_id': chat_id, 'text': str(sequence)})
+               for sequence in range(10) for chat_id in (1, 2)]
+    assert all(future.result(timeout=10).ok for future in futures)
+    for chat_id in ('1', '2'):
+        sent = [payload['text'] for _, payload in telegram.requests if payload['chat_id'] == chat_id]
+        assert sent == [str(sequence) for sequence in range(10)]
+
+
+def test_throttled_is_retried_in_order(outbox, telegram):
+    """Message throttled with a 429 is retried after ``retry_after``, before the ones queued after it."""
+    telegram.reply(status=429, body={"ok": False, "error_code": 429, "parameters": {"retry_after": 0.2}})
+    futures = [outbox.send(chat_id=1, url=f"{telegram.url}/sendMessage", payload={'chat_id': 1, 'text': text})
+               for text in ("first", "second", "third")]
+    assert all(future.result(timeout=10).ok for future in futures)
+    assert [payload['text'] for _, payload in telegram.requests] == ["first", "first", "second", "third"]
+
+
+def test_throttled_gives_up(outbox, telegram):
+    """Throttled response is returned once the attempts run out, and the chat moves on."""
+    for _ in range(sender.MAX_ATTEMPTS):
+        telegram.reply(status=429, body={"ok": False, "parameters": {"retry_after": 0.05}})
+    throttled = outbox.send(chat_id=1, url=f"{telegram.url}/sendMessage", payload={'chat_id': 1, 'text': "a"})
+    after = outbox.send(chat_id=1, url=f"{telegram.url}/sendMessage", payload={'chat_id': 1, 'text': "b"})
+    assert throttled.result(timeout=10).status_code == 429
+    assert after.result(timeout=10).ok
+    assert [payload['text'] for _, payload in telegram.requests] == ["a"] * sender.MAX_ATTEMPTS + ["b"]
+
+
+def test_error_is_raised_to_caller(outbox, telegram):
+    """Request that fails raises in its future, without holding up the chat."""
+    with socket.socket() as closed:
+        closed.bind(("127.0.0.1", 0))
+        port = closed.getsockname()[1]
+    failed = outbox.send(chat_id=1, url=f"http://127.0.0.1:{port}/bot/sendMessage", payload={'text': "a"})
+    after = outbox.send(chat_id=1, url=f"{telegram.url}/sendMessage", payload={'chat_id': 1, 'text': "b"})
+    assert isinstance(failed.exception(timeout=10), requests.ConnectionError)
+    assert after.result(timeout=10).ok
+    assert outbox.pending == 0
@@ -0,0 +1,119 @@
+import time
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routers import telegram as webhook
+from modules.models import models
+from modules.telegram.bot import TelegramBot
+
+SECRET = "webhook-secret"
+
+
+class FakeDispatcher:
+    """Records the updates submitted by the webhook.
+
+    >>> FakeDispatcher
+
+    """
+
+    def __init__(self):
+        self.updates: List[Dict[str, Any]] = []
+
+    def submit(self, update: Dict[str, Any]) -> None:
+        """Records the update."""
+        self.updates.append(update)
+
+
+class FakeBot:
+    """Stands in for the bot that is created on the first update.
+
+    >>> FakeBot
+
+    """
+
+    def __init__(self):
+        self.dispatcher = FakeDispatcher()
+
+
+@pytest.fixture
+def env(monkeypatch):
+    """Enables the webhook with a token and a secret."""
+    monkeypatch.setattr(models.env, 'bot_token', "123:token")
+    monkeypatch.setattr(models.env, 'bot_webhook', "https://jarvis.example.com/telegram-webhook")
+    monkeypatch.setattr(models.env, 'bot_secret', SECRET)
+
+
+@pytest.fixture
+def client():
+    """Client for an app that only has the webhook router."""
+    app = FastAPI()
+    app.include_router(webhook.router)
+    return TestClient(app)
+
+
+def message(text: str = None, chat_id: int = 1) -> Dict[str, Any]:
+    """Creates an update with a message."""
+    update = {'update_id': 1, 'message': {'message_id': 1, 'chat': {'id': chat_id}, 'from': {'id': chat_id}}}
+    if text:
+        update['message']['text'] = text
+    return update
+
+
+def test_disabled(client, monkeypatch):
+    """Webhook is not found when it is not set."""
+    monkeypatch.setattr(models.env, 'bot_token', "123:token")
+    monkeypatch.setattr(models.env, 'bot_webhook', None)
+    response = client.post("/telegram-webhook", json=message("hi"),
+                           headers={'X-Telegram-Bot-Api-Secret-Token': SECRET})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("headers", [{}, {'X-Telegram-Bot-Api-Secret-Token': "wrong"}])
+def test_secret(client, env, monkeypatch, headers: Dict[str, str]):
+    """Updates without the secret token are rejected before they reach the bot."""
+    bot = FakeBot()
+    monkeypatch.setattr(webhook, 'BOT', {'bot': bot})
+    response = client.post("/telegram-webhook", json=message("hi"), headers=headers)
+    assert response.status_code == 401
+    assert not bot.dispatcher.updates
+
+
+def test_submit(client, env, monkeypatch):
+    """Updates with text are submitted to the dispatcher, and the rest are acknowledged and ignored."""
+    bot = FakeBot()
+    monkeypatch.setattr(webhook, 'BOT', {'bot': bot})
+    headers = {'X-Telegram-Bot-Api-Secret-Token': SECRET}
+    assert client.post("/telegram-webhook", json=message("hi"), headers=headers).status_code == 200
+    assert client.post("/telegram-webhook", json=message(), headers=headers).status_code == 200
+    assert client.post("/telegram-webhook", json={'update_id': 2, 'edited_message': {}},
+                       headers=headers).status_code == 200
+    assert bot.dispatcher.updates == [message("hi")]
+
+
+def test_set_webhook(env, monkeypatch, telegram):
+    """Webhook is set with the secret, a single connection and only the message updates."""
+    monkeypatch.setattr(TelegramBot, 'BASE_URL', telegram.url)
+    assert TelegramBot().set_webhook().ok
+    assert telegram.requests == [('setWebhook', {'url': "https://jarvis.example.com/telegram-webhook",
+                                                 'secret_token': SECRET, 'max_connections': '1',
+                                                 'allowed_updates': '["message"]'})]
+
+
+def test_round_trip(client, env, monkeypatch, telegram):
+    """Update pushed to the webhook is handled by a bot that is created on demand, and its reply is sent."""
+    monkeypatch.setattr(TelegramBot, 'BASE_URL', telegram.url)
+    monkeypatch.setattr(TelegramBot, 'process_text',
+                        lambda self, payload: self.send_message(chat_id=payload['chat']['id'],
+                                                                response=payload['text'].upper()))
+    monkeypatch.setattr(webhook, 'BOT', {})
+    response = client.post("/telegram-webhook", json=message("ping", chat_id=7),
+                           headers={'X-Telegram-Bot-Api-Secret-Token': SECRET})
+    assert response.status_code == 200
+    assert isinstance(webhook.BOT['bot'], TelegramBot)
+    end = time.time() + 10
+    while not telegram.requests and time.time() < end:
+        time.sleep(0.01)
+    assert telegram.requests == [('sendMessage', {'chat_id': '7', 'text': "PING", 'parse_mode': 'markdown'})]